@@ -1,12 +1,14 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import json
 import time
 from datetime import datetime
 import logging
 import hashlib # Corrected import for hashlib
+import asyncio
+from contextlib import asynccontextmanager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,9 +17,32 @@ logger = logging.getLogger(__name__)
 # Import new services
 from services.price_predictor import PricePredictor
 from services.news_scraper import NewsScraper
+from services.news_ingestor import NewsIngestor
+from services.news_index import NewsIndex
+from services.news_dedup import NearDuplicateDetector
+from services.news_archive import NewsArchive
 from services.satellite_service import SatelliteService
-
-app = FastAPI(title="Panchmukhi ML Services", version="1.0.0")
+from services.fusion_scorer import FusionScorer
+from services.ohlcv_store import OHLCVStore
+from services.lexicon_matcher import LexiconMatcher
+from services.sentiment_analyzer import SentimentAnalyzer
+from services.sentiment_batch import SentimentBatchEngine
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the news store and index from the archive, then poll in the background
+    articles = await asyncio.to_thread(news_cache.replay, time.time() - news_index.retention)
+    await asyncio.to_thread(news_ingestor.restore, articles)
+    await asyncio.to_thread(news_index.add_articles, articles)
+    await asyncio.to_thread(news_cache.compact)
+    # The TextBlob worker pool starts with the server rather than inside a request thread
+    await asyncio.to_thread(sentiment_batch_engine.start)
+    news_ingestor.start()
+    yield
+    await news_ingestor.stop()
+    await asyncio.to_thread(sentiment_batch_engine.close)
+
+app = FastAPI(title="Panchmukhi ML Services", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -28,9 +53,25 @@ app.add_middleware(
 )
 
 # Initialize Services
-price_predictor = PricePredictor()
+price_predictor = PricePredictor(data_store=OHLCVStore())
 news_scraper = NewsScraper()
+news_ingestor = NewsIngestor(news_scraper, deduplicator=NearDuplicateDetector())
+news_index = NewsIndex()
+news_cache = NewsArchive()
+news_ingestor.subscribe(news_cache.append)
+news_ingestor.subscribe(news_index.add_articles)
 satellite_service = SatelliteService()
+fusion_scorer = FusionScorer()
+sentiment_analyzer = SentimentAnalyzer()
+sentiment_batch_engine = SentimentBatchEngine(sentiment_analyzer)
+
+# Marathi sentiment words, matched anywhere in the text so inflected forms count
+MARATHI_POSITIVE_WORDS = ['चांगले', 'उत्तम', 'सकारात्मक', 'वाढ', 'मुनाफा', 'जिंकले']
+MARATHI_NEGATIVE_WORDS = ['वाईट', 'नकारात्मक', 'घट', 'तोटा', 'हारले', 'समस्या']
+marathi_matcher = LexiconMatcher(
+    {**dict.fromkeys(MARATHI_POSITIVE_WORDS, 1.0), **dict.fromkeys(MARATHI_NEGATIVE_WORDS, -1.0)},
+    whole_words=False
+)
 
 # Pydantic models
 class SentimentRequest(BaseModel):
@@ -42,6 +83,17 @@ class SentimentResponse(BaseModel):
     confidence: float
     label: str
 
+class SentimentBatchRequest(BaseModel):
+    texts: List[str]
+    language: str = "mr"
+    languages: Optional[List[str]] = None # Per-text languages, overriding language
+
+class SentimentBatchResponse(BaseModel):
+    results: List[SentimentResponse]
+    count: int
+    unique_count: int
+    timestamp: str
+
 class NewsAnalysisRequest(BaseModel):
     title: str
     content: str
@@ -94,9 +146,31 @@ class WebScrapingResponse(BaseModel):
     mentions: int
     sentiment_score: float
 
+class FusionBatchItem(BaseModel):
+    symbol: str
+    market: Dict[str, float] = {}
+    news: Dict[str, float] = {}
+    social: Dict[str, float] = {}
+    satellite: Dict[str, Union[str, float]] = {}
+    web: Dict[str, float] = {}
+
+class FusionBatchRequest(BaseModel):
+    items: List[FusionBatchItem]
+    include_components: bool = False
+
+class FusionBatchResult(BaseModel):
+    symbol: str
+    fusion_score: float
+    signal: str
+    component_scores: Optional[Dict[str, float]] = None
+
+class FusionBatchResponse(BaseModel):
+    results: List[FusionBatchResult]
+    weights: Dict[str, float]
+    timestamp: str
+
 # Mock data storage
 market_data_cache = {}
-news_cache = []
 alerts_cache = []
 
 @app.get("/")
@@ -108,10 +182,16 @@ async def root():
         "endpoints": {
             "health": "/health",
             "sentiment": "/sentiment/analyze",
+            "sentiment_batch": "/sentiment/batch",
             "news": "/news/analyze",
+            "news_metrics": "/news/metrics",
+            "news_by_symbol": "/news/symbol/{symbol}",
+            "news_by_sector": "/news/sector/{sector}",
+            "news_replay": "/news/replay",
             "satellite": "/satellite/analyze",
             "social": "/social/analyze",
-            "web": "/web/scrape"
+            "web": "/web/scrape",
+            "fusion_batch": "/fusion/batch"
         }
     }
 
@@ -147,16 +227,47 @@ async def analyze_sentiment(request: SentimentRequest):
         logger.error(f"Error in sentiment analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Plain def: FastAPI runs it in its threadpool, so a large batch doesn't block the event loop
+@app.post("/sentiment/batch", response_model=SentimentBatchResponse)
+def analyze_sentiment_batch(request: SentimentBatchRequest):
+    try:
+        languages = request.languages or [request.language] * len(request.texts)
+        if len(languages) != len(request.texts):
+            raise HTTPException(status_code=400, detail="languages must have one entry per text")
+        
+        scores = sentiment_batch_engine.score(request.texts, languages)
+        
+        results = []
+        for score in scores:
+            if score['sentiment'] > 0.1:
+                label = "POSITIVE"
+            elif score['sentiment'] < -0.1:
+                label = "NEGATIVE"
+            else:
+                label = "NEUTRAL"
+            results.append(SentimentResponse(sentiment=score['sentiment'],
+                                             confidence=score['confidence'], label=label))
+        
+        return SentimentBatchResponse(
+            results=results,
+            count=len(results),
+            unique_count=len(set(zip(request.texts, languages))),
+            timestamp=datetime.now().isoformat()
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in batch sentiment analysis: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 async def perform_sentiment_analysis(text: str, language: str) -> tuple:
     # Mock sentiment analysis
     if language == "mr":
-        # Marathi sentiment analysis
-        positive_words = ['चांगले', 'उत्तम', 'सकारात्मक', 'वाढ', 'मुनाफा', 'जिंकले']
-        negative_words = ['वाईट', 'नकारात्मक', 'घट', 'तोटा', 'हारले', 'समस्या']
-        
-        text_lower = text.lower()
-        pos_count = sum(1 for word in positive_words if word in text_lower)
-        neg_count = sum(1 for word in negative_words if word in text_lower)
+        # Marathi sentiment analysis: one automaton pass finds every word present
+        matched = {index for _, _, index in marathi_matcher.find_all(text)}
+        pos_count = sum(1 for index in matched if marathi_matcher.scores[index] > 0)
+        neg_count = len(matched) - pos_count
         
         if pos_count + neg_count == 0:
             sentiment_score = 0
@@ -187,8 +298,8 @@ async def perform_sentiment_analysis(text: str, language: str) -> tuple:
 @app.post("/news/analyze", response_model=NewsAnalysisResponse)
 async def analyze_news(request: NewsAnalysisRequest):
     try:
-        # Use real news scraper
-        articles = news_scraper.fetch_news(language=request.language, limit=1)
+        # Latest ingested article; the background poller keeps the store fresh
+        articles = news_ingestor.latest(language=request.language, limit=1)
         
         if articles:
             article = articles[0]
@@ -219,25 +330,43 @@ async def analyze_news(request: NewsAnalysisRequest):
         logger.error(f"Error in news analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-async def categorize_news(title: str, content: str, source: str) -> str:
-    text = (title + " " + content).lower()
-    
-    sectors = {
-        "Oil & Gas": ["reliance", "oil", "gas", "petroleum", "refinery", "jamnagar"],
-        "IT": ["tcs", "infosys", "wipro", "hcl", "tech", "software", "digital"],
-        "Banking": ["hdfc", "sbi", "icici", "bank", "banking", "loan", "interest"],
-        "Pharma": ["sun pharma", "dr reddy", "cipla", "pharma", "medicine", "drug"],
-        "Auto": ["maruti", "tata motors", "mahindra", "auto", "car", "vehicle"],
-        "Realty": ["dlf", "realty", "property", "real estate", "construction"],
-        "FMCG": ["itc", "hul", "nestle", "fmcg", "consumer", "food"],
-        "Steel": ["tata steel", "jsw", "steel", "metal", "iron"]
+@app.get("/news/metrics")
+async def get_news_metrics():
+    return news_ingestor.metrics()
+
+@app.get("/news/symbol/{symbol}")
+async def get_news_by_symbol(symbol: str, start: Optional[str] = None, end: Optional[str] = None,
+                             limit: int = 10):
+    symbol_name = news_index.resolve(symbol)
+    if symbol_name is None:
+        raise HTTPException(status_code=404, detail=f"Unknown symbol: {symbol}")
+    return {
+        "symbol": symbol_name,
+        "articles": news_index.by_symbol(symbol_name, start, end, limit),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/news/sector/{sector}")
+async def get_news_by_sector(sector: str, start: Optional[str] = None, end: Optional[str] = None,
+                             limit: int = 10):
+    return {
+        "sector": sector,
+        "articles": news_index.by_sector(sector, start, end, limit),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/news/replay")
+async def replay_news(start: Optional[str] = None, end: Optional[str] = None, language: Optional[str] = None,
+                      limit: int = 1000):
+    articles = await asyncio.to_thread(news_cache.replay, start, end, language, limit)
+    return {
+        "articles": articles,
+        "count": len(articles),
+        "timestamp": datetime.now().isoformat()
     }
-    
-    for sector, keywords in sectors.items():
-        if any(keyword in text for keyword in keywords):
-            return sector
-    
-    return "General"
+
+async def categorize_news(title: str, content: str, source: str) -> str:
+    return news_index.categorize(title + " " + content)
 
 async def extract_keywords(text: str) -> list: # Removed language arg
     import re
@@ -479,6 +608,37 @@ async def calculate_fusion_score(sources: dict):
         logger.error(f"Error calculating fusion score: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/fusion/batch", response_model=FusionBatchResponse)
+async def calculate_fusion_batch(request: FusionBatchRequest):
+    try:
+        scores = fusion_scorer.calculate_fusion_scores_batch(
+            [item.model_dump(exclude={"symbol"}) for item in request.items]
+        )
+        
+        fusion_scores = scores["fusion_score"].round(2).tolist()
+        signals = scores["signal"].tolist()
+        components = scores[list(FusionScorer.SOURCES)].round(2).to_dict("records")
+        
+        results = [
+            FusionBatchResult(
+                symbol=item.symbol,
+                fusion_score=fusion_scores[i],
+                signal=signals[i],
+                component_scores=components[i] if request.include_components else None
+            )
+            for i, item in enumerate(request.items)
+        ]
+        
+        return FusionBatchResponse(
+            results=results,
+            weights=fusion_scorer.get_weights(),
+            timestamp=datetime.now().isoformat()
+        )
+        
+    except Exception as e:
+        logger.error(f"Error calculating batch fusion scores: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/market/indicators")
 async def get_market_indicators():
     return {
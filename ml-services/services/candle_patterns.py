@@ -0,0 +1,232 @@
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+try:
+    import talib
+    import talib.abstract
+except ImportError:  # Native library missing: use the pure-NumPy patterns below
+    talib = None
+
+# Direction of the TA-Lib patterns that only ever fire one way (or carry no
+# direction at all); every other pattern is split into Bullish/Bearish hits
+PATTERN_DIRECTIONS = {
+    'CDL2CROWS': 'bearish',
+    'CDL3BLACKCROWS': 'bearish',
+    'CDL3STARSINSOUTH': 'bullish',
+    'CDL3WHITESOLDIERS': 'bullish',
+    'CDLADVANCEBLOCK': 'bearish',
+    'CDLCONCEALBABYSWALL': 'bullish',
+    'CDLDARKCLOUDCOVER': 'bearish',
+    'CDLDOJI': 'neutral',
+    'CDLDRAGONFLYDOJI': 'neutral',
+    'CDLEVENINGDOJISTAR': 'bearish',
+    'CDLEVENINGSTAR': 'bearish',
+    'CDLGRAVESTONEDOJI': 'neutral',
+    'CDLHAMMER': 'bullish',
+    'CDLHANGINGMAN': 'bearish',
+    'CDLHOMINGPIGEON': 'bullish',
+    'CDLIDENTICAL3CROWS': 'bearish',
+    'CDLINNECK': 'bearish',
+    'CDLINVERTEDHAMMER': 'bullish',
+    'CDLLADDERBOTTOM': 'bullish',
+    'CDLLONGLEGGEDDOJI': 'neutral',
+    'CDLMATCHINGLOW': 'bullish',
+    'CDLMORNINGDOJISTAR': 'bullish',
+    'CDLMORNINGSTAR': 'bullish',
+    'CDLONNECK': 'bearish',
+    'CDLPIERCING': 'bullish',
+    'CDLRICKSHAWMAN': 'neutral',
+    'CDLSHOOTINGSTAR': 'bearish',
+    'CDLSTALLEDPATTERN': 'bearish',
+    'CDLSTICKSANDWICH': 'bullish',
+    'CDLTAKURI': 'bullish',
+    'CDLTHRUSTING': 'bearish',
+    'CDLUNIQUE3RIVER': 'bullish',
+    'CDLUPSIDEGAP2CROWS': 'bearish'
+}
+
+TALIB_CONFIDENCE = 0.9
+
+def _trailing_average(values: np.ndarray, period: int, factor: float) -> np.ndarray:
+    """TA-Lib candle average: factor * mean of the `period` values before each index."""
+    average = np.full(values.shape, np.nan)
+    if len(values) > period:
+        average[period:] = sliding_window_view(values[:-1], period).sum(axis=1) / period * factor
+    return average
+
+def _real_body(o: np.ndarray, c: np.ndarray) -> np.ndarray:
+    return np.abs(c - o)
+
+def _color(o: np.ndarray, c: np.ndarray) -> np.ndarray:
+    return np.where(c >= o, 1, -1)
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    shifted = np.full(values.shape, np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:-periods]
+    return shifted
+
+def _output(signal: np.ndarray, lookback: int) -> np.ndarray:
+    out = np.asarray(signal, dtype=np.int32)
+    out[:lookback] = 0
+    return out
+
+def cdl_doji(o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """NumPy port of TA-Lib CDLDOJI (body <= 10% of the average range of the prior 10 candles)."""
+    doji_body = _trailing_average(h - l, 10, 0.1)
+    return _output(np.where(_real_body(o, c) <= doji_body, 100, 0), 10)
+
+def cdl_engulfing(o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """NumPy port of TA-Lib CDLENGULFING (100/-100, or 80/-80 when a body edge is equal)."""
+    po, pc = _shift(o, 1), _shift(c, 1)
+    color, prev_color = _color(o, c), _color(po, pc)
+    
+    bullish = ((color == 1) & (prev_color == -1) &
+               (((c >= po) & (o < pc)) | ((c > po) & (o <= pc))))
+    bearish = ((color == -1) & (prev_color == 1) &
+               (((o >= pc) & (c < po)) | ((o > pc) & (c <= po))))
+    strength = np.where((o != pc) & (c != po), 100, 80)
+    
+    return _output(np.where(bullish | bearish, color * strength, 0), 2)
+
+def cdl_morningstar(o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray,
+                    penetration: float = 0.3) -> np.ndarray:
+    """NumPy port of TA-Lib CDLMORNINGSTAR."""
+    body = _real_body(o, c)
+    long_body = _trailing_average(body, 10, 1.0)
+    short_body = _trailing_average(body, 10, 1.0)
+    color = _color(o, c)
+    top, bottom = np.maximum(o, c), np.minimum(o, c)
+    
+    first, second = slice(0, -2), slice(1, -1)
+    signal = np.zeros(len(o), dtype=np.int32)
+    if len(o) > 2:
+        hit = ((body[first] > long_body[first]) & (color[first] == -1) &
+               (body[second] <= short_body[second]) &
+               (top[second] < bottom[first]) &  # Real body gap down
+               (body[2:] > short_body[2:]) & (color[2:] == 1) &
+               (c[2:] > c[first] + body[first] * penetration))
+        signal[2:] = np.where(hit, 100, 0)
+    return _output(signal, 12)
+
+def cdl_eveningstar(o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray,
+                    penetration: float = 0.3) -> np.ndarray:
+    """NumPy port of TA-Lib CDLEVENINGSTAR."""
+    body = _real_body(o, c)
+    long_body = _trailing_average(body, 10, 1.0)
+    short_body = _trailing_average(body, 10, 1.0)
+    color = _color(o, c)
+    top, bottom = np.maximum(o, c), np.minimum(o, c)
+    
+    first, second = slice(0, -2), slice(1, -1)
+    signal = np.zeros(len(o), dtype=np.int32)
+    if len(o) > 2:
+        hit = ((body[first] > long_body[first]) & (color[first] == 1) &
+               (body[second] <= short_body[second]) &
+               (bottom[second] > top[first]) &  # Real body gap up
+               (body[2:] > short_body[2:]) & (color[2:] == -1) &
+               (c[2:] < c[first] - body[first] * penetration))
+        signal[2:] = np.where(hit, -100, 0)
+    return _output(signal, 12)
+
+# Pure-NumPy stand-ins used when TA-Lib is not importable: (function, display name, lookback)
+FALLBACK_PATTERNS = {
+    'CDLDOJI': (cdl_doji, 'Doji', 10),
+    'CDLENGULFING': (cdl_engulfing, 'Engulfing Pattern', 2),
+    'CDLEVENINGSTAR': (cdl_eveningstar, 'Evening Star', 12),
+    'CDLMORNINGSTAR': (cdl_morningstar, 'Morning Star', 12)
+}
+
+class CandlestickRegistry:
+    """
+    Registry of the CDL* candlestick pattern functions evaluated by PatternDetector.
+    
+    Uses the full TA-Lib pattern family when TA-Lib is importable and the NumPy
+    ports in FALLBACK_PATTERNS otherwise. All functions run over the same
+    contiguous float64 arrays, and hits are collected with np.flatnonzero.
+    """
+    
+    def __init__(self, functions: Optional[List[str]] = None, use_talib: Optional[bool] = None):
+        """Initialize the registry.
+        
+        Args:
+            functions: CDL* function names to evaluate (default: every available one)
+            use_talib: Force (True) or disable (False) TA-Lib (default: use it if importable)
+        """
+        self.use_talib = talib is not None if use_talib is None else use_talib
+        if self.use_talib and talib is None:
+            raise ImportError("TA-Lib is not installed")
+        
+        if self.use_talib:
+            available = talib.get_function_groups()['Pattern Recognition']
+        else:
+            available = sorted(FALLBACK_PATTERNS)
+        
+        if functions is None:
+            functions = available
+        else:
+            missing = [name for name in functions if name not in available]
+            if missing:
+                logger.warning(f"Candlestick functions not available, skipping: {missing}")
+            functions = [name for name in functions if name in available]
+        
+        # (function name, callable, display name, direction, lookback)
+        self.patterns: List[Tuple[str, Callable, str, str, int]] = []
+        # Result label -> 'bullish', 'bearish' or 'neutral'
+        self.directions: Dict[str, str] = {}
+        for name in functions:
+            function, display, lookback = self._resolve(name)
+            direction = PATTERN_DIRECTIONS.get(name, 'both')
+            self.patterns.append((name, function, display, direction, lookback))
+            if direction == 'both':
+                self.directions[f"Bullish {display} (TA-Lib)"] = 'bullish'
+                self.directions[f"Bearish {display} (TA-Lib)"] = 'bearish'
+            else:
+                self.directions[f"{display} (TA-Lib)"] = direction
+        
+        logger.info(f"Candlestick registry using {'TA-Lib' if self.use_talib else 'NumPy fallbacks'} "
+                    f"with {len(self.patterns)} patterns")
+    
+    @property
+    def lookback(self) -> int:
+        """Number of prior candles the registered patterns need to evaluate a candle."""
+        return max((lookback for *_, lookback in self.patterns), default=0)
+    
+    def evaluate(self, opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                 closes: np.ndarray) -> Dict[str, Tuple[np.ndarray, float]]:
+        """Run every registered pattern over contiguous float64 OHLC arrays.
+        
+        Returns:
+            Dictionary mapping result labels to (positional indices, confidence)
+            for every label with at least one hit
+        """
+        results = {}
+        for name, function, display, direction, _ in self.patterns:
+            output = function(opens, highs, lows, closes)
+            
+            if direction in ('bullish', 'neutral'):
+                hits = {f"{display} (TA-Lib)": output > 0 if direction == 'bullish' else output != 0}
+            elif direction == 'bearish':
+                hits = {f"{display} (TA-Lib)": output < 0}
+            else:
+                hits = {f"Bullish {display} (TA-Lib)": output > 0,
+                        f"Bearish {display} (TA-Lib)": output < 0}
+            
+            for label, mask in hits.items():
+                indices = np.flatnonzero(mask)
+                if len(indices):
+                    results[label] = (indices, TALIB_CONFIDENCE)
+        
+        return results
+    
+    def _resolve(self, name: str) -> Tuple[Callable, str, int]:
+        """Get the function, display name and lookback of a pattern."""
+        if not self.use_talib:
+            return FALLBACK_PATTERNS[name]
+        
+        info = talib.abstract.Function(name)
+        return getattr(talib, name), info.info['display_name'], info.lookback
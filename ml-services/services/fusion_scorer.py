@@ -13,6 +13,49 @@ class FusionScorer:
     social media sentiment, satellite data, and web scraping results.
     """
     
+    SOURCES = ('market', 'news', 'social', 'satellite', 'web')
+    
+    # Historical column names and the defaults used when a value is missing
+    HISTORICAL_DEFAULTS = {
+        'rsi': 50.0,
+        'macd': 0.0,
+        'adx': 25.0,
+        'news_sentiment': 0.0,
+        'news_confidence': 0.5,
+        'bullish_percent': 50.0,
+        'bearish_percent': 50.0,
+        'satellite_confidence': 0.5,
+        'activity_level': 'normal',
+        'web_sentiment': 0.0,
+        'web_ranking': 10.0
+    }
+    
+    # Payload fields per source and the historical column each one maps to
+    SOURCE_FIELDS = {
+        'market': {'rsi': 'rsi', 'macd': 'macd', 'adx': 'adx'},
+        'news': {'sentiment': 'news_sentiment', 'confidence': 'news_confidence'},
+        'social': {'bullish_percentage': 'bullish_percent', 'bearish_percentage': 'bearish_percent'},
+        'satellite': {'activity_level': 'activity_level', 'confidence': 'satellite_confidence'},
+        'web': {'sentiment_score': 'web_sentiment', 'average_ranking': 'web_ranking'}
+    }
+    
+    # Defaults calculate_fusion_score applies to fields missing from a payload
+    SOURCE_DEFAULTS = {
+        **HISTORICAL_DEFAULTS,
+        'bullish_percent': 0.0,
+        'bearish_percent': 0.0
+    }
+    
+    ACTIVITY_SCORES = {
+        'high': 80,
+        'normal': 50,
+        'low': 20
+    }
+    
+    # Lower bounds of the SELL, NEUTRAL, BUY and STRONG_BUY bands
+    SIGNAL_THRESHOLDS = np.array([20.0, 40.0, 60.0, 80.0])
+    SIGNAL_LABELS = np.array(['STRONG_SELL', 'SELL', 'NEUTRAL', 'BUY', 'STRONG_BUY'], dtype=object)
+    
     def __init__(self, weights: Optional[Dict[str, float]] = None):
         """
         Initialize the fusion scorer with optional custom weights.
@@ -74,6 +117,28 @@ class FusionScorer:
             'timestamp': datetime.utcnow().isoformat()
         }
     
+    def calculate_component_score(self, source: str, data: Dict) -> float:
+        """Calculate the 0-100 score of a single source.
+        
+        Args:
+            source: One of 'market', 'news', 'social', 'satellite', 'web'
+            data: Source data in the shape calculate_fusion_score expects
+            
+        Returns:
+            Component score for the source
+        """
+        calculators = {
+            'market': self._calculate_market_score,
+            'news': self._calculate_news_score,
+            'social': self._calculate_social_score,
+            'satellite': self._calculate_satellite_score,
+            'web': self._calculate_web_score
+        }
+        if source not in calculators:
+            raise ValueError(f"Unknown fusion source: {source}")
+        
+        return float(calculators[source](data))
+    
     def _calculate_market_score(self, market_data: Dict) -> float:
         """Calculate score from market data (technical indicators, price action)."""
         if not market_data:
@@ -150,13 +215,7 @@ class FusionScorer:
             confidence = satellite_data.get('confidence', 0.5)
             
             # Map activity levels to scores
-            activity_scores = {
-                'high': 80,
-                'normal': 50,
-                'low': 20
-            }
-            
-            score = activity_scores.get(activity.lower(), 50) * confidence
+            score = self.ACTIVITY_SCORES.get(activity.lower(), 50) * confidence
             return max(0, min(100, score))
             
         except Exception as e:
@@ -221,40 +280,194 @@ class FusionScorer:
         """Get the current weights used for fusion scoring."""
         return self.weights.copy()
     
-    def get_historical_scores(self, historical_data: pd.DataFrame) -> pd.DataFrame:
+    def get_historical_scores(self, historical_data: pd.DataFrame, columnar: bool = True) -> pd.DataFrame:
         """Calculate fusion scores for historical data.
         
+        Args:
+            historical_data: DataFrame with columns for each data source
+            columnar: Score whole columns with NumPy instead of walking rows
+                      through calculate_fusion_score (default: True)
+            
+        Returns:
+            DataFrame with fusion scores and component scores over time. The
+            columnar path returns each component score as a column named after
+            its source; the row-wise path returns them as a component_scores dict
+            per row, as calculate_fusion_score does
+        """
+        if not columnar:
+            return self._get_historical_scores_rowwise(historical_data)
+        
+        scores = self.score_columns(historical_data)
+        
+        if 'timestamp' in historical_data.columns:
+            timestamps = historical_data['timestamp'].to_numpy()
+        else:
+            timestamps = pd.Timestamp.utcnow().isoformat()
+        
+        return pd.DataFrame({
+            'fusion_score': scores['fusion_score'].round(2).to_numpy(),
+            'signal': scores['signal'].to_numpy(),
+            **{source: scores[source].to_numpy() for source in self.SOURCES},
+            'weights': [self.weights] * len(historical_data),
+            'timestamp': timestamps
+        })
+    
+    def score_columns(self, historical_data: pd.DataFrame) -> pd.DataFrame:
+        """Score every row of a historical frame as whole-column array operations.
+        
+        Uses the same column names and defaults as get_historical_scores; missing
+        columns or NaN cells fall back to the neutral defaults.
+        
         Args:
             historical_data: DataFrame with columns for each data source
             
         Returns:
-            DataFrame with fusion scores and component scores over time
+            DataFrame with one column per component score, the unrounded
+            fusion_score and its signal, aligned with the input index
         """
+        components = self._component_columns(historical_data, self.HISTORICAL_DEFAULTS)
+        return self._scores_frame(components, historical_data.index)
+    
+    def calculate_fusion_scores_batch(self, batch: List[Dict[str, Dict]]) -> pd.DataFrame:
+        """Calculate fusion scores for many source payloads in one vectorized pass.
+        
+        Each payload has the same shape as the sources argument of
+        calculate_fusion_score and is scored identically: a missing or empty
+        component scores a neutral 50, missing fields use the same defaults.
+        
+        Args:
+            batch: List of source dictionaries, one per symbol
+            
+        Returns:
+            DataFrame with one row per payload holding the component scores,
+            the unrounded fusion_score and its signal
+        """
+        columns = {}
+        present = {}
+        for source, fields in self.SOURCE_FIELDS.items():
+            payloads = [sources.get(source) or {} for sources in batch]
+            present[source] = np.array([bool(payload) for payload in payloads], dtype=bool)
+            for field, column in fields.items():
+                default = self.SOURCE_DEFAULTS[column]
+                columns[column] = [payload.get(field, default) for payload in payloads]
+        
+        frame = pd.DataFrame(columns, index=pd.RangeIndex(len(batch)))
+        components = self._component_columns(frame, self.SOURCE_DEFAULTS)
+        for source, mask in present.items():
+            components[source] = np.where(mask, components[source], 50.0)
+        
+        return self._scores_frame(components, frame.index)
+    
+    def _component_columns(self, frame: pd.DataFrame, defaults: Dict) -> Dict[str, np.ndarray]:
+        """Compute every component score as an array over the rows of frame."""
+        def column(name: str) -> np.ndarray:
+            default = defaults[name]
+            if name not in frame.columns:
+                return np.full(len(frame), default, dtype=np.float64)
+            values = frame[name]
+            if not pd.api.types.is_numeric_dtype(values):
+                values = pd.to_numeric(values, errors='coerce')
+            values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            return np.where(np.isnan(values), default, values)
+        
+        if 'activity_level' in frame.columns:
+            activity = frame['activity_level'].fillna(defaults['activity_level'])
+        else:
+            activity = pd.Series(defaults['activity_level'], index=frame.index)
+        
+        return {
+            'market': self._market_scores(column('rsi'), column('macd'), column('adx')),
+            'news': self._news_scores(column('news_sentiment'), column('news_confidence')),
+            'social': self._social_scores(column('bullish_percent'), column('bearish_percent')),
+            'satellite': self._satellite_scores(activity, column('satellite_confidence')),
+            'web': self._web_scores(column('web_sentiment'), column('web_ranking'))
+        }
+    
+    def _scores_frame(self, components: Dict[str, np.ndarray], index: pd.Index) -> pd.DataFrame:
+        """Fuse component score arrays into a frame with fusion_score and signal."""
+        fusion_scores = self._fuse(components)
+        
+        result = pd.DataFrame(components, index=index)
+        result['fusion_score'] = fusion_scores
+        result['signal'] = self._get_signals(fusion_scores)
+        return result
+    
+    def _market_scores(self, rsi: np.ndarray, macd: np.ndarray, adx: np.ndarray) -> np.ndarray:
+        """Array form of _calculate_market_score."""
+        return np.clip(rsi * 0.4 + (50 + macd * 10) * 0.4 + adx * 0.2, 0, 100)
+    
+    def _news_scores(self, sentiment: np.ndarray, confidence: np.ndarray) -> np.ndarray:
+        """Array form of _calculate_news_score."""
+        return np.clip(50 + sentiment * 50 * confidence, 0, 100)
+    
+    def _social_scores(self, bullish: np.ndarray, bearish: np.ndarray) -> np.ndarray:
+        """Array form of _calculate_social_score."""
+        total = bullish + bearish
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(total > 0, bullish / total * 100, 50.0)
+    
+    def _satellite_scores(self, activity: pd.Series, confidence: np.ndarray) -> np.ndarray:
+        """Array form of _calculate_satellite_score."""
+        # Resolve each distinct activity level once, then broadcast by code
+        codes, levels = pd.factorize(activity)
+        level_scores = np.array(
+            [self.ACTIVITY_SCORES.get(level.lower(), 50) if isinstance(level, str) else np.nan
+             for level in levels] + [np.nan],
+            dtype=np.float64
+        )[codes]
+        # Non-text activity levels make the scalar path fall back to neutral
+        return np.where(np.isnan(level_scores), 50.0, np.clip(level_scores * confidence, 0, 100))
+    
+    def _web_scores(self, sentiment: np.ndarray, ranking: np.ndarray) -> np.ndarray:
+        """Array form of _calculate_web_score."""
+        sentiment_score = 50 + sentiment * 50
+        ranking_score = np.maximum(0, 100 - ranking * 5)
+        return np.clip(sentiment_score * 0.6 + ranking_score * 0.4, 0, 100)
+    
+    def _fuse(self, components: Dict[str, np.ndarray]) -> np.ndarray:
+        """Weighted sum of component score arrays, clipped to 0-100."""
+        fusion_scores = np.zeros_like(next(iter(components.values())), dtype=np.float64)
+        for source, weight in self.weights.items():
+            fusion_scores += components[source] * weight
+        return np.clip(fusion_scores, 0, 100)
+    
+    def _get_signals(self, scores: np.ndarray) -> np.ndarray:
+        """Array form of _get_signal."""
+        bands = np.searchsorted(self.SIGNAL_THRESHOLDS, scores, side='right')
+        return self.SIGNAL_LABELS[bands]
+    
+    def _get_historical_scores_rowwise(self, historical_data: pd.DataFrame) -> pd.DataFrame:
+        """Row-by-row reference implementation of get_historical_scores."""
         scores = []
         
         for _, row in historical_data.iterrows():
+            def value(column: str):
+                # Missing columns and NaN cells use the defaults, as in score_columns
+                cell = row.get(column)
+                return self.HISTORICAL_DEFAULTS[column] if cell is None or pd.isna(cell) else cell
+            
             # Extract source data from the row
             sources = {
                 'market': {
-                    'rsi': row.get('rsi', 50),
-                    'macd': row.get('macd', 0),
-                    'adx': row.get('adx', 25)
+                    'rsi': value('rsi'),
+                    'macd': value('macd'),
+                    'adx': value('adx')
                 },
                 'news': {
-                    'sentiment': row.get('news_sentiment', 0),
-                    'confidence': row.get('news_confidence', 0.5)
+                    'sentiment': value('news_sentiment'),
+                    'confidence': value('news_confidence')
                 },
                 'social': {
-                    'bullish_percentage': row.get('bullish_percent', 50),
-                    'bearish_percentage': row.get('bearish_percent', 50)
+                    'bullish_percentage': value('bullish_percent'),
+                    'bearish_percentage': value('bearish_percent')
                 },
                 'satellite': {
-                    'activity_level': row.get('activity_level', 'normal'),
-                    'confidence': row.get('satellite_confidence', 0.5)
+                    'activity_level': value('activity_level'),
+                    'confidence': value('satellite_confidence')
                 },
                 'web': {
-                    'sentiment_score': row.get('web_sentiment', 0),
-                    'average_ranking': row.get('web_ranking', 10)
+                    'sentiment_score': value('web_sentiment'),
+                    'average_ranking': value('web_ranking')
                 }
             }
             
@@ -0,0 +1,159 @@
+import logging
+from typing import Callable, Dict, List, Optional
+from datetime import datetime
+
+from services.fusion_scorer import FusionScorer
+
+logger = logging.getLogger(__name__)
+
+class FusionStore:
+    """
+    Stateful per-symbol fusion scores with component-level updates.
+    
+    Keeps the latest component score of every source per symbol, so pushing a new
+    market tuple or news sentiment only recomputes that one component and the
+    weighted sum. Listeners are notified when a symbol's signal band flips.
+    """
+    
+    NEUTRAL_SCORE = 50.0
+    
+    def __init__(self, scorer: Optional[FusionScorer] = None):
+        """Initialize the store.
+        
+        Args:
+            scorer: FusionScorer providing weights and component formulas
+                    (default: a scorer with default weights)
+        """
+        self.scorer = scorer or FusionScorer()
+        self.components: Dict[str, Dict[str, float]] = {}
+        self.scores: Dict[str, float] = {}
+        self.signals: Dict[str, str] = {}
+        self.updated_at: Dict[str, str] = {}
+        self.listeners: List[Callable[[Dict], None]] = []
+    
+    def subscribe(self, listener: Callable[[Dict], None]) -> None:
+        """Register a callback invoked with each signal change event."""
+        self.listeners.append(listener)
+    
+    def unsubscribe(self, listener: Callable[[Dict], None]) -> None:
+        """Remove a previously registered callback."""
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+    
+    def update(self, symbol: str, source: str, data: Dict) -> Optional[Dict]:
+        """Push new data for one source of a symbol.
+        
+        Args:
+            symbol: Stock symbol
+            source: One of 'market', 'news', 'social', 'satellite', 'web'
+            data: Source data in the shape FusionScorer.calculate_fusion_score expects
+            
+        Returns:
+            The signal change event if the signal band flipped, otherwise None
+        """
+        score = self.scorer.calculate_component_score(source, data)
+        return self.set_component_score(symbol, source, score)
+    
+    def update_market(self, symbol: str, rsi: float, macd: float, adx: float) -> Optional[Dict]:
+        """Push a new RSI/MACD/ADX tuple for a symbol."""
+        return self.update(symbol, 'market', {'rsi': rsi, 'macd': macd, 'adx': adx})
+    
+    def update_news(self, symbol: str, sentiment: float, confidence: float) -> Optional[Dict]:
+        """Push a new news sentiment (-1 to 1) and its confidence for a symbol."""
+        return self.update(symbol, 'news', {'sentiment': sentiment, 'confidence': confidence})
+    
+    def set_component_score(self, symbol: str, source: str, score: float) -> Optional[Dict]:
+        """Set an already computed 0-100 component score for a symbol.
+        
+        Args:
+            symbol: Stock symbol
+            source: One of 'market', 'news', 'social', 'satellite', 'web'
+            score: Component score
+            
+        Returns:
+            The signal change event if the signal band flipped, otherwise None
+        """
+        if source not in FusionScorer.SOURCES:
+            raise ValueError(f"Unknown fusion source: {source}")
+        
+        components = self.components.get(symbol)
+        if components is None:
+            components = dict.fromkeys(FusionScorer.SOURCES, self.NEUTRAL_SCORE)
+            self.components[symbol] = components
+            self.signals[symbol] = self.scorer._get_signal(self.NEUTRAL_SCORE)
+        
+        components[source] = score
+        return self._rescore(symbol, source)
+    
+    def _rescore(self, symbol: str, source: Optional[str] = None) -> Optional[Dict]:
+        """Recompute the weighted score of one symbol and emit on a band flip."""
+        components = self.components[symbol]
+        fusion_score = sum(components[s] * weight for s, weight in self.scorer.weights.items())
+        fusion_score = max(0, min(100, fusion_score))
+        
+        previous_signal = self.signals[symbol]
+        signal = self.scorer._get_signal(fusion_score)
+        
+        self.scores[symbol] = fusion_score
+        self.signals[symbol] = signal
+        self.updated_at[symbol] = datetime.utcnow().isoformat()
+        
+        if signal == previous_signal:
+            return None
+        
+        event = {
+            'symbol': symbol,
+            'previous_signal': previous_signal,
+            'signal': signal,
+            'fusion_score': round(fusion_score, 2),
+            'source': source,
+            'timestamp': self.updated_at[symbol]
+        }
+        for listener in list(self.listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Error in fusion signal listener for {symbol}: {str(e)}")
+        
+        return event
+    
+    def refresh_weights(self) -> List[Dict]:
+        """Rescore every symbol after the scorer's weights changed.
+        
+        Returns:
+            Signal change events caused by the new weights
+        """
+        events = []
+        for symbol in self.components:
+            event = self._rescore(symbol)
+            if event:
+                events.append(event)
+        return events
+    
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Get the current fusion result of a symbol.
+        
+        Returns:
+            Dictionary shaped like FusionScorer.calculate_fusion_score, or None
+            if nothing was pushed for the symbol yet
+        """
+        if symbol not in self.components:
+            return None
+        
+        return {
+            'symbol': symbol,
+            'fusion_score': round(self.scores[symbol], 2),
+            'signal': self.signals[symbol],
+            'component_scores': self.components[symbol].copy(),
+            'weights': self.scorer.get_weights(),
+            'timestamp': self.updated_at[symbol]
+        }
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """Get the current fusion result of every tracked symbol."""
+        return {symbol: self.get(symbol) for symbol in self.components}
+    
+    def remove(self, symbol: str) -> None:
+        """Stop tracking a symbol."""
+        for state in (self.components, self.scores, self.signals, self.updated_at):
+            state.pop(symbol, None)
@@ -0,0 +1,133 @@
+import logging
+import re
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Indic script blocks (Devanagari to Sinhala) without the danda punctuation.
+# Their vowel signs and viramas are combining marks that `\w` does not match.
+_INDIC = '\u0900-\u0963\u0966-\u0DFF'
+_NOISE = re.compile(r'http\S+|www.\S+|@\w+|#\w+')
+_PUNCTUATION = re.compile(rf'[^\w\s{_INDIC}]')
+
+def normalize_text(text: str) -> str:
+    """Lowercase text and drop URLs, mentions, hashtags and punctuation.
+    
+    Words are left separated by single spaces, with Indic vowel signs intact.
+    """
+    text = _NOISE.sub('', text.lower())
+    return ' '.join(_PUNCTUATION.sub(' ', text).split())
+
+class LexiconMatcher:
+    """
+    Aho-Corasick automaton over the phrases of a sentiment lexicon.
+    
+    The automaton is built once. Every lexicon phrase, single words and
+    multi-word phrases such as "नफा वसुली" alike, is then found in one linear
+    pass over the normalized text, however many entries the lexicon holds.
+    """
+    
+    def __init__(self, lexicon: Dict[str, float], whole_words: bool = True):
+        """Build the automaton.
+        
+        Args:
+            lexicon: Mapping of words or phrases to sentiment scores
+            whole_words: Only match phrases bounded by spaces or the text edges
+                (False matches them anywhere, like a substring check)
+        """
+        self.whole_words = whole_words
+        self.phrases: List[str] = []
+        self.scores: List[float] = []
+        
+        # State 0 is the root; goto[state] maps a character to the next state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        
+        for phrase, score in lexicon.items():
+            phrase = normalize_text(str(phrase))
+            if phrase:
+                self._insert(phrase, float(score))
+        self._link()
+    
+    def __len__(self) -> int:
+        return len(self.phrases)
+    
+    def _insert(self, phrase: str, score: float) -> None:
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        
+        if self._output[state]:
+            # Duplicate after normalization: the last score wins, as with a dict
+            self.scores[self._output[state][0]] = score
+            return
+        self._output[state].append(len(self.phrases))
+        self.phrases.append(phrase)
+        self.scores.append(score)
+    
+    def _link(self) -> None:
+        """Set failure links breadth-first and merge the outputs they lead to."""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def find_all(self, text: str, normalized: bool = False) -> List[Tuple[int, int, int]]:
+        """Find every (possibly overlapping) lexicon phrase in the text.
+        
+        Args:
+            text: Input text
+            normalized: Whether the text already went through normalize_text
+        
+        Returns:
+            List of (start, end, phrase index) tuples ordered by end position
+        """
+        if not normalized:
+            text = normalize_text(text)
+        
+        goto, fail, output, phrases = self._goto, self._fail, self._output, self.phrases
+        matches = []
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            
+            for index in output[state]:
+                start = end - len(phrases[index])
+                if self.whole_words and ((start and text[start - 1] != ' ') or
+                                         (end < len(text) and text[end] != ' ')):
+                    continue
+                matches.append((start, end, index))
+        return matches
+    
+    def match(self, text: str, normalized: bool = False) -> List[Tuple[str, float]]:
+        """Find lexicon phrases, keeping the leftmost-longest ones that do not overlap.
+        
+        "नफा वसुली" is therefore scored as one phrase rather than also as "नफा".
+        
+        Returns:
+            List of (phrase, score) tuples in text order
+        """
+        matches = sorted(self.find_all(text, normalized), key=lambda match: (match[0], -match[1]))
+        
+        selected = []
+        covered = 0
+        for start, end, index in matches:
+            if start >= covered:
+                selected.append((self.phrases[index], self.scores[index]))
+                covered = end
+        return selected
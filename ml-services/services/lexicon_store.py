@@ -0,0 +1,181 @@
+import argparse
+import csv
+import hashlib
+import logging
+import os
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from services.lexicon_matcher import normalize_text
+
+logger = logging.getLogger(__name__)
+
+LEXICON_MAGIC = b'LEX1'
+LEXICON_FORMAT_VERSION = 1
+
+# magic, format version, term count, longest phrase in words, source mtime_ns, source size
+_HEADER = struct.Struct('<4sIIIqq')
+
+def term_hash(phrase: str) -> int:
+    """64-bit hash of a normalized lexicon phrase."""
+    return int.from_bytes(hashlib.blake2b(phrase.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def read_lexicon_csv(csv_path: str) -> Dict[str, float]:
+    """Read a word,sentiment lexicon CSV into a dict."""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        return {row['word']: float(row['sentiment']) for row in csv.DictReader(f)}
+
+def compile_lexicon(csv_path: str, out_path: str, exclude: Iterable[str] = ()) -> int:
+    """Compile a lexicon CSV into a sorted binary table of term hashes and scores.
+    
+    The file is written next to its destination and renamed over it, so readers
+    either map the previous version or the new one, never a partial file.
+    
+    Args:
+        csv_path: Lexicon CSV with word and sentiment columns
+        out_path: Destination of the binary lexicon
+        exclude: Words left out of the table (e.g. stopwords)
+    
+    Returns:
+        Number of terms compiled
+    """
+    excluded = set(exclude)
+    terms: Dict[int, float] = {}
+    max_words = 0
+    for phrase, score in read_lexicon_csv(csv_path).items():
+        phrase = normalize_text(str(phrase))
+        if not phrase or phrase in excluded:
+            continue
+        terms[term_hash(phrase)] = score  # Duplicates after normalization: the last one wins
+        max_words = max(max_words, phrase.count(' ') + 1)
+    
+    hashes = np.fromiter(terms.keys(), dtype='<u8', count=len(terms))
+    scores = np.fromiter(terms.values(), dtype='<f8', count=len(terms))
+    order = np.argsort(hashes, kind='stable')
+    
+    stat = os.stat(csv_path)
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(LEXICON_MAGIC, LEXICON_FORMAT_VERSION, len(terms), max_words,
+                             stat.st_mtime_ns, stat.st_size))
+        f.write(hashes[order].tobytes())
+        f.write(scores[order].tobytes())
+    os.replace(tmp_path, out_path)
+    
+    logger.info(f"Compiled {len(terms)} lexicon terms from {csv_path} into {out_path}")
+    return len(terms)
+
+def read_header(path: str) -> Optional[Tuple[int, int, int, int]]:
+    """Read (term count, longest phrase in words, source mtime_ns, source size), or None if invalid."""
+    try:
+        with open(path, 'rb') as f:
+            magic, version, count, max_words, mtime_ns, size = _HEADER.unpack(f.read(_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if magic != LEXICON_MAGIC or version != LEXICON_FORMAT_VERSION:
+        return None
+    return count, max_words, mtime_ns, size
+
+def is_current(path: str, csv_path: str) -> bool:
+    """Whether a compiled lexicon was built from the current version of its CSV."""
+    header = read_header(path)
+    if header is None:
+        return False
+    stat = os.stat(csv_path)
+    return header[2:] == (stat.st_mtime_ns, stat.st_size)
+
+class MappedLexicon:
+    """
+    Read-only view of a compiled lexicon through a memory map.
+    
+    Every process mapping the same file shares one page-cache copy. Terms are
+    found by binary search over the sorted hashes, and phrases by hashing each
+    run of up to `max_words` tokens. This gives the same leftmost-longest
+    matches as LexiconMatcher in whole-word mode.
+    """
+    
+    def __init__(self, path: str):
+        """Map a compiled lexicon.
+        
+        Args:
+            path: Path of the binary lexicon
+        """
+        header = read_header(path)
+        if header is None:
+            raise ValueError(f"Not a compiled lexicon: {path}")
+        self.path = path
+        self.count, self.max_words = header[:2]
+        self.identity = self._identity(path)
+        
+        if self.count:
+            self.hashes = np.memmap(path, dtype='<u8', mode='r', offset=_HEADER.size, shape=(self.count,))
+            self.scores = np.memmap(path, dtype='<f8', mode='r', offset=_HEADER.size + 8 * self.count,
+                                    shape=(self.count,))
+        else:
+            self.hashes = np.zeros(0, dtype='<u8')
+            self.scores = np.zeros(0, dtype='<f8')
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    @staticmethod
+    def _identity(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_ino, stat.st_mtime_ns
+    
+    def is_stale(self) -> bool:
+        """Whether a new version has been swapped in at the path since it was mapped."""
+        try:
+            return self._identity(self.path) != self.identity
+        except OSError:
+            return False
+    
+    def lookup(self, phrases: List[str]) -> np.ndarray:
+        """Get the scores of normalized phrases (NaN where a phrase is not in the lexicon)."""
+        hashes = np.fromiter((term_hash(phrase) for phrase in phrases), dtype='<u8', count=len(phrases))
+        scores = np.full(len(phrases), np.nan)
+        if self.count and len(phrases):
+            positions = np.minimum(np.searchsorted(self.hashes, hashes), self.count - 1)
+            found = self.hashes[positions] == hashes
+            scores[found] = self.scores[positions[found]]
+        return scores
+    
+    def match(self, text: str, normalized: bool = False) -> List[Tuple[str, float]]:
+        """Find lexicon phrases, keeping the leftmost-longest ones that do not overlap.
+        
+        Returns:
+            List of (phrase, score) tuples in text order
+        """
+        tokens = (text if normalized else normalize_text(text)).split()
+        
+        # Every run of up to max_words tokens, longest first at each start
+        spans = [(start, end) for start in range(len(tokens))
+                 for end in range(min(start + self.max_words, len(tokens)), start, -1)]
+        phrases = [' '.join(tokens[start:end]) for start, end in spans]
+        scores = self.lookup(phrases)
+        
+        selected = []
+        covered = 0
+        for (start, end), phrase, score in zip(spans, phrases, scores):
+            if start >= covered and not np.isnan(score):
+                selected.append((phrase, float(score)))
+                covered = end
+        return selected
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Compile every *_words.csv lexicon (python -m services.lexicon_store)."""
+    from services.sentiment_analyzer import SentimentAnalyzer
+    
+    parser = argparse.ArgumentParser(description="Compile sentiment lexicons into memory-mappable binaries")
+    parser.add_argument('--lexicons-dir', help="Directory with the *_words.csv lexicons")
+    parser.add_argument('--cache-dir', help="Directory for the compiled lexicons")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO)
+    analyzer = SentimentAnalyzer(args.lexicons_dir, args.cache_dir)
+    for language in analyzer.languages:
+        analyzer.compile_lexicon(language)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from services.price_predictor import PricePredictor
+
+logger = logging.getLogger(__name__)
+
+def _version_key(version: str) -> list:
+    """Sort key comparing the digit runs of a version numerically ('v2' before 'v10')."""
+    return [(0, int(part), '') if part.isdigit() else (1, 0, part) for part in re.split(r'(\d+)', version)]
+
+class ModelRegistry:
+    """
+    Per-symbol PricePredictor registry with LRU residency.
+    
+    Artifacts live under <models_dir>/<SYMBOL>/<version>.pkl (plus the matching
+    _scaler.pkl written by PricePredictor.save_model). Models are loaded with
+    joblib memory mapping, which spares the transient read buffers of a load;
+    scikit-learn still copies each tree's node arrays into memory of its own
+    when unpickling, so memory is bounded by keeping at most max_models
+    predictors resident at once.
+    """
+    
+    def __init__(self, models_dir: str = None, max_models: int = 32,
+                 lookback: int = 60, mmap_mode: Optional[str] = 'r'):
+        """Initialize the registry.
+        
+        Args:
+            models_dir: Root directory of the per-symbol model artifacts
+            max_models: Maximum number of resident predictors
+            lookback: Lookback used to construct the predictors
+            mmap_mode: joblib mmap mode for loading (None loads fully into memory)
+        """
+        self.models_dir = models_dir or os.path.join(os.path.dirname(__file__), '..', 'models')
+        self.max_models = max_models
+        self.lookback = lookback
+        self.mmap_mode = mmap_mode
+        
+        self._resident: "OrderedDict[Tuple[str, str], PricePredictor]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def model_path(self, symbol: str, version: str) -> str:
+        """Get the artifact path (without extension) of a symbol's model version."""
+        return os.path.join(self.models_dir, symbol.upper(), version)
+    
+    def versions(self, symbol: str) -> List[str]:
+        """List the stored versions of a symbol's model, oldest first."""
+        symbol_dir = os.path.join(self.models_dir, symbol.upper())
+        if not os.path.isdir(symbol_dir):
+            return []
+        
+        versions = [
+            filename[:-len('.pkl')] for filename in os.listdir(symbol_dir)
+            if filename.endswith('.pkl') and not filename.endswith('_scaler.pkl')
+        ]
+        return sorted(versions, key=_version_key)
+    
+    def latest_version(self, symbol: str) -> Optional[str]:
+        """Get the newest stored version of a symbol's model, if any."""
+        versions = self.versions(symbol)
+        return versions[-1] if versions else None
+    
+    def get(self, symbol: str, version: Optional[str] = None) -> PricePredictor:
+        """Get a ready-to-use predictor for a symbol, loading it if needed.
+        
+        Args:
+            symbol: Stock symbol
+            version: Model version (default: latest stored version)
+            
+        Returns:
+            PricePredictor with the model and scaler of that version
+        """
+        symbol = symbol.upper()
+        version = version or self.latest_version(symbol)
+        if version is None:
+            raise FileNotFoundError(f"No model stored for symbol {symbol}")
+        
+        key = (symbol, version)
+        with self._lock:
+            predictor = self._resident.get(key)
+            if predictor is not None:
+                self._resident.move_to_end(key)
+                self.hits += 1
+                return predictor
+            self.misses += 1
+        
+        predictor = self._load(symbol, version)
+        
+        with self._lock:
+            self._resident[key] = predictor
+            self._resident.move_to_end(key)
+            while len(self._resident) > self.max_models:
+                evicted, _ = self._resident.popitem(last=False)
+                self.evictions += 1
+                logger.info(f"Evicted model {evicted[0]}@{evicted[1]}")
+        
+        return predictor
+    
+    def register(self, symbol: str, predictor: PricePredictor, version: Optional[str] = None) -> str:
+        """Save a trained predictor as a new version of a symbol's model.
+        
+        Args:
+            symbol: Stock symbol
+            predictor: Trained PricePredictor
+            version: Version name (default: a UTC timestamp)
+        
+        Returns:
+            The stored version
+        """
+        symbol = symbol.upper()
+        version = version or datetime.utcnow().strftime('v%Y%m%d%H%M%S')
+        predictor.save_model(self.model_path(symbol, version))
+        
+        # A resident copy of the same version would now be stale
+        with self._lock:
+            self._resident.pop((symbol, version), None)
+        
+        return version
+    
+    def evict(self, symbol: str, version: Optional[str] = None) -> None:
+        """Drop resident predictors of a symbol (all versions if version is None)."""
+        symbol = symbol.upper()
+        with self._lock:
+            for key in list(self._resident):
+                if key[0] == symbol and (version is None or key[1] == version):
+                    del self._resident[key]
+    
+    def stats(self) -> Dict:
+        """Get residency and cache counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'resident': len(self._resident),
+                'max_models': self.max_models,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+    
+    def _load(self, symbol: str, version: str) -> PricePredictor:
+        """Load one model version from disk."""
+        model_path = self.model_path(symbol, version)
+        if not os.path.exists(f"{model_path}.pkl") or not os.path.exists(f"{model_path}_scaler.pkl"):
+            raise FileNotFoundError(f"Model artifacts not found for {symbol}@{version}")
+        
+        predictor = PricePredictor(lookback=self.lookback)
+        predictor.load_model(model_path, mmap_mode=self.mmap_mode)
+        if predictor.model is None:
+            raise RuntimeError(f"Failed to load model {symbol}@{version}")
+        
+        logger.info(f"Loaded model {symbol}@{version}")
+        return predictor
@@ -0,0 +1,296 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from services.news_ingestor import published_seconds
+
+logger = logging.getLogger(__name__)
+
+# One index record per article: publication time, hash of its ID, byte offset and length of its line
+INDEX_DTYPE = np.dtype([('ts', '<f8'), ('key', '<u8'), ('offset', '<u8'), ('length', '<u4')])
+
+Bound = Union[float, str, None]
+
+def _id_key(article_id: str) -> int:
+    """64-bit hash of an article ID, stored in the index to spot repeated articles."""
+    return int.from_bytes(hashlib.blake2b(article_id.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def _last_copies(index: np.ndarray) -> np.ndarray:
+    """Positions of the last copy of every article in an index, in append order."""
+    _, last = np.unique(index['key'][::-1], return_index=True)
+    return np.sort(len(index) - 1 - last)
+
+class NewsArchive:
+    """
+    Durable append-only store of ingested articles.
+    
+    Articles are appended as JSON lines to one segment per UTC day of
+    publication. Each segment has a binary index of (publication time, ID hash,
+    offset, length) records that is appended right after the line it points
+    to. Replaying a time range therefore reads only the matching days' indexes
+    and seeks straight to the matching lines. An article appended more than
+    once counts as its last copy, both in replay() and in compact(), which
+    deletes segments past `retention` and rewrites settled segments sorted and
+    without repeats once repeats make up `min_garbage` of their records.
+    Appends open and close the segment, so compaction can swap files in
+    between. One process is expected to write a data directory.
+    """
+    
+    def __init__(self, data_dir: str = None, retention: float = 90 * 86400.0, settle: float = 2 * 86400.0,
+                 fsync: bool = False, min_garbage: float = 0.25):
+        """Initialize the archive.
+        
+        Args:
+            data_dir: Directory holding the segments
+            retention: Seconds of segments kept by compact()
+            settle: Seconds after its day ends before a segment is compacted
+                (late articles may still be appended until then)
+            fsync: Sync every appended batch to disk
+            min_garbage: Share of a settled segment's records that must be
+                superseded copies before compact() rewrites it
+        """
+        self.data_dir = data_dir or os.path.join(os.path.dirname(__file__), '..', 'data', 'news')
+        self.retention = retention
+        self.settle = settle
+        self.fsync = fsync
+        self.min_garbage = min_garbage
+        self._checked = set()
+        self._lock = threading.Lock()
+        os.makedirs(self.data_dir, exist_ok=True)
+    
+    def append(self, articles: Iterable[Dict]) -> int:
+        """Append articles (e.g. as a NewsIngestor listener).
+        
+        Articles need an 'id'; their 'published_ts' (epoch seconds) defaults to now.
+        
+        Returns:
+            Number of articles appended
+        """
+        by_segment: Dict[str, List[Dict]] = {}
+        for article in articles:
+            if article.get('published_ts') is None:
+                article = {**article, 'published_ts': time.time()}
+            by_segment.setdefault(self._segment(article['published_ts']), []).append(article)
+        
+        with self._lock:
+            for segment, batch in by_segment.items():
+                self._recover(segment)
+                records = np.zeros(len(batch), dtype=INDEX_DTYPE)
+                with open(self._data_path(segment), 'ab') as data:
+                    offset = data.tell()
+                    for position, article in enumerate(batch):
+                        line = (json.dumps(article, ensure_ascii=False) + '\n').encode('utf-8')
+                        data.write(line)
+                        records[position] = (article['published_ts'], _id_key(article['id']), offset, len(line))
+                        offset += len(line)
+                    self._sync(data)
+                # The index only ever points at lines already written
+                with open(self._index_path(segment), 'ab') as index:
+                    index.write(records.tobytes())
+                    self._sync(index)
+        return sum(len(batch) for batch in by_segment.values())
+    
+    def replay(self, start: Bound = None, end: Bound = None, language: Optional[str] = None,
+               limit: Optional[int] = None) -> List[Dict]:
+        """Read back the articles published within a time range.
+        
+        Args:
+            start: Earliest publication time (epoch seconds or ISO string)
+            end: Latest publication time (epoch seconds or ISO string)
+            language: Only articles in this language
+            limit: Maximum number of articles (the latest ones are kept)
+        
+        Returns:
+            Articles ordered by publication time, each as its last appended copy
+        """
+        start = published_seconds(start, float('-inf')) if isinstance(start, str) else start
+        end = published_seconds(end, float('inf')) if isinstance(end, str) else end
+        start = float('-inf') if start is None else start
+        end = float('inf') if end is None else end
+        first = self._segment(start) if start > float('-inf') else ''
+        last = self._segment(end) if end < float('inf') else '~'
+        
+        # Read newest first, so a limit stops once the latest articles are found
+        articles = []
+        for segment in reversed(self.segments()):
+            if not first <= segment <= last:
+                continue
+            with self._lock:
+                index = self._read_index(segment)
+                index = index[_last_copies(index)]
+                selected = index[(index['ts'] >= start) & (index['ts'] <= end)]
+                selected = selected[np.argsort(selected['ts'], kind='stable')]
+                with open(self._data_path(segment), 'rb') as data:
+                    for record in selected[::-1]:
+                        data.seek(int(record['offset']))
+                        article = json.loads(data.read(int(record['length'])))
+                        if language is not None and article.get('language') != language:
+                            continue
+                        articles.append(article)
+                        if limit is not None and len(articles) >= limit:
+                            return articles[::-1]
+        return articles[::-1]
+    
+    def segments(self) -> List[str]:
+        """Names (UTC days) of the stored segments, oldest first."""
+        return sorted(name[:-len('.jsonl')] for name in os.listdir(self.data_dir) if name.endswith('.jsonl'))
+    
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Delete segments past retention and rewrite settled ones compactly.
+        
+        A settled segment is rewritten sorted by publication time, keeping the
+        last copy of each article, once at least `min_garbage` of its records
+        are superseded copies. Segments unchanged since they were last checked
+        are not read again, so calling this on every startup is cheap.
+        
+        Returns:
+            Dictionary with the number of 'deleted' and 'compacted' segments
+        """
+        now = time.time() if now is None else now
+        expired = self._segment(now - self.retention)
+        settled = self._segment(now - self.settle - 86400.0)
+        manifest = self._read_manifest()
+        deleted = compacted = 0
+        
+        with self._lock:
+            for segment in self.segments():
+                if segment < expired:
+                    for path in (self._data_path(segment), self._index_path(segment)):
+                        if os.path.exists(path):
+                            os.remove(path)
+                    manifest.pop(segment, None)
+                    self._checked.discard(segment)
+                    deleted += 1
+                    continue
+                if segment > settled:
+                    continue
+                
+                self._recover(segment)
+                count = os.path.getsize(self._index_path(segment)) // INDEX_DTYPE.itemsize
+                if manifest.get(segment) == count:
+                    continue
+                index = self._read_index(segment)
+                if count - len(_last_copies(index)) < self.min_garbage * count:
+                    manifest[segment] = count  # Checked; not worth rewriting yet
+                    continue
+                manifest[segment] = self._rewrite(segment)
+                compacted += 1
+            
+            self._write_manifest(manifest)
+        
+        if deleted or compacted:
+            logger.info(f"Compacted news archive: {deleted} segments deleted, {compacted} rewritten")
+        return {'deleted': deleted, 'compacted': compacted}
+    
+    def _rewrite(self, segment: str) -> int:
+        """Rewrite a segment sorted and without repeated articles; returns its article count."""
+        index = self._read_index(segment)
+        index = index[_last_copies(index)]
+        index = index[np.argsort(index['ts'], kind='stable')]
+        ordered = []
+        with open(self._data_path(segment), 'rb') as data:
+            for record in index:
+                data.seek(int(record['offset']))
+                ordered.append(json.loads(data.read(int(record['length']))))
+        
+        records = np.zeros(len(ordered), dtype=INDEX_DTYPE)
+        data_tmp = f"{self._data_path(segment)}.tmp"
+        index_tmp = f"{self._index_path(segment)}.tmp"
+        with open(data_tmp, 'wb') as data:
+            offset = 0
+            for position, article in enumerate(ordered):
+                line = (json.dumps(article, ensure_ascii=False) + '\n').encode('utf-8')
+                data.write(line)
+                records[position] = (article['published_ts'], _id_key(article['id']), offset, len(line))
+                offset += len(line)
+            self._sync(data)
+        with open(index_tmp, 'wb') as index:
+            index.write(records.tobytes())
+            self._sync(index)
+        # Without an index, a crash between the swaps leaves data the recovery check reindexes
+        os.remove(self._index_path(segment))
+        os.replace(data_tmp, self._data_path(segment))
+        os.replace(index_tmp, self._index_path(segment))
+        return len(ordered)
+    
+    def _recover(self, segment: str) -> None:
+        """Make a segment's index match its data after an interrupted append, once per process."""
+        if segment in self._checked:
+            return
+        self._checked.add(segment)
+        data_path, index_path = self._data_path(segment), self._index_path(segment)
+        if not os.path.exists(data_path):
+            if os.path.exists(index_path):
+                os.remove(index_path)
+            return
+        
+        size = os.path.getsize(data_path)
+        index = self._read_index(segment)
+        if len(index) and int(index['offset'][-1]) + int(index['length'][-1]) == size \
+                and os.path.getsize(index_path) == len(index) * INDEX_DTYPE.itemsize:
+            return
+        if not len(index) and not size:
+            return
+        
+        logger.warning(f"Rebuilding index of news segment {segment}")
+        records = []
+        with open(data_path, 'rb') as data:
+            offset = 0
+            for line in data:
+                if not line.endswith(b'\n'):
+                    break  # Partial last line of an interrupted append
+                article = json.loads(line)
+                records.append((article['published_ts'], _id_key(article['id']), offset, len(line)))
+                offset += len(line)
+        with open(data_path, 'r+b') as data:
+            data.truncate(offset)
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(np.array(records, dtype=INDEX_DTYPE).tobytes())
+        os.replace(tmp_path, index_path)
+    
+    def _read_index(self, segment: str) -> np.ndarray:
+        path = self._index_path(segment)
+        if not os.path.exists(path):
+            return np.zeros(0, dtype=INDEX_DTYPE)
+        with open(path, 'rb') as f:
+            raw = f.read()
+        # Ignore a partial trailing record of an interrupted append
+        return np.frombuffer(raw[:len(raw) - len(raw) % INDEX_DTYPE.itemsize], dtype=INDEX_DTYPE)
+    
+    def _sync(self, f) -> None:
+        if self.fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    
+    @staticmethod
+    def _segment(ts: float) -> str:
+        # Clamped to years datetime can represent
+        return datetime.fromtimestamp(min(max(ts, 0.0), 32503680000.0), timezone.utc).strftime('%Y-%m-%d')
+    
+    def _data_path(self, segment: str) -> str:
+        return os.path.join(self.data_dir, f"{segment}.jsonl")
+    
+    def _index_path(self, segment: str) -> str:
+        return os.path.join(self.data_dir, f"{segment}.idx")
+    
+    def _read_manifest(self) -> Dict[str, int]:
+        path = os.path.join(self.data_dir, 'manifest.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _write_manifest(self, manifest: Dict[str, int]) -> None:
+        path = os.path.join(self.data_dir, 'manifest.json')
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
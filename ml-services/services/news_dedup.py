@@ -0,0 +1,170 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.lexicon_matcher import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Universal hashing of 32-bit shingle hashes: (a * x + b) mod p stays below 2**64
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+def shingle_hashes(text: str, size: int = 5) -> np.ndarray:
+    """32-bit hashes of the distinct character shingles of a normalized text."""
+    text = normalize_text(text)
+    if len(text) <= size:
+        shingles = {text} if text else set()
+    else:
+        shingles = {text[start:start + size] for start in range(len(text) - size + 1)}
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little')
+         for shingle in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+
+class NearDuplicateDetector:
+    """
+    Near-duplicate clustering of articles with MinHash and LSH banding.
+    
+    Every article gets a MinHash signature of its character shingles. The
+    signature is cut into bands, and each band bucket records which clusters
+    have a member with that band, so candidate clusters come from a few
+    dictionary lookups. The article is compared with one representative
+    signature per candidate cluster (its first article), which keeps the cost
+    per article independent of how often a story was syndicated. If the best
+    estimated Jaccard similarity reaches `threshold`, the article joins that
+    cluster; otherwise it starts a cluster of its own. Only articles within
+    `window` seconds of the newest one (and at most `max_articles`) are kept.
+    """
+    
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.5,
+                 window: float = 48 * 3600.0, max_articles: int = 20000, shingle_size: int = 5,
+                 seed: int = 1):
+        """Initialize the detector.
+        
+        Args:
+            num_perm: MinHash permutations (signature length)
+            bands: LSH bands; num_perm / bands rows each. A pair with Jaccard
+                similarity s becomes a candidate with probability
+                1 - (1 - s ** rows) ** bands, about 0.64 at s = 0.5 with the defaults
+            threshold: Lowest estimated Jaccard similarity of a near-duplicate
+            window: Seconds of articles kept for matching
+            max_articles: Articles kept for matching at most
+            shingle_size: Characters per shingle
+            seed: Seed of the permutations
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.window = window
+        self.max_articles = max_articles
+        self.shingle_size = shingle_size
+        
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        
+        # article ID -> (signature, cluster ID); cluster ID -> [representative signature, members];
+        # band buckets map band bytes to the clusters with a member there, and how many
+        self._entries: Dict[str, Tuple[np.ndarray, str]] = {}
+        self._clusters: Dict[str, list] = {}
+        self._buckets: List[Dict[bytes, Dict[str, int]]] = [{} for _ in range(bands)]
+        self._order: Deque[Tuple[float, str]] = deque()
+        self._newest = float('-inf')
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text."""
+        hashes = shingle_hashes(text, self.shingle_size)
+        if not len(hashes):
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+    
+    def assign(self, article_id: str, text: str, timestamp: Optional[float] = None,
+               cluster_id: Optional[str] = None) -> str:
+        """Add an article and get its cluster ID.
+        
+        Args:
+            article_id: Unique article ID
+            text: Text compared between articles (e.g. title and summary)
+            timestamp: Publication time in epoch seconds (default: now)
+            cluster_id: Known cluster of the article (e.g. when restoring), used
+                instead of searching for one
+        
+        Returns:
+            Cluster ID: the ID of the cluster's first article
+        """
+        at = time.time() if timestamp is None else timestamp
+        signature = self.signature(text)
+        keys = [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+        
+        with self._lock:
+            existing = self._entries.get(article_id)
+            if existing is not None:
+                return existing[1]
+            
+            if cluster_id is None:
+                cluster_id = self._best_cluster(signature, keys) or article_id
+            
+            self._entries[article_id] = (signature, cluster_id)
+            cluster = self._clusters.setdefault(cluster_id, [signature, 0])
+            cluster[1] += 1
+            for bucket, key in zip(self._buckets, keys):
+                counts = bucket.setdefault(key, {})
+                counts[cluster_id] = counts.get(cluster_id, 0) + 1
+            self._order.append((at, article_id))
+            self._newest = max(self._newest, at)
+            self._evict()
+        return cluster_id
+    
+    def _best_cluster(self, signature: np.ndarray, keys: List[bytes]) -> Optional[str]:
+        """The most similar candidate cluster at or above the threshold, if any."""
+        candidates = set()
+        for bucket, key in zip(self._buckets, keys):
+            counts = bucket.get(key)
+            if counts:
+                candidates.update(counts)
+        if not candidates:
+            return None
+        
+        candidates = list(candidates)
+        representatives = np.stack([self._clusters[cluster][0] for cluster in candidates])
+        similarities = (representatives == signature).mean(axis=1)
+        best = int(np.argmax(similarities))
+        return candidates[best] if similarities[best] >= self.threshold else None
+    
+    def _evict(self) -> None:
+        """Forget articles outside the window, oldest added first."""
+        cutoff = self._newest - self.window
+        while self._order and (self._order[0][0] < cutoff or len(self._order) > self.max_articles):
+            _, article_id = self._order.popleft()
+            signature, cluster_id = self._entries.pop(article_id)
+            cluster = self._clusters[cluster_id]
+            cluster[1] -= 1
+            if not cluster[1]:
+                del self._clusters[cluster_id]
+            for band, bucket in enumerate(self._buckets):
+                key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+                counts = bucket[key]
+                counts[cluster_id] -= 1
+                if not counts[cluster_id]:
+                    del counts[cluster_id]
+                    if not counts:
+                        del bucket[key]
+    
+    def similarity(self, text: str, other: str) -> float:
+        """Estimated Jaccard similarity of two texts' shingles."""
+        return float(np.mean(self.signature(text) == self.signature(other)))
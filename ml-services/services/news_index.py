@@ -0,0 +1,289 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Union
+
+from services.lexicon_matcher import LexiconMatcher, normalize_text
+from services.news_ingestor import published_seconds
+
+logger = logging.getLogger(__name__)
+
+# Sector keywords, in the order categorize_news prefers them
+SECTOR_KEYWORDS = {
+    "Oil & Gas": ["reliance", "oil", "gas", "petroleum", "refinery", "jamnagar"],
+    "IT": ["tcs", "infosys", "wipro", "hcl", "tech", "software", "digital"],
+    "Banking": ["hdfc", "sbi", "icici", "bank", "banking", "loan", "interest"],
+    "Pharma": ["sun pharma", "dr reddy", "cipla", "pharma", "medicine", "drug"],
+    "Auto": ["maruti", "tata motors", "mahindra", "auto", "car", "vehicle"],
+    "Realty": ["dlf", "realty", "property", "real estate", "construction"],
+    "FMCG": ["itc", "hul", "nestle", "fmcg", "consumer", "food"],
+    "Steel": ["tata steel", "jsw", "steel", "metal", "iron"]
+}
+
+# NSE symbol -> (sector, names it goes by in English, Hindi and Marathi news)
+SYMBOLS = {
+    "RELIANCE": ("Oil & Gas", ["reliance", "reliance industries", "ril", "रिलायंस", "रिलायन्स"]),
+    "TCS": ("IT", ["tcs", "tata consultancy", "टीसीएस"]),
+    "INFY": ("IT", ["infosys", "infy", "इन्फोसिस"]),
+    "WIPRO": ("IT", ["wipro", "विप्रो"]),
+    "HCLTECH": ("IT", ["hcl", "hcl tech", "hcltech"]),
+    "HDFCBANK": ("Banking", ["hdfc", "hdfc bank", "एचडीएफसी"]),
+    "SBIN": ("Banking", ["sbi", "state bank of india", "एसबीआई", "स्टेट बँक", "स्टेट बैंक"]),
+    "ICICIBANK": ("Banking", ["icici", "icici bank", "आयसीआयसीआय", "आईसीआईसीआई"]),
+    "SUNPHARMA": ("Pharma", ["sun pharma"]),
+    "DRREDDY": ("Pharma", ["dr reddy", "dr reddys", "dr reddy s"]),
+    "CIPLA": ("Pharma", ["cipla", "सिप्ला"]),
+    "MARUTI": ("Auto", ["maruti", "maruti suzuki", "मारुती", "मारुति"]),
+    "TATAMOTORS": ("Auto", ["tata motors", "टाटा मोटर्स"]),
+    "M&M": ("Auto", ["mahindra", "mahindra and mahindra", "महिंद्रा"]),
+    "DLF": ("Realty", ["dlf"]),
+    "ITC": ("FMCG", ["itc", "आयटीसी", "आईटीसी"]),
+    "HINDUNILVR": ("FMCG", ["hul", "hindustan unilever"]),
+    "NESTLEIND": ("FMCG", ["nestle", "नेस्ले"]),
+    "TATASTEEL": ("Steel", ["tata steel", "टाटा स्टील"]),
+    "JSWSTEEL": ("Steel", ["jsw", "jsw steel"])
+}
+
+Bound = Union[float, str, None]
+
+class _Postings:
+    """Article IDs of one index key, sorted by publication time."""
+    
+    __slots__ = ('times', 'ids', '_unsorted')
+    
+    def __init__(self):
+        self.times: List[float] = []
+        self.ids: List[str] = []
+        self._unsorted = False
+    
+    def add(self, at: float, article_id: str) -> None:
+        if self.times and at < self.times[-1]:
+            # Late article: appended anyway and sorted once, on the next read
+            self._unsorted = True
+        self.times.append(at)
+        self.ids.append(article_id)
+    
+    def latest(self, start: float, end: float, limit: int) -> List[str]:
+        """The `limit` newest IDs published within [start, end], newest first."""
+        self._sort()
+        hi = bisect_right(self.times, end)
+        lo = max(bisect_left(self.times, start), hi - limit)
+        return self.ids[lo:hi][::-1]
+    
+    def drop_before(self, cutoff: float) -> List[str]:
+        """Drop the IDs published before `cutoff` and return them."""
+        self._sort()
+        position = bisect_left(self.times, cutoff)
+        dropped = self.ids[:position]
+        if position:
+            del self.times[:position]
+            del self.ids[:position]
+        return dropped
+    
+    def _sort(self) -> None:
+        if self._unsorted:
+            # Stable, so articles published at the same time keep their arrival order
+            order = sorted(range(len(self.times)), key=self.times.__getitem__)
+            self.times = [self.times[i] for i in order]
+            self.ids = [self.ids[i] for i in order]
+            self._unsorted = False
+
+class NewsIndex:
+    """
+    Inverted index from symbols and sectors to ingested articles.
+    
+    Articles are tagged as they arrive by Aho-Corasick passes over their title
+    and summary: English aliases and keywords match as whole words, Devanagari
+    ones anywhere so that inflected forms count. Each symbol and sector keeps
+    its article IDs sorted by publication time, so the newest k articles in a
+    time range are found by binary search in O(log n + k). Articles older than
+    `retention` are dropped.
+    """
+    
+    def __init__(self, symbols: Optional[Dict] = None, sector_keywords: Optional[Dict[str, List[str]]] = None,
+                 retention: float = 7 * 86400.0):
+        """Initialize the index.
+        
+        Args:
+            symbols: Symbol -> (sector, aliases) mapping (default: SYMBOLS)
+            sector_keywords: Sector -> keywords mapping (default: SECTOR_KEYWORDS)
+            retention: Seconds of articles kept, counted back from the newest one
+        """
+        self.symbols = symbols if symbols is not None else SYMBOLS
+        self.sector_keywords = sector_keywords if sector_keywords is not None else SECTOR_KEYWORDS
+        self.retention = retention
+        
+        self.sectors = list(self.sector_keywords)
+        for sector, _ in self.symbols.values():
+            if sector not in self.sectors:
+                self.sectors.append(sector)
+        
+        # Normalized phrase -> the symbols and sectors it tags
+        self._tags: Dict[str, List[tuple]] = {}
+        self._aliases: Dict[str, str] = {}
+        for symbol, (sector, aliases) in self.symbols.items():
+            self._aliases[normalize_text(symbol)] = symbol
+            for alias in [symbol] + list(aliases):
+                phrase = normalize_text(alias)
+                self._aliases.setdefault(phrase, symbol)
+                self._tags.setdefault(phrase, []).append(('symbol', symbol))
+        for sector, keywords in self.sector_keywords.items():
+            for keyword in keywords:
+                self._tags.setdefault(normalize_text(keyword), []).append(('sector', sector))
+        self._matchers = [
+            LexiconMatcher(dict.fromkeys((phrase for phrase in self._tags if phrase.isascii()), 0.0)),
+            LexiconMatcher(dict.fromkeys((phrase for phrase in self._tags if not phrase.isascii()), 0.0),
+                           whole_words=False)
+        ]
+        
+        self.articles: Dict[str, Dict] = {}
+        self._postings: Dict[tuple, _Postings] = {}
+        self._by_time = _Postings()
+        self._newest = float('-inf')
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.articles)
+    
+    def tag(self, text: str) -> Dict[str, List[str]]:
+        """Find the symbols and sectors a text mentions.
+        
+        Returns:
+            Dictionary with 'symbols' in order of first mention and 'sectors' in
+            SECTOR_KEYWORDS order (including the sectors of mentioned symbols)
+        """
+        text = normalize_text(text)
+        matches = sorted((start, matcher.phrases[index]) for matcher in self._matchers
+                         for start, _, index in matcher.find_all(text, normalized=True))
+        
+        symbols: Dict[str, None] = {}
+        sectors = set()
+        for _, phrase in matches:
+            for kind, name in self._tags[phrase]:
+                if kind == 'symbol':
+                    symbols[name] = None
+                    sectors.add(self.symbols[name][0])
+                else:
+                    sectors.add(name)
+        return {
+            'symbols': list(symbols),
+            'sectors': [sector for sector in self.sectors if sector in sectors]
+        }
+    
+    def categorize(self, text: str) -> str:
+        """Get the first sector (in sector_keywords order) with a keyword in a text.
+        
+        Keywords match as plain substrings of the lowercased text, as
+        categorize_news always has ('technology' counts for 'tech'), unlike
+        the whole-word tagging of tag().
+        
+        Returns:
+            Sector name, or 'General' when no keyword occurs
+        """
+        text = text.lower()
+        for sector, keywords in self.sector_keywords.items():
+            if any(keyword in text for keyword in keywords):
+                return sector
+        return "General"
+    
+    def add_articles(self, articles: Iterable[Dict]) -> int:
+        """Tag and index articles (e.g. as a NewsIngestor listener).
+        
+        Articles need an 'id'; their 'published_ts' (epoch seconds) defaults to now.
+        
+        Returns:
+            Number of articles newly indexed
+        """
+        added = 0
+        with self._lock:
+            for article in articles:
+                if article['id'] in self.articles:
+                    continue
+                tags = self.tag(f"{article.get('title', '')} {article.get('summary', '')}")
+                at = article.get('published_ts')
+                if at is None:
+                    at = time.time()
+                self.articles[article['id']] = {**article, **tags, 'published_ts': at}
+                self._by_time.add(at, article['id'])
+                for symbol in tags['symbols']:
+                    self._posting(('symbol', symbol)).add(at, article['id'])
+                for sector in tags['sectors']:
+                    self._posting(('sector', sector)).add(at, article['id'])
+                self._newest = max(self._newest, at)
+                added += 1
+            
+            if added:
+                self._prune(self._newest - self.retention)
+        return added
+    
+    def _posting(self, key: tuple) -> _Postings:
+        postings = self._postings.get(key)
+        if postings is None:
+            postings = self._postings[key] = _Postings()
+        return postings
+    
+    def _prune(self, cutoff: float) -> None:
+        """Drop articles published before `cutoff`."""
+        stale = self._by_time.drop_before(cutoff)
+        if not stale:
+            return
+        for article_id in stale:
+            del self.articles[article_id]
+        for key in list(self._postings):
+            postings = self._postings[key]
+            postings.drop_before(cutoff)
+            if not postings.ids:
+                del self._postings[key]
+        logger.info(f"Dropped {len(stale)} articles from the news index")
+    
+    def resolve(self, name: str) -> Optional[str]:
+        """Map a symbol or one of its aliases (e.g. 'Infosys', 'TCS.NS') to its symbol."""
+        name = name.strip()
+        for suffix in ('.NS', '.BO'):
+            if name.upper().endswith(suffix):
+                name = name[:-len(suffix)]
+        return self._aliases.get(normalize_text(name))
+    
+    def by_symbol(self, name: str, start: Bound = None, end: Bound = None, limit: int = 10) -> List[Dict]:
+        """Get the newest articles mentioning a symbol (or alias) within a time range.
+        
+        Args:
+            name: Symbol or alias
+            start: Earliest publication time (epoch seconds or ISO string)
+            end: Latest publication time (epoch seconds or ISO string)
+            limit: Maximum number of articles
+        
+        Returns:
+            Articles, newest first
+        """
+        symbol = self.resolve(name)
+        if symbol is None:
+            return []
+        return self._query(('symbol', symbol), start, end, limit)
+    
+    def by_sector(self, sector: str, start: Bound = None, end: Bound = None, limit: int = 10) -> List[Dict]:
+        """Get the newest articles about a sector within a time range, newest first."""
+        matched = next((name for name in self.sectors if name.lower() == sector.strip().lower()), None)
+        if matched is None:
+            return []
+        return self._query(('sector', matched), start, end, limit)
+    
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Number of indexed articles per symbol and per sector."""
+        with self._lock:
+            counts = {'symbols': {}, 'sectors': {}}
+            for (kind, name), postings in self._postings.items():
+                counts[kind + 's'][name] = len(postings.ids)
+            return counts
+    
+    def _query(self, key: tuple, start: Bound, end: Bound, limit: int) -> List[Dict]:
+        start = published_seconds(start, float('-inf')) if isinstance(start, str) else start
+        end = published_seconds(end, float('inf')) if isinstance(end, str) else end
+        with self._lock:
+            postings = self._postings.get(key)
+            if postings is None or limit <= 0:
+                return []
+            ids = postings.latest(float('-inf') if start is None else start,
+                                  float('inf') if end is None else end, limit)
+            return [self.articles[article_id] for article_id in ids]
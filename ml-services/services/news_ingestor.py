@@ -0,0 +1,309 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from itertools import islice
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+from services.news_dedup import NearDuplicateDetector
+from services.news_scraper import NewsScraper
+
+logger = logging.getLogger(__name__)
+
+def article_id(article: Dict) -> str:
+    """Stable ID of an article, from its link (or its title and source when it has none)."""
+    key = article.get('link') or f"{article.get('source', '')}\0{article.get('title', '')}"
+    return hashlib.blake2b(key.strip().encode('utf-8'), digest_size=8).hexdigest()
+
+def _parse_iso(value: str) -> datetime:
+    # Python 3.10's fromisoformat rejects a trailing 'Z'
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+def published_seconds(published: Optional[str], default: float) -> float:
+    """Parse an RSS (RFC 822) or ISO publication date to epoch seconds."""
+    if published:
+        for parse in (parsedate_to_datetime, _parse_iso):
+            try:
+                moment = parse(published)
+            except (TypeError, ValueError):
+                continue
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            return moment.timestamp()
+    return default
+
+class NewsIngestor:
+    """
+    Background RSS ingestion into a bounded in-memory store per language.
+    
+    A polling loop fetches every language's feeds on a schedule, drops articles
+    it has already seen and keeps the newest `max_articles` per language, so
+    readers answer from memory instead of waiting on the network. With a
+    deduplicator, each article also gets the 'cluster_id' of the story it
+    near-duplicates across feeds. Listeners receive each poll's new articles,
+    and metrics() reports ingestion lag and feed health.
+    """
+    
+    def __init__(self, scraper: Optional[NewsScraper] = None, interval: float = 300.0,
+                 max_articles: int = 500, max_seen: int = 20000,
+                 deduplicator: Optional[NearDuplicateDetector] = None):
+        """Initialize the ingestor.
+        
+        Args:
+            scraper: NewsScraper providing the feeds
+            interval: Seconds between polls
+            max_articles: Articles kept per language
+            max_seen: Article IDs remembered for deduplication
+            deduplicator: Near-duplicate detector assigning cluster IDs
+                (default: every article is its own cluster)
+        """
+        self.scraper = scraper or NewsScraper()
+        self.interval = interval
+        self.max_articles = max_articles
+        self.max_seen = max_seen
+        self.deduplicator = deduplicator
+        
+        self.articles: Dict[str, Deque[Dict]] = {
+            language: deque(maxlen=max_articles) for language in self.scraper.feeds
+        }
+        self.listeners: List[Callable[[List[Dict]], None]] = []
+        self._seen: 'OrderedDict[str, None]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        
+        self.stats = {
+            'polls': 0,
+            'ingested': 0,
+            'duplicates': 0,
+            'near_duplicates': 0,
+            'last_poll': None,
+            'last_poll_duration': None,
+            'last_new_articles': 0,
+            'last_lag_mean': None,
+            'last_lag_max': None
+        }
+        self.feed_new_articles: Dict[str, int] = {}
+    
+    def subscribe(self, listener: Callable[[List[Dict]], None]) -> None:
+        """Register a callback invoked with each poll's new articles."""
+        self.listeners.append(listener)
+    
+    def unsubscribe(self, listener: Callable[[List[Dict]], None]) -> None:
+        """Remove a previously registered callback."""
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+    
+    def start(self) -> asyncio.Task:
+        """Start the polling loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+    
+    async def stop(self) -> None:
+        """Stop the polling loop and close the scraper's connections."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.scraper.aclose()
+    
+    async def run(self) -> None:
+        """Poll forever, `interval` seconds apart."""
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.error(f"Error in news ingestion: {str(e)}")
+            await asyncio.sleep(self.interval)
+    
+    async def poll_once(self) -> List[Dict]:
+        """Fetch every language's feeds concurrently and store the new articles.
+        
+        Returns:
+            New articles, oldest first
+        """
+        started = time.perf_counter()
+        languages = list(self.scraper.feeds)
+        results = await asyncio.gather(*(
+            self.scraper.fetch_feeds(self.scraper.feeds[language], language) for language in languages
+        ))
+        
+        now = time.time()
+        fetched_at = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        fresh_by_language: Dict[str, List[Dict]] = {}
+        duplicates = 0
+        with self._lock:
+            for language, feeds in zip(languages, results):
+                fresh = fresh_by_language.setdefault(language, [])
+                for url, articles in feeds.items():
+                    count = 0
+                    for article in articles:
+                        key = article_id(article)
+                        if key in self._seen:
+                            duplicates += 1
+                            continue
+                        self._remember(key)
+                        fresh.append({
+                            **article,
+                            'id': key,
+                            'published_ts': published_seconds(article.get('published'), now),
+                            'ingested_at': fetched_at
+                        })
+                        count += 1
+                    self.feed_new_articles[url] = count
+        
+        new_articles = sorted((article for fresh in fresh_by_language.values() for article in fresh),
+                              key=lambda article: article['published_ts'])
+        # MinHash work stays off the event loop and outside the store lock
+        near_duplicates = await asyncio.to_thread(self._cluster, new_articles)
+        
+        with self._lock:
+            for language, fresh in fresh_by_language.items():
+                fresh.sort(key=lambda article: article['published_ts'])
+                self.articles.setdefault(language, deque(maxlen=self.max_articles)).extend(fresh)
+            
+            lags = [max(now - article['published_ts'], 0.0) for article in new_articles]
+            self.stats['polls'] += 1
+            self.stats['ingested'] += len(new_articles)
+            self.stats['duplicates'] += duplicates
+            self.stats['near_duplicates'] += near_duplicates
+            self.stats['last_poll'] = fetched_at
+            self.stats['last_poll_duration'] = time.perf_counter() - started
+            self.stats['last_new_articles'] = len(new_articles)
+            if lags:
+                # Lag of the latest poll that brought new articles
+                self.stats['last_lag_mean'] = sum(lags) / len(lags)
+                self.stats['last_lag_max'] = max(lags)
+        
+        for listener in list(self.listeners):
+            try:
+                # Listeners may block (e.g. archive writes), so they run in a worker thread
+                await asyncio.to_thread(listener, new_articles)
+            except Exception as e:
+                logger.error(f"Error in news listener: {str(e)}")
+        
+        logger.info(f"Ingested {len(new_articles)} new articles "
+                    f"({duplicates} duplicates, {near_duplicates} near-duplicates)")
+        return new_articles
+    
+    def restore(self, articles: Iterable[Dict]) -> int:
+        """Load previously ingested articles (e.g. replayed from a NewsArchive) on startup.
+        
+        Articles keep their IDs and cluster IDs, and listeners are not notified.
+        Only articles within the deduplicator's window get signatures, since
+        older ones could no longer be matched anyway.
+        
+        Returns:
+            Number of articles restored
+        """
+        articles = sorted(articles, key=lambda article: article['published_ts'])
+        cutoff = float('-inf')
+        if self.deduplicator is not None and articles:
+            cutoff = articles[-1]['published_ts'] - self.deduplicator.window
+        
+        restored = 0
+        with self._lock:
+            for article in articles:
+                if article['id'] in self._seen:
+                    continue
+                self._remember(article['id'])
+                article.setdefault('cluster_id', article['id'])
+                if self.deduplicator is not None and article['published_ts'] >= cutoff:
+                    self.deduplicator.assign(article['id'], f"{article.get('title', '')} {article.get('summary', '')}",
+                                             article['published_ts'], article['cluster_id'])
+                language = article.get('language', 'en')
+                self.articles.setdefault(language, deque(maxlen=self.max_articles)).append(article)
+                restored += 1
+        
+        logger.info(f"Restored {restored} news articles")
+        return restored
+    
+    def _cluster(self, articles: List[Dict]) -> int:
+        """Set the cluster ID of new articles, oldest first.
+        
+        Returns:
+            Number of articles that joined an existing story's cluster
+        """
+        joined = 0
+        for article in articles:
+            if self.deduplicator is None:
+                article['cluster_id'] = article['id']
+                continue
+            article['cluster_id'] = self.deduplicator.assign(
+                article['id'], f"{article['title']} {article['summary']}", article['published_ts']
+            )
+            joined += article['cluster_id'] != article['id']
+        return joined
+    
+    def _remember(self, key: str) -> None:
+        """Record an article ID, forgetting the oldest once `max_seen` are held."""
+        self._seen[key] = None
+        if len(self._seen) > self.max_seen:
+            self._seen.popitem(last=False)
+    
+    def latest(self, language: str = 'en', limit: int = 10, unique: bool = False) -> List[Dict]:
+        """Get a language's most recently ingested articles, newest first.
+        
+        Unknown languages fall back to English, as in NewsScraper.fetch_news.
+        
+        Args:
+            language: Language code
+            limit: Maximum number of articles
+            unique: Return only the newest article of each near-duplicate cluster
+        """
+        with self._lock:
+            articles = self.articles.get(language)
+            if articles is None:
+                articles = self.articles.get('en', ())
+            if not unique:
+                return list(islice(reversed(articles), limit))
+            
+            clusters = set()
+            selected = []
+            for article in reversed(articles):
+                if len(selected) >= limit:
+                    break
+                if article['cluster_id'] not in clusters:
+                    clusters.add(article['cluster_id'])
+                    selected.append(article)
+            return selected
+    
+    def metrics(self) -> Dict:
+        """Get ingestion lag and feed health.
+        
+        Returns:
+            Dictionary with poll statistics, articles held per language and
+            per-feed status from the scraper
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stored = {language: len(articles) for language, articles in self.articles.items()}
+        
+        last_poll = stats['last_poll']
+        stats['seconds_since_last_poll'] = (
+            time.time() - datetime.fromisoformat(last_poll).timestamp() if last_poll else None
+        )
+        feeds = {}
+        for url, status in self.scraper.feed_status.items():
+            feeds[url] = {
+                **status,
+                'new_articles': self.feed_new_articles.get(url, 0),
+                'healthy': status.get('consecutive_failures', 0) == 0
+            }
+        
+        return {
+            **stats,
+            'running': self._task is not None and not self._task.done(),
+            'interval': self.interval,
+            'stored': stored,
+            'feeds': feeds
+        }
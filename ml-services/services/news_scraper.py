@@ -1,5 +1,9 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 import feedparser
-from typing import List, Dict
+import httpx
+from typing import List, Dict, Optional
 import logging
 from datetime import datetime
 import re
@@ -7,9 +11,23 @@ import re
 logger = logging.getLogger(__name__)
 
 class NewsScraper:
-    """Scrape news from RSS feeds for multiple languages."""
+    """
+    Scrape news from RSS feeds for multiple languages.
     
-    def __init__(self):
+    Feeds are fetched concurrently through one pooled httpx client, each with its
+    own timeout, so a slow feed only costs its own articles. ETag and
+    Last-Modified validators are sent back on later requests, and a 304 reuses
+    the articles parsed last time. Parsing runs in a worker thread, off the
+    event loop.
+    """
+    
+    def __init__(self, timeout: float = 10.0, max_connections: int = 20):
+        """Initialize the scraper.
+        
+        Args:
+            timeout: Seconds allowed per feed, from connecting to the last byte
+            max_connections: Size of the shared connection pool
+        """
         self.feeds = {
             'en': [
                 'https://economictimes.indiatimes.com/markets/stocks/rssfeeds/2146842.cms',
@@ -24,51 +42,162 @@ class NewsScraper:
                 'https://maharashtratimes.com/business/rssfeeds/msid-2429835.cms'
             ]
         }
+        self.timeout = timeout
+        self.max_connections = max_connections
+        
+        # Per-feed conditional request validators and the articles they refer to
+        self.validators: Dict[str, Dict[str, str]] = {}
+        self.cached_articles: Dict[str, List[Dict]] = {}
+        # Per-feed health: last status, latency, error and consecutive failures
+        self.feed_status: Dict[str, Dict] = {}
         
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+    
     def fetch_news(self, language: str = 'en', limit: int = 10) -> List[Dict]:
         """Fetch news from configured RSS feeds.
         
         Args:
             language: Language code ('en', 'hi', 'mr')
             limit: Maximum number of articles to return
-            
+        
         Returns:
             List of news articles
         """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._fetch_news_once(language, limit))
+        
+        # Called from inside an event loop: run the fetch on its own loop in a thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self._fetch_news_once(language, limit)).result()
+    
+    async def _fetch_news_once(self, language: str, limit: int) -> List[Dict]:
+        """Fetch news on a short-lived event loop with a client of its own."""
+        async with self._new_client() as client:
+            return await self.fetch_news_async(language, limit, client)
+    
+    async def fetch_news_async(self, language: str = 'en', limit: int = 10,
+                               client: Optional[httpx.AsyncClient] = None) -> List[Dict]:
+        """Fetch news from a language's feeds concurrently.
+        
+        Args:
+            language: Language code ('en', 'hi', 'mr')
+            limit: Maximum number of articles to return
+            client: Client to fetch with (default: the shared pooled client)
+        
+        Returns:
+            List of news articles, in feed order
+        """
         if language not in self.feeds:
             logger.warning(f"Language {language} not supported, defaulting to English")
             language = 'en'
-            
+        
+        results = await self.fetch_feeds(self.feeds[language], language, client)
+        
         articles = []
-        urls = self.feeds[language]
+        for url in self.feeds[language]:
+            articles.extend(results[url][:limit - len(articles)])
+            if len(articles) >= limit:
+                break
+        return articles
+    
+    async def fetch_feeds(self, urls: List[str], language: str,
+                          client: Optional[httpx.AsyncClient] = None) -> Dict[str, List[Dict]]:
+        """Fetch several feeds concurrently.
         
-        for url in urls:
-            try:
-                feed = feedparser.parse(url)
-                
-                for entry in feed.entries:
-                    article = {
-                        'title': self._clean_text(entry.title),
-                        'link': entry.link,
-                        'published': entry.get('published', datetime.now().isoformat()),
-                        'summary': self._clean_text(entry.get('summary', '')),
-                        'source': feed.feed.get('title', 'Unknown'),
-                        'language': language
-                    }
-                    articles.append(article)
-                    
-                    if len(articles) >= limit:
-                        break
-                
-                if len(articles) >= limit:
-                    break
-                    
-            except Exception as e:
-                logger.error(f"Error fetching feed {url}: {str(e)}")
-                continue
+        Returns:
+            Dictionary mapping each URL to its articles (empty when the feed failed)
+        """
+        client = client or self._get_client()
+        results = await asyncio.gather(*(self._fetch_feed(client, url, language) for url in urls))
+        return dict(zip(urls, results))
+    
+    async def _fetch_feed(self, client: httpx.AsyncClient, url: str, language: str) -> List[Dict]:
+        """Fetch one feed with a conditional GET and parse it in a worker thread."""
+        headers = {}
+        validators = self.validators.get(url, {})
+        if 'etag' in validators:
+            headers['If-None-Match'] = validators['etag']
+        if 'last_modified' in validators:
+            headers['If-Modified-Since'] = validators['last_modified']
+        
+        started = time.perf_counter()
+        status = self.feed_status.setdefault(url, {'consecutive_failures': 0})
+        status['last_attempt'] = datetime.now().isoformat()
+        try:
+            response = await asyncio.wait_for(client.get(url, headers=headers), self.timeout)
+            
+            if response.status_code == 304:
+                articles = self.cached_articles.get(url, [])
+            else:
+                response.raise_for_status()
+                parsed = await asyncio.to_thread(feedparser.parse, response.content)
+                articles = self._parse_entries(parsed, language)
                 
+                self.cached_articles[url] = articles
+                self.validators[url] = {
+                    key: response.headers[header]
+                    for key, header in (('etag', 'ETag'), ('last_modified', 'Last-Modified'))
+                    if header in response.headers
+                }
+            
+            status.update({'last_status': response.status_code, 'last_success': datetime.now().isoformat(),
+                           'last_error': None, 'consecutive_failures': 0})
+            return articles
+        
+        except Exception as e:
+            if isinstance(e, (asyncio.TimeoutError, httpx.TimeoutException)):
+                error = 'timeout'
+            elif isinstance(e, httpx.HTTPStatusError):
+                error = f"HTTP {e.response.status_code}"
+            else:
+                error = str(e)
+            logger.error(f"Error fetching feed {url}: {error}")
+            status.update({'last_status': None, 'last_error': error,
+                           'consecutive_failures': status['consecutive_failures'] + 1})
+            return []
+        
+        finally:
+            status['latency'] = time.perf_counter() - started
+    
+    def _parse_entries(self, feed, language: str) -> List[Dict]:
+        """Convert parsed feed entries into article dicts."""
+        articles = []
+        for entry in feed.entries:
+            articles.append({
+                'title': self._clean_text(entry.title),
+                'link': entry.link,
+                'published': entry.get('published', datetime.now().isoformat()),
+                'summary': self._clean_text(entry.get('summary', '')),
+                'source': feed.feed.get('title', 'Unknown'),
+                'language': language
+            })
         return articles
     
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled client of the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = self._new_client()
+            self._client_loop = loop
+        return self._client
+    
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.max_connections)
+        )
+    
+    async def aclose(self) -> None:
+        """Close the pooled client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+    
     def _clean_text(self, text: str) -> str:
         """Clean HTML tags and extra whitespace from text."""
         # Remove HTML tags
@@ -0,0 +1,292 @@
+import json
+import logging
+import os
+import re
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# One fixed-size record per bar, so a symbol's file can be appended to and memory-mapped
+BAR_DTYPE = np.dtype([('ts', '<i8')] + [(column, '<f8') for column in OHLCV_COLUMNS])
+
+_PERIOD_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+
+def parse_duration(value: str) -> Optional[pd.DateOffset]:
+    """Convert a yfinance period/interval string ('5d', '1mo', '15m') to an offset.
+    
+    Returns None for open-ended periods such as 'max' and 'ytd'.
+    """
+    match = re.fullmatch(r'(\d+)(m|h|d|wk|mo|y)', value)
+    if not match:
+        return None
+    return pd.DateOffset(**{_PERIOD_UNITS[match.group(2)]: int(match.group(1))})
+
+class OHLCVProvider(ABC):
+    """Interface of a market data source the OHLCV store reads through."""
+    
+    @abstractmethod
+    def fetch(self, symbol: str, interval: str = "1d", period: Optional[str] = None,
+              start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Fetch bars for a symbol.
+        
+        Args:
+            symbol: Provider symbol (e.g. 'RELIANCE.NS')
+            interval: Bar interval
+            period: History period to fetch (used when start is None)
+            start: Fetch bars from this timestamp onwards
+            
+        Returns:
+            DataFrame with a DatetimeIndex and lowercase OHLCV columns
+        """
+
+class YFinanceProvider(OHLCVProvider):
+    """OHLCV provider backed by yfinance."""
+    
+    def fetch(self, symbol: str, interval: str = "1d", period: Optional[str] = None,
+              start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        import yfinance as yf
+        
+        ticker = yf.Ticker(symbol)
+        if start is not None:
+            df = ticker.history(start=start, interval=interval)
+        else:
+            df = ticker.history(period=period or "1y", interval=interval)
+        
+        df.columns = df.columns.str.lower()
+        if not df.empty and not all(col in df.columns for col in OHLCV_COLUMNS):
+            raise ValueError(f"Missing required columns in fetched data: {df.columns}")
+        
+        return df.reindex(columns=OHLCV_COLUMNS)
+
+class SyntheticProvider(OHLCVProvider):
+    """Deterministic random-walk bars for tests and offline development.
+    
+    The same symbol always yields the same bars, so incremental fetches line up
+    with earlier ones exactly.
+    """
+    
+    def __init__(self, end: Optional[pd.Timestamp] = None, base_price: float = 1000.0):
+        """Initialize the provider.
+        
+        Args:
+            end: Timestamp of the last available bar (default: now)
+            base_price: Price level the walks start from
+        """
+        self.end = end
+        self.base_price = base_price
+        self.calls = 0
+    
+    def fetch(self, symbol: str, interval: str = "1d", period: Optional[str] = None,
+              start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        self.calls += 1
+        step = parse_duration(interval) or pd.DateOffset(days=1)
+        end = pd.Timestamp(self.end or datetime.now(timezone.utc))
+        if end.tzinfo is None:
+            end = end.tz_localize('UTC')
+        origin = pd.Timestamp('2000-01-03', tz='UTC')
+        
+        index = pd.date_range(origin, end, freq=step)
+        seed = zlib.crc32(f"{symbol}:{interval}".encode('utf-8'))
+        returns = np.random.default_rng(seed).normal(0, 0.01, len(index))
+        close = self.base_price * np.exp(np.cumsum(returns))
+        open_ = np.concatenate([[self.base_price], close[:-1]])
+        spread = np.abs(returns) * close
+        df = pd.DataFrame({
+            'open': open_,
+            'high': np.maximum(open_, close) + spread,
+            'low': np.minimum(open_, close) - spread,
+            'close': close,
+            'volume': np.round(1e6 * (1 + np.abs(returns) * 50))
+        }, index=index)
+        
+        if start is not None:
+            return df[df.index >= pd.Timestamp(start)]
+        offset = parse_duration(period or "1y")
+        return df if offset is None else df[df.index > end - offset]
+
+class OHLCVStore:
+    """
+    Local append-only OHLCV cache in front of a market data provider.
+    
+    Bars are kept per symbol and interval as a flat file of fixed-size records
+    that is read through np.memmap. Reads refresh only the missing tail from the
+    provider and keep serving cached bars when the provider is unreachable.
+    """
+    
+    def __init__(self, data_dir: str = None, provider: Optional[OHLCVProvider] = None,
+                 min_refresh: timedelta = timedelta(minutes=1)):
+        """Initialize the store.
+        
+        Args:
+            data_dir: Directory holding the bar files
+            provider: Market data provider (default: yfinance)
+            min_refresh: Minimum time between provider calls for the same series
+        """
+        self.data_dir = data_dir or os.path.join(os.path.dirname(__file__), '..', 'data', 'ohlcv')
+        self.provider = provider or YFinanceProvider()
+        self.min_refresh = min_refresh
+        os.makedirs(self.data_dir, exist_ok=True)
+    
+    def get(self, symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+        """Get bars for a symbol, fetching only what the cache is missing.
+        
+        Args:
+            symbol: Provider symbol (e.g. 'RELIANCE.NS')
+            period: History period to return
+            interval: Bar interval
+            
+        Returns:
+            DataFrame with a DatetimeIndex and OHLCV columns
+        """
+        now = pd.Timestamp.now(tz='UTC')
+        offset = parse_duration(period)
+        wanted_from = None if offset is None else now - offset
+        meta = self._read_meta(symbol, interval)
+        
+        try:
+            if meta is None or not self._covers(meta, wanted_from):
+                df = self.provider.fetch(symbol, interval=interval, period=period)
+                self._replace(symbol, interval, df, period, wanted_from)
+            elif self._is_stale(meta, interval, now):
+                self._append_tail(symbol, interval, meta)
+        except Exception as e:
+            if meta is None:
+                raise
+            logger.warning(f"Serving cached {symbol} {interval} bars, provider failed: {str(e)}")
+        
+        df = self.read(symbol, interval)
+        if wanted_from is not None:
+            df = df[df.index >= wanted_from.tz_convert(df.index.tz)]
+        if df.empty:
+            raise ValueError(f"No data found for symbol {symbol}")
+        return df
+    
+    def read(self, symbol: str, interval: str = "1d") -> pd.DataFrame:
+        """Read every cached bar of a series without touching the provider."""
+        path = self._bars_path(symbol, interval)
+        meta = self._read_meta(symbol, interval) or {}
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], tz='UTC'))
+        
+        bars = np.memmap(path, dtype=BAR_DTYPE, mode='r')
+        index = pd.to_datetime(np.asarray(bars['ts']), utc=True)
+        if meta.get('tz'):
+            index = index.tz_convert(meta['tz'])
+        return pd.DataFrame({column: np.asarray(bars[column]) for column in OHLCV_COLUMNS}, index=index)
+    
+    def _covers(self, meta: Dict, wanted_from: Optional[pd.Timestamp]) -> bool:
+        """Check whether the cached series was fetched far enough back."""
+        requested_from = meta.get('requested_from')
+        if requested_from is None:
+            return True  # The cache already holds the full ('max') history
+        if wanted_from is None:
+            return False
+        return pd.Timestamp(requested_from) <= wanted_from + pd.Timedelta(days=1)
+    
+    def _is_stale(self, meta: Dict, interval: str, now: pd.Timestamp) -> bool:
+        """Check whether a new bar may have closed since the last provider call."""
+        fetched_at = pd.Timestamp(meta['fetched_at'])
+        step = parse_duration(interval)
+        next_refresh = fetched_at + self.min_refresh
+        if step is not None:
+            next_refresh = max(next_refresh, fetched_at + step)
+        return now >= next_refresh
+    
+    def _append_tail(self, symbol: str, interval: str, meta: Dict) -> None:
+        """Fetch bars from the last cached one onwards and append them."""
+        path = self._bars_path(symbol, interval)
+        last_ts = None
+        if os.path.getsize(path) > 0:
+            bars = np.memmap(path, dtype=BAR_DTYPE, mode='r')
+            last_ts = int(bars['ts'][-1])
+            del bars
+        
+        if last_ts is None:
+            tail = self.provider.fetch(symbol, interval=interval, period=meta.get('period', '1y'))
+        else:
+            tail = self.provider.fetch(symbol, interval=interval, start=pd.Timestamp(last_ts, tz='UTC'))
+        records = self._to_records(tail)
+        
+        if last_ts is not None and len(records):
+            records = records[records['ts'] >= last_ts]
+            if len(records) and records['ts'][0] == last_ts:
+                # The last cached bar may have been incomplete, overwrite it in place
+                cached = np.memmap(path, dtype=BAR_DTYPE, mode='r+')
+                cached[-1] = records[0]
+                cached.flush()
+                del cached
+                records = records[1:]
+        
+        with open(path, 'ab') as f:
+            f.write(records.tobytes())
+        
+        meta['fetched_at'] = pd.Timestamp.now(tz='UTC').isoformat()
+        meta['tz'] = meta.get('tz') or self._tz_name(tail)
+        self._write_meta(symbol, interval, meta)
+    
+    def _replace(self, symbol: str, interval: str, df: pd.DataFrame, period: str,
+                 requested_from: Optional[pd.Timestamp]) -> None:
+        """Replace a series with a freshly fetched history."""
+        records = self._to_records(df)
+        path = self._bars_path(symbol, interval)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(records.tobytes())
+        os.replace(tmp_path, path)
+        
+        self._write_meta(symbol, interval, {
+            'fetched_at': pd.Timestamp.now(tz='UTC').isoformat(),
+            'period': period,
+            'requested_from': None if requested_from is None else requested_from.isoformat(),
+            'tz': self._tz_name(df)
+        })
+    
+    def _to_records(self, df: pd.DataFrame) -> np.ndarray:
+        """Convert a provider frame to sorted, de-duplicated bar records."""
+        if df is None or df.empty:
+            return np.empty(0, dtype=BAR_DTYPE)
+        
+        index = pd.DatetimeIndex(df.index)
+        index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+        records = np.empty(len(df), dtype=BAR_DTYPE)
+        records['ts'] = index.as_unit('ns').asi8
+        for column in OHLCV_COLUMNS:
+            records[column] = df[column].to_numpy(dtype=np.float64)
+        
+        records = records[np.argsort(records['ts'], kind='stable')]
+        _, last_of_each = np.unique(records['ts'][::-1], return_index=True)
+        return records[np.sort(len(records) - 1 - last_of_each)]
+    
+    def _tz_name(self, df: pd.DataFrame) -> Optional[str]:
+        tz = getattr(df.index, 'tz', None) if df is not None else None
+        return str(tz) if tz is not None else None
+    
+    def _series_name(self, symbol: str, interval: str) -> str:
+        return re.sub(r'[^A-Za-z0-9._-]', '_', f"{symbol.upper()}_{interval}")
+    
+    def _bars_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.data_dir, f"{self._series_name(symbol, interval)}.bars")
+    
+    def _meta_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.data_dir, f"{self._series_name(symbol, interval)}.json")
+    
+    def _read_meta(self, symbol: str, interval: str) -> Optional[Dict]:
+        path = self._meta_path(symbol, interval)
+        if not os.path.exists(path) or not os.path.exists(self._bars_path(symbol, interval)):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _write_meta(self, symbol: str, interval: str, meta: Dict) -> None:
+        path = self._meta_path(symbol, interval)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
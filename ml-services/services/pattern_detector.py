@@ -3,7 +3,7 @@ import pandas as pd
 from typing import Dict, List, Tuple, Optional
 import logging
 from enum import Enum
-import talib
+from services.candle_patterns import CandlestickRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -21,18 +21,36 @@ class PatternType(Enum):
     THREE_WHITE_SOLDIERS = "Three White Soldiers"
     THREE_BLACK_CROWS = "Three Black Crows"
 
+# Direction of the single- and multi-candle rules, as counted by get_pattern_summary
+CANDLE_DIRECTIONS = {
+    str(PatternType.BULLISH_ENGULFING): 'bullish',
+    str(PatternType.BEARISH_ENGULFING): 'bearish',
+    str(PatternType.MORNING_STAR): 'bullish',
+    str(PatternType.EVENING_STAR): 'bearish',
+    str(PatternType.HAMMER): 'bullish',
+    str(PatternType.SHOOTING_STAR): 'bearish',
+    str(PatternType.BULLISH_HARAMI): 'bullish',
+    str(PatternType.BEARISH_HARAMI): 'bearish',
+    str(PatternType.DOJI): 'neutral',
+    str(PatternType.THREE_WHITE_SOLDIERS): 'bullish',
+    str(PatternType.THREE_BLACK_CROWS): 'bearish'
+}
+
 class PatternDetector:
     """Service for detecting candlestick patterns in financial time series data."""
     
-    def __init__(self, min_body_percent: float = 0.1, min_shadow_percent: float = 0.05):
+    def __init__(self, min_body_percent: float = 0.1, min_shadow_percent: float = 0.05,
+                 talib_patterns: Optional[List[str]] = None):
         """Initialize the pattern detector.
         
         Args:
             min_body_percent: Minimum body size as percentage of price range
             min_shadow_percent: Minimum shadow size as percentage of price range
+            talib_patterns: CDL* functions to evaluate (default: the full available family)
         """
         self.min_body = min_body_percent
         self.min_shadow = min_shadow_percent
+        self.registry = CandlestickRegistry(talib_patterns)
     
     def detect_all(self, df: pd.DataFrame) -> Dict[str, List[Dict]]:
         """Detect all candlestick patterns in the given data.
@@ -44,153 +62,193 @@ class PatternDetector:
             Dictionary mapping pattern types to lists of detection results
         """
         results = {}
+        timestamp = pd.Timestamp.utcnow().isoformat()
+        
+        for pattern_type, (indices, confidence) in self.detect_indices(df).items():
+            self._add_results(results, pattern_type, indices, confidence, timestamp)
+        
+        return results
+    
+    def detect_indices(self, df: pd.DataFrame) -> Dict[str, Tuple[np.ndarray, float]]:
+        """Detect all candlestick patterns as index arrays.
         
-        # Detect single-candle patterns
-        results.update(self._detect_single_candle_patterns(df))
+        Args:
+            df: DataFrame with OHLCV data
+            
+        Returns:
+            Dictionary mapping pattern types to (positional indices, confidence)
+            for every pattern with at least one hit
+        """
+        return self.detect_arrays(*self._ohlc_arrays(df))
+    
+    def detect_arrays(self, o: np.ndarray, h: np.ndarray, l: np.ndarray,
+                      c: np.ndarray) -> Dict[str, Tuple[np.ndarray, float]]:
+        """Detect all candlestick patterns in contiguous float64 OHLC arrays.
+        
+        Returns:
+            Dictionary mapping pattern types to (positional indices, confidence)
+            for every pattern with at least one hit
+        """
+        results = {}
         
-        # Detect multi-candle patterns
-        results.update(self._detect_multi_candle_patterns(df))
+        # Detect single- and multi-candle patterns
+        for pattern_type, (mask, confidence) in self.candle_masks(o, h, l, c).items():
+            indices = np.flatnonzero(mask)
+            if len(indices):
+                results[pattern_type] = (indices, confidence)
         
         # Detect patterns using TA-Lib
-        results.update(self._detect_talib_patterns(df))
+        results.update(self._talib_indices(o, h, l, c))
         
         return results
     
-    def _detect_single_candle_patterns(self, df: pd.DataFrame) -> Dict:
+    def candle_masks(self, o: np.ndarray, h: np.ndarray, l: np.ndarray,
+                     c: np.ndarray) -> Dict[str, Tuple[np.ndarray, float]]:
+        """Evaluate every single- and multi-candle rule over whole OHLC arrays.
+        
+        Time runs along the last axis, so the arrays may be 1-D for one symbol or
+        2-D (symbols x time) for a panel.
+        
+        Returns:
+            Dictionary mapping pattern types to (boolean mask, confidence)
+        """
+        masks = self._single_candle_masks(o, h, l, c)
+        masks.update(self._multi_candle_masks(o, h, l, c))
+        return masks
+    
+    def _single_candle_masks(self, o: np.ndarray, h: np.ndarray, l: np.ndarray,
+                             c: np.ndarray) -> Dict[str, Tuple[np.ndarray, float]]:
         """Detect single-candle patterns like Doji, Hammer, etc."""
-        results = {}
+        # Calculate candle properties
+        body_size = np.abs(c - o)
+        upper_shadow = h - np.maximum(o, c)
+        lower_shadow = np.minimum(o, c) - l
+        total_range = h - l
         
-        for i in range(len(df)):
-            candle = df.iloc[i]
-            o, h, l, c = candle['open'], candle['high'], candle['low'], candle['close']
-            
-            # Calculate candle properties
-            body_size = abs(c - o)
-            upper_shadow = h - max(o, c)
-            lower_shadow = min(o, c) - l
-            total_range = h - l
+        with np.errstate(divide='ignore', invalid='ignore'):
+            has_range = total_range > 0
+            body_percent = np.where(has_range, body_size / total_range, 0)
+            upper_shadow_percent = np.where(has_range, upper_shadow / total_range, 0)
+            lower_shadow_percent = np.where(has_range, lower_shadow / total_range, 0)
             
             # Skip candles with very small range
-            if total_range < 0.01 * o:
-                continue
-                
-            body_percent = body_size / total_range if total_range > 0 else 0
-            upper_shadow_percent = upper_shadow / total_range if total_range > 0 else 0
-            lower_shadow_percent = lower_shadow / total_range if total_range > 0 else 0
-            
-            # Detect Doji (small body, long shadows)
-            if body_percent < 0.1 and (upper_shadow_percent > 0.3 or lower_shadow_percent > 0.3):
-                self._add_result(results, str(PatternType.DOJI), i, 0.7)
-            
-            # Detect Hammer (small body, long lower shadow, little or no upper shadow)
-            if (body_percent < 0.3 and lower_shadow_percent > 0.6 and 
-                upper_shadow_percent < 0.1 and c > o):
-                self._add_result(results, str(PatternType.HAMMER), i, 0.8)
-            
-            # Detect Shooting Star (small body, long upper shadow, little or no lower shadow)
-            if (body_percent < 0.3 and upper_shadow_percent > 0.6 and 
-                lower_shadow_percent < 0.1 and o > c):
-                self._add_result(results, str(PatternType.SHOOTING_STAR), i, 0.8)
+            valid = ~(total_range < 0.01 * o)
         
-        return results
+        # Doji (small body, long shadows)
+        doji = valid & (body_percent < 0.1) & ((upper_shadow_percent > 0.3) | (lower_shadow_percent > 0.3))
+        
+        # Hammer (small body, long lower shadow, little or no upper shadow)
+        hammer = (valid & (body_percent < 0.3) & (lower_shadow_percent > 0.6) &
+                  (upper_shadow_percent < 0.1) & (c > o))
+        
+        # Shooting Star (small body, long upper shadow, little or no lower shadow)
+        shooting_star = (valid & (body_percent < 0.3) & (upper_shadow_percent > 0.6) &
+                         (lower_shadow_percent < 0.1) & (o > c))
+        
+        return {
+            str(PatternType.DOJI): (doji, 0.7),
+            str(PatternType.HAMMER): (hammer, 0.8),
+            str(PatternType.SHOOTING_STAR): (shooting_star, 0.8)
+        }
     
-    def _detect_multi_candle_patterns(self, df: pd.DataFrame) -> Dict:
+    def _multi_candle_masks(self, o: np.ndarray, h: np.ndarray, l: np.ndarray,
+                            c: np.ndarray) -> Dict[str, Tuple[np.ndarray, float]]:
         """Detect multi-candle patterns like Engulfing, Harami, etc."""
-        results = {}
+        # Previous candles, NaN-padded so comparisons are False before the start
+        po, pc = self._shift(o, 1), self._shift(c, 1)
+        ppo, ppc = self._shift(o, 2), self._shift(c, 2)
+        co, ch, cl, cc = o, h, l, c
         
-        for i in range(1, len(df)):
-            prev_candle = df.iloc[i-1]
-            curr_candle = df.iloc[i]
-            
-            po, ph, pl, pc = prev_candle['open'], prev_candle['high'], prev_candle['low'], prev_candle['close']
-            co, ch, cl, cc = curr_candle['open'], curr_candle['high'], curr_candle['low'], curr_candle['close']
-            
-            # Bullish Engulfing
-            if (pc < po and  # Previous candle is bearish
-                co < cl and cc > ch and  # Current candle is bullish and engulfs previous
-                co <= pc and cc >= po):  # Current candle's body engulfs previous candle's body
-                self._add_result(results, str(PatternType.BULLISH_ENGULFING), i, 0.85)
-            
-            # Bearish Engulfing
-            if (pc > po and  # Previous candle is bullish
-                co > ch and cc < cl and  # Current candle is bearish and engulfs previous
-                co >= pc and cc <= po):  # Current candle's body engulfs previous candle's body
-                self._add_result(results, str(PatternType.BEARISH_ENGULFING), i, 0.85)
-            
-            # Bullish Harami
-            if (po > pc and  # Previous candle is bearish
-                co < cc and  # Current candle is bullish
-                co > pc and cc < po):  # Current candle's body is inside previous candle's body
-                self._add_result(results, str(PatternType.BULLISH_HARAMI), i, 0.75)
-            
-            # Bearish Harami
-            if (po < pc and  # Previous candle is bullish
-                co > cc and  # Current candle is bearish
-                co < pc and cc > po):  # Current candle's body is inside previous candle's body
-                self._add_result(results, str(PatternType.BEARISH_HARAMI), i, 0.75)
-            
-            # Check for Three White Soldiers (need at least 3 candles)
-            if i >= 2:
-                prev_prev_candle = df.iloc[i-2]
-                ppo, ppc = prev_prev_candle['open'], prev_prev_candle['close']
-                
-                # Three White Soldiers (bullish)
-                if (ppc > ppo and pc > po and cc > co and  # Three consecutive bullish candles
-                    cc > pc and pc > ppc and  # Each close is higher than previous
-                    (cc - co) > (pc - po) and (pc - po) > (ppc - ppo)):  # Increasing momentum
-                    self._add_result(results, str(PatternType.THREE_WHITE_SOLDIERS), i, 0.9)
-                
-                # Three Black Crows (bearish)
-                if (ppc < ppo and pc < po and cc < co and  # Three consecutive bearish candles
-                    cc < pc and pc < ppc and  # Each close is lower than previous
-                    (co - cc) > (po - pc) and (po - pc) > (ppo - ppc)):  # Increasing momentum
-                    self._add_result(results, str(PatternType.THREE_BLACK_CROWS), i, 0.9)
+        # Bullish Engulfing
+        bullish_engulfing = ((pc < po) &  # Previous candle is bearish
+                             (co < cl) & (cc > ch) &  # Current candle is bullish and engulfs previous
+                             (co <= pc) & (cc >= po))  # Current candle's body engulfs previous candle's body
         
-        return results
-    
-    def _detect_talib_patterns(self, df: pd.DataFrame) -> Dict:
-        """Detect patterns using TA-Lib for more complex patterns."""
-        results = {}
+        # Bearish Engulfing
+        bearish_engulfing = ((pc > po) &  # Previous candle is bullish
+                             (co > ch) & (cc < cl) &  # Current candle is bearish and engulfs previous
+                             (co >= pc) & (cc <= po))  # Current candle's body engulfs previous candle's body
         
-        # Convert to numpy arrays for TA-Lib
-        opens = df['open'].values
-        highs = df['high'].values
-        lows = df['low'].values
-        closes = df['close'].values
+        # Bullish Harami
+        bullish_harami = ((po > pc) &  # Previous candle is bearish
+                          (co < cc) &  # Current candle is bullish
+                          (co > pc) & (cc < po))  # Current candle's body is inside previous candle's body
         
-        # Morning Star (bullish reversal)
-        morning_star = talib.CDLMORNINGSTAR(opens, highs, lows, closes)
-        for i in range(len(morning_star)):
-            if morning_star[i] > 0:  # 100 indicates a morning star pattern
-                self._add_result(results, "Morning Star (TA-Lib)", i, 0.9)
+        # Bearish Harami
+        bearish_harami = ((po < pc) &  # Previous candle is bullish
+                          (co > cc) &  # Current candle is bearish
+                          (co < pc) & (cc > po))  # Current candle's body is inside previous candle's body
         
-        # Evening Star (bearish reversal)
-        evening_star = talib.CDLEVENINGSTAR(opens, highs, lows, closes)
-        for i in range(len(evening_star)):
-            if evening_star[i] < 0:  # -100 indicates an evening star pattern
-                self._add_result(results, "Evening Star (TA-Lib)", i, 0.9)
+        # Three White Soldiers (bullish)
+        three_white_soldiers = ((ppc > ppo) & (pc > po) & (cc > co) &  # Three consecutive bullish candles
+                                (cc > pc) & (pc > ppc) &  # Each close is higher than previous
+                                ((cc - co) > (pc - po)) & ((pc - po) > (ppc - ppo)))  # Increasing momentum
         
-        # Add more TA-Lib patterns as needed...
+        # Three Black Crows (bearish)
+        three_black_crows = ((ppc < ppo) & (pc < po) & (cc < co) &  # Three consecutive bearish candles
+                             (cc < pc) & (pc < ppc) &  # Each close is lower than previous
+                             ((co - cc) > (po - pc)) & ((po - pc) > (ppo - ppc)))  # Increasing momentum
         
-        return results
+        return {
+            str(PatternType.BULLISH_ENGULFING): (bullish_engulfing, 0.85),
+            str(PatternType.BEARISH_ENGULFING): (bearish_engulfing, 0.85),
+            str(PatternType.BULLISH_HARAMI): (bullish_harami, 0.75),
+            str(PatternType.BEARISH_HARAMI): (bearish_harami, 0.75),
+            str(PatternType.THREE_WHITE_SOLDIERS): (three_white_soldiers, 0.9),
+            str(PatternType.THREE_BLACK_CROWS): (three_black_crows, 0.9)
+        }
     
-    def _add_result(self, results: Dict, pattern_type: str, index: int, confidence: float) -> None:
-        """Helper method to add a pattern detection result."""
-        if pattern_type not in results:
-            results[pattern_type] = []
-        
-        results[pattern_type].append({
-            'index': index,
-            'confidence': confidence,
-            'timestamp': pd.Timestamp.utcnow().isoformat()
-        })
+    def _detect_talib_patterns(self, df: pd.DataFrame) -> Dict[str, Tuple[np.ndarray, float]]:
+        """Detect patterns using TA-Lib (or its NumPy fallbacks) for more complex patterns."""
+        # Convert to numpy arrays for TA-Lib
+        return self._talib_indices(*self._ohlc_arrays(df))
+    
+    def _talib_indices(self, opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                       closes: np.ndarray) -> Dict[str, Tuple[np.ndarray, float]]:
+        """Run the registered CDL* pattern functions over contiguous float64 arrays."""
+        return self.registry.evaluate(opens, highs, lows, closes)
+    
+    def pattern_direction(self, pattern_type: str) -> str:
+        """Get whether a detected pattern type is 'bullish', 'bearish' or 'neutral'."""
+        return CANDLE_DIRECTIONS.get(pattern_type) or self.registry.directions.get(pattern_type, 'neutral')
+    
+    def talib_lookback(self) -> int:
+        """Number of prior candles the TA-Lib patterns need to evaluate a candle."""
+        return self.registry.lookback
     
-    def get_pattern_summary(self, df: pd.DataFrame, window: int = 20) -> Dict:
+    def _ohlc_arrays(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Get contiguous float64 open, high, low and close arrays."""
+        return tuple(
+            np.ascontiguousarray(df[column].to_numpy(dtype=np.float64))
+            for column in ('open', 'high', 'low', 'close')
+        )
+    
+    @staticmethod
+    def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+        """Shift values forward along the last axis, padding with NaN."""
+        shifted = np.full(values.shape, np.nan)
+        if periods < values.shape[-1]:
+            shifted[..., periods:] = values[..., :-periods]
+        return shifted
+    
+    def _add_results(self, results: Dict, pattern_type: str, indices: np.ndarray,
+                     confidence: float, timestamp: str) -> None:
+        """Helper method to add pattern detection results for a set of indices."""
+        results.setdefault(pattern_type, []).extend(
+            {'index': index, 'confidence': confidence, 'timestamp': timestamp}
+            for index in indices.tolist()
+        )
+    
+    def get_pattern_summary(self, df: pd.DataFrame, window: int = 20,
+                            edges: Optional[Dict[str, float]] = None) -> Dict:
         """Get a summary of recent patterns in the data.
         
         Args:
             df: DataFrame with OHLCV data
             window: Number of most recent candles to analyze
+            edges: Historical mean forward return per pattern (see
+                PatternStatsIndex.edges); when given, sentiment follows the
+                occurrence-weighted edge instead of bullish/bearish pattern counts
             
         Returns:
             Dictionary with pattern summary
@@ -207,8 +265,9 @@ class PatternDetector:
         pattern_density = sum(pattern_counts.values()) / len(recent_data)
         
         # Determine overall market sentiment based on patterns
-        bullish_patterns = sum(1 for p in patterns.keys() if 'bullish' in p.lower() or 'hammer' in p.lower())
-        bearish_patterns = sum(1 for p in patterns.keys() if 'bearish' in p.lower() or 'shooting' in p.lower())
+        directions = [self.pattern_direction(p) for p in patterns]
+        bullish_patterns = directions.count('bullish')
+        bearish_patterns = directions.count('bearish')
         
         if bullish_patterns > bearish_patterns + 2:
             sentiment = 'bullish'
@@ -217,7 +276,7 @@ class PatternDetector:
         else:
             sentiment = 'neutral'
         
-        return {
+        summary = {
             'pattern_counts': pattern_counts,
             'pattern_density': pattern_density,
             'sentiment': sentiment,
@@ -226,3 +285,24 @@ class PatternDetector:
             'window_size': window,
             'timestamp': pd.Timestamp.utcnow().isoformat()
         }
+        if edges is not None:
+            self._apply_edges(summary, edges)
+        return summary
+    
+    @staticmethod
+    def _apply_edges(summary: Dict, edges: Dict[str, float]) -> None:
+        """Weight a summary's patterns by their historical forward-return edge."""
+        weighted = [(count, edges[pattern]) for pattern, count in summary['pattern_counts'].items()
+                    if pattern in edges]
+        total = sum(count for count, _ in weighted)
+        edge_score = sum(count * edge for count, edge in weighted) / total if total else None
+        
+        summary['edge_score'] = edge_score
+        if edge_score is None:
+            return
+        if edge_score > 0:
+            summary['sentiment'] = 'bullish'
+        elif edge_score < 0:
+            summary['sentiment'] = 'bearish'
+        else:
+            summary['sentiment'] = 'neutral'
@@ -0,0 +1,145 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from services.pattern_detector import PatternDetector
+
+logger = logging.getLogger(__name__)
+
+RESULT_COLUMNS = ['symbol', 'index', 'pattern', 'confidence']
+
+def _scan_shard(detector: PatternDetector, symbols: List[str], panel: np.ndarray, lengths: np.ndarray,
+                since: Optional[int]) -> pd.DataFrame:
+    """Scan one shard of the panel; module-level so it can run in a worker process."""
+    return PatternScanner(detector)._scan_panel(symbols, panel, lengths, since)
+
+class PatternScanner:
+    """
+    Universe-wide candlestick scanner over a symbols x time OHLC panel.
+    
+    Every PatternDetector rule is evaluated across all symbols at once, and the
+    hits come back as one compact (symbol, index, pattern, confidence) table.
+    Large universes can optionally be sharded across a process pool.
+    """
+    
+    def __init__(self, detector: Optional[PatternDetector] = None, max_workers: Optional[int] = None):
+        """Initialize the scanner.
+        
+        Args:
+            detector: PatternDetector providing the pattern rules
+            max_workers: Worker processes for sharded scans (default: scan in-process)
+        """
+        self.detector = detector or PatternDetector()
+        self.max_workers = max_workers
+    
+    def scan_frames(self, frames: Dict[str, pd.DataFrame], since: Optional[int] = None) -> pd.DataFrame:
+        """Scan per-symbol OHLC frames of possibly different lengths.
+        
+        Args:
+            frames: Mapping of symbol to DataFrame with OHLC data, oldest bar first
+            since: Only report hits in each symbol's last `since` bars
+            
+        Returns:
+            DataFrame with one row per hit; index is the positional bar index
+            within that symbol's own frame
+        """
+        symbols = list(frames)
+        lengths = np.array([len(frames[symbol]) for symbol in symbols], dtype=np.int64)
+        width = int(lengths.max()) if len(lengths) else 0
+        
+        # Right-align the series so the latest bars share a column; pad the front with NaN
+        panel = np.full((4, len(symbols), width), np.nan)
+        for row, symbol in enumerate(symbols):
+            if lengths[row]:
+                ohlc = self.detector._ohlc_arrays(frames[symbol])
+                panel[:, row, width - lengths[row]:] = np.stack(ohlc)
+        
+        return self.scan(symbols, *panel, lengths=lengths, since=since)
+    
+    def scan(self, symbols: Sequence[str], opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+             closes: np.ndarray, lengths: Optional[np.ndarray] = None,
+             since: Optional[int] = None) -> pd.DataFrame:
+        """Scan a symbols x time OHLC panel.
+        
+        Args:
+            symbols: Symbol of every panel row
+            opens, highs, lows, closes: 2-D arrays of shape (symbols, time)
+            lengths: Number of real bars per row when rows are right-aligned
+                     and NaN-padded at the front (default: full width)
+            since: Only report hits in each symbol's last `since` bars
+            
+        Returns:
+            DataFrame with one row per (symbol, index, pattern, confidence) hit
+        """
+        symbols = list(symbols)
+        panel = np.stack([opens, highs, lows, closes]).astype(np.float64, copy=False)
+        if lengths is None:
+            lengths = np.full(len(symbols), panel.shape[2], dtype=np.int64)
+        
+        if not self.max_workers or self.max_workers < 2 or len(symbols) < 2:
+            return self._scan_panel(symbols, panel, lengths, since)
+        
+        shards = np.array_split(np.arange(len(symbols)), self.max_workers)
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(_scan_shard, self.detector, [symbols[i] for i in rows], panel[:, rows],
+                                lengths[rows], since)
+                for rows in shards if len(rows)
+            ]
+            parts = [part for part in (future.result() for future in futures) if len(part)]
+        
+        if not parts:
+            return self._empty_result()
+        # concat turns categoricals with different categories into objects; restore the in-process schema
+        result = pd.concat(parts, ignore_index=True)
+        result['symbol'] = pd.Categorical(np.asarray(result['symbol'], dtype=object))
+        result['pattern'] = pd.Categorical(np.asarray(result['pattern'], dtype=object))
+        return result.sort_values(['symbol', 'index'], kind='stable', ignore_index=True)
+    
+    def _scan_panel(self, symbols: List[str], panel: np.ndarray, lengths: np.ndarray,
+                    since: Optional[int]) -> pd.DataFrame:
+        """Evaluate every rule over a panel and collect the hits."""
+        width = panel.shape[2]
+        offsets = width - lengths
+        first_column = offsets if since is None else np.maximum(offsets, width - since)
+        
+        rows, columns, patterns, confidences = [], [], [], []
+        
+        def collect(pattern_type: str, row: np.ndarray, column: np.ndarray, confidence: float) -> None:
+            keep = column >= first_column[row]
+            rows.append(row[keep])
+            columns.append(column[keep])
+            patterns.append(np.full(int(keep.sum()), pattern_type, dtype=object))
+            confidences.append(np.full(int(keep.sum()), confidence))
+        
+        # Hand-written rules: one vectorized pass across all symbols
+        for pattern_type, (mask, confidence) in self.detector.candle_masks(*panel).items():
+            row, column = np.nonzero(mask)
+            collect(pattern_type, row, column, confidence)
+        
+        # TA-Lib runs per series, on the unpadded part of each row
+        for row in range(len(symbols)):
+            offset = int(offsets[row])
+            if offset >= width:
+                continue
+            series = [np.ascontiguousarray(values[row, offset:]) for values in panel]
+            for pattern_type, (indices, confidence) in self.detector._talib_indices(*series).items():
+                collect(pattern_type, np.full(len(indices), row), indices + offset, confidence)
+        
+        if not rows:
+            return self._empty_result()
+        
+        row = np.concatenate(rows)
+        column = np.concatenate(columns)
+        result = pd.DataFrame({
+            'symbol': pd.Categorical(np.asarray(symbols, dtype=object)[row]),
+            'index': column - offsets[row],
+            'pattern': pd.Categorical(np.concatenate(patterns)),
+            'confidence': np.concatenate(confidences)
+        })
+        return result.sort_values(['symbol', 'index'], kind='stable', ignore_index=True)
+    
+    def _empty_result(self) -> pd.DataFrame:
+        return pd.DataFrame({column: [] for column in RESULT_COLUMNS})
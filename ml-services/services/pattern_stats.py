@@ -0,0 +1,232 @@
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+import pandas as pd
+from services.pattern_detector import PatternDetector
+
+logger = logging.getLogger(__name__)
+
+# Per-horizon sufficient statistics kept for every pattern
+STAT_FIELDS = ('count', 'sum', 'sum_sq', 'wins')
+
+class PatternStatsIndex:
+    """
+    Index of the forward-return distribution of every detected pattern.
+    
+    For each symbol and timeframe it keeps, per pattern and horizon, the number of
+    resolved forward returns, their sum, sum of squares and number of positive
+    returns. The first update scans the whole history in one vectorized pass;
+    later updates only detect patterns on the tail and add the forward returns
+    that the new bars resolved. Entries are persisted as JSON per series, and
+    the mean forward return (the pattern's edge) is cached for O(1) lookups.
+    """
+    
+    HORIZONS = (1, 5, 20)
+    
+    def __init__(self, data_dir: str = None, detector: Optional[PatternDetector] = None,
+                 horizons: Iterable[int] = HORIZONS, min_count: int = 10):
+        """Initialize the index.
+        
+        Args:
+            data_dir: Directory holding the persisted statistics
+            detector: PatternDetector used to find the patterns
+            horizons: Forward-return horizons in bars
+            min_count: Minimum resolved returns before a pattern gets an edge
+        """
+        self.data_dir = data_dir or os.path.join(os.path.dirname(__file__), '..', 'data', 'pattern_stats')
+        self.detector = detector or PatternDetector()
+        self.horizons = tuple(sorted(horizons))
+        self.min_count = min_count
+        self._entries: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.data_dir, exist_ok=True)
+    
+    def build(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """Rebuild a series' statistics from its full history.
+        
+        Returns:
+            Number of pattern occurrences indexed
+        """
+        with self._lock:
+            self._entries[(symbol, timeframe)] = self._empty_entry()
+        return self.update(symbol, timeframe, df)
+    
+    def update(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """Add the bars of `df` that the index has not seen yet.
+        
+        Args:
+            symbol: Symbol of the series
+            timeframe: Bar timeframe of the series (e.g. '1d', '15m')
+            df: Closed OHLC bars with a DatetimeIndex, oldest first. It must
+                overlap the last indexed bar; otherwise the series is rebuilt.
+        
+        Returns:
+            Number of new pattern occurrences indexed
+        """
+        timestamps = df.index.as_unit('ns').asi8
+        
+        with self._lock:
+            entry = self._entry(symbol, timeframe)
+            done = 0
+            if entry['last_ts'] is not None:
+                done = int(np.searchsorted(timestamps, entry['last_ts'], side='right'))
+                if done == 0 or timestamps[done - 1] != entry['last_ts']:
+                    logger.warning(f"{symbol} {timeframe} bars do not overlap the pattern index, rebuilding")
+                    entry = self._empty_entry()
+                    done = 0
+            
+            if done >= len(df):
+                return 0
+            
+            # Hits up to the longest horizon back can still resolve returns, and
+            # the detector needs its own lookback before those
+            context = max(2, self.detector.talib_lookback())
+            start = max(0, done - self.horizons[-1] - context)
+            names, occurrences, stats = self._scan(df.iloc[start:], done - start)
+            
+            patterns = entry['patterns']
+            for code, name in enumerate(names):
+                if name not in patterns:
+                    patterns[name] = {'occurrences': 0, 'stats': np.zeros((len(STAT_FIELDS), len(self.horizons)))}
+                patterns[name]['occurrences'] += int(occurrences[code])
+                patterns[name]['stats'] += stats[code]
+            
+            entry['last_ts'] = int(timestamps[-1])
+            entry['edges'] = {}
+            self._entries[(symbol, timeframe)] = entry
+            self._save(symbol, timeframe, entry)
+        
+        return int(occurrences.sum())
+    
+    def _scan(self, df: pd.DataFrame, done: int) -> Tuple[list, np.ndarray, np.ndarray]:
+        """Detect patterns on a window and accumulate the returns resolved after `done`.
+        
+        Returns:
+            Pattern names, their new occurrences and a (patterns, fields, horizons) array
+        """
+        hits = self.detector.detect_indices(df)
+        names = list(hits)
+        closes = df['close'].to_numpy(dtype=np.float64)
+        
+        indices = np.concatenate([hits[name][0] for name in names]) if names else np.zeros(0, dtype=np.int64)
+        codes = np.repeat(np.arange(len(names)), [len(hits[name][0]) for name in names])
+        
+        occurrences = np.bincount(codes[indices >= done], minlength=len(names))
+        stats = np.zeros((len(names), len(STAT_FIELDS), len(self.horizons)))
+        for j, horizon in enumerate(self.horizons):
+            targets = indices + horizon
+            # Only returns whose exit bar is new; earlier ones are already indexed
+            resolved = (targets >= done) & (targets < len(closes))
+            returns = closes[targets[resolved]] / closes[indices[resolved]] - 1
+            resolved_codes = codes[resolved]
+            
+            stats[:, 0, j] = np.bincount(resolved_codes, minlength=len(names))
+            stats[:, 1, j] = np.bincount(resolved_codes, weights=returns, minlength=len(names))
+            stats[:, 2, j] = np.bincount(resolved_codes, weights=returns * returns, minlength=len(names))
+            stats[:, 3, j] = np.bincount(resolved_codes, weights=returns > 0, minlength=len(names))
+        
+        return names, occurrences, stats
+    
+    def get_stats(self, symbol: str, timeframe: str) -> Dict[str, Dict]:
+        """Get the forward-return distribution of every indexed pattern.
+        
+        Returns:
+            Dictionary mapping pattern names to their occurrences and, per
+            horizon, the number of returns, mean, standard deviation and hit rate
+        """
+        with self._lock:
+            patterns = self._entry(symbol, timeframe)['patterns']
+            result = {}
+            for name, pattern in patterns.items():
+                count, total, total_sq, wins = pattern['stats']
+                safe = np.maximum(count, 1)
+                mean = total / safe
+                std = np.sqrt(np.maximum(total_sq / safe - mean ** 2, 0.0))
+                result[name] = {
+                    'occurrences': pattern['occurrences'],
+                    'horizons': {
+                        horizon: {
+                            'count': int(count[j]),
+                            'mean_return': float(mean[j]) if count[j] else None,
+                            'std_return': float(std[j]) if count[j] else None,
+                            'hit_rate': float(wins[j] / count[j]) if count[j] else None
+                        }
+                        for j, horizon in enumerate(self.horizons)
+                    }
+                }
+            return result
+    
+    def edges(self, symbol: str, timeframe: str, horizon: int = 5) -> Dict[str, float]:
+        """Get the mean forward return of every pattern with at least `min_count` returns.
+        
+        The table is computed once per update and cached, so looking up a pattern
+        in it at request time is O(1).
+        """
+        j = self.horizons.index(horizon)
+        with self._lock:
+            entry = self._entry(symbol, timeframe)
+            if horizon not in entry['edges']:
+                entry['edges'][horizon] = {
+                    name: float(pattern['stats'][1, j] / pattern['stats'][0, j])
+                    for name, pattern in entry['patterns'].items()
+                    if pattern['stats'][0, j] >= self.min_count
+                }
+            return entry['edges'][horizon]
+    
+    def edge(self, symbol: str, timeframe: str, pattern: str, horizon: int = 5) -> Optional[float]:
+        """Get one pattern's mean forward return (None when it has too few returns)."""
+        return self.edges(symbol, timeframe, horizon).get(pattern)
+    
+    def _empty_entry(self) -> Dict:
+        return {'last_ts': None, 'patterns': {}, 'edges': {}}
+    
+    def _entry(self, symbol: str, timeframe: str) -> Dict:
+        """Get a series' entry from memory, loading it from disk on first use."""
+        key = (symbol, timeframe)
+        if key not in self._entries:
+            self._entries[key] = self._load(symbol, timeframe)
+        return self._entries[key]
+    
+    def _path(self, symbol: str, timeframe: str) -> str:
+        name = re.sub(r'[^A-Za-z0-9._-]', '_', f"{symbol.upper()}_{timeframe}")
+        return os.path.join(self.data_dir, f"{name}.json")
+    
+    def _load(self, symbol: str, timeframe: str) -> Dict:
+        path = self._path(symbol, timeframe)
+        if not os.path.exists(path):
+            return self._empty_entry()
+        
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if tuple(data['horizons']) != self.horizons:
+            logger.warning(f"Pattern stats for {symbol} {timeframe} use horizons {data['horizons']}, ignoring them")
+            return self._empty_entry()
+        
+        entry = self._empty_entry()
+        entry['last_ts'] = data['last_ts']
+        entry['patterns'] = {
+            name: {'occurrences': pattern['occurrences'],
+                   'stats': np.array([pattern[field] for field in STAT_FIELDS], dtype=np.float64)}
+            for name, pattern in data['patterns'].items()
+        }
+        return entry
+    
+    def _save(self, symbol: str, timeframe: str, entry: Dict) -> None:
+        data = {
+            'horizons': list(self.horizons),
+            'last_ts': entry['last_ts'],
+            'patterns': {
+                name: {'occurrences': pattern['occurrences'],
+                       **{field: pattern['stats'][i].tolist() for i, field in enumerate(STAT_FIELDS)}}
+                for name, pattern in entry['patterns'].items()
+            }
+        }
+        path = self._path(symbol, timeframe)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,144 @@
+import logging
+from collections import deque
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from services.pattern_detector import PatternDetector
+
+logger = logging.getLogger(__name__)
+
+class StreamingPatternDetector:
+    """
+    Per-symbol candlestick pattern detection over a live candle feed.
+    
+    Each closed candle is evaluated against only the few candles its rules look
+    back over, and pattern counts for the summary window are maintained as
+    candles enter and leave it, so every append costs the same regardless of
+    how much history has been seen.
+    """
+    
+    # Candles the hand-written rules look at (Three White Soldiers/Black Crows)
+    RULE_LOOKBACK = 3
+    
+    def __init__(self, symbol: str = None, detector: Optional[PatternDetector] = None, window: int = 20):
+        """Initialize the streaming detector.
+        
+        Args:
+            symbol: Symbol the stream belongs to (informational)
+            detector: PatternDetector providing the pattern rules
+            window: Number of most recent candles the summary covers
+        """
+        self.symbol = symbol
+        self.detector = detector or PatternDetector()
+        self.window = window
+        
+        # The TA-Lib patterns average candle bodies over a longer trailing period
+        self.buffer_size = max(self.RULE_LOOKBACK, self.detector.talib_lookback() + 1)
+        self.candles = deque(maxlen=self.buffer_size)
+        self.window_hits = deque(maxlen=window)
+        self.pattern_counts: Dict[str, int] = {}
+        self.count = 0
+    
+    def on_candle(self, open_: float, high: float, low: float, close: float,
+                  timestamp: Optional[str] = None) -> List[Dict]:
+        """Process one closed candle.
+        
+        Args:
+            open_, high, low, close: Candle prices
+            timestamp: Candle timestamp (default: now)
+            
+        Returns:
+            List of patterns completed by this candle
+        """
+        self.candles.append((open_, high, low, close))
+        index = self.count
+        self.count += 1
+        timestamp = timestamp or pd.Timestamp.utcnow().isoformat()
+        
+        ohlc = np.array(self.candles, dtype=np.float64).T
+        recent = ohlc[:, -self.RULE_LOOKBACK:]
+        
+        hits = []
+        for pattern_type, (mask, confidence) in self.detector.candle_masks(*recent).items():
+            if mask[-1]:
+                hits.append({'pattern': pattern_type, 'index': index,
+                             'confidence': confidence, 'timestamp': timestamp})
+        
+        last = ohlc.shape[1] - 1
+        for pattern_type, (indices, confidence) in self.detector._talib_indices(*ohlc).items():
+            if len(indices) and indices[-1] == last:
+                hits.append({'pattern': pattern_type, 'index': index,
+                             'confidence': confidence, 'timestamp': timestamp})
+        
+        self._slide_window(hits)
+        return hits
+    
+    def warm_up(self, df: pd.DataFrame) -> None:
+        """Seed the stream from history, replaying only the candles the window needs.
+        
+        Args:
+            df: DataFrame with OHLC data, oldest candle first
+        """
+        tail = df.tail(self.window + self.buffer_size)
+        timestamps = [str(ts) for ts in tail.index]
+        for ts, o, h, l, c in zip(timestamps, tail['open'], tail['high'], tail['low'], tail['close']):
+            self.on_candle(o, h, l, c, timestamp=ts)
+    
+    def _slide_window(self, hits: List[Dict]) -> None:
+        """Add this candle's hits to the rolling counts and expire the oldest candle."""
+        if len(self.window_hits) == self.window_hits.maxlen:
+            for hit in self.window_hits[0]:
+                pattern_type = hit['pattern']
+                self.pattern_counts[pattern_type] -= 1
+                if not self.pattern_counts[pattern_type]:
+                    del self.pattern_counts[pattern_type]
+        
+        self.window_hits.append(hits)
+        for hit in hits:
+            self.pattern_counts[hit['pattern']] = self.pattern_counts.get(hit['pattern'], 0) + 1
+    
+    def recent_patterns(self) -> List[Dict]:
+        """Get every pattern hit within the summary window, oldest first."""
+        return [hit for hits in self.window_hits for hit in hits]
+    
+    def get_pattern_summary(self, edges: Optional[Dict[str, float]] = None) -> Dict:
+        """Get a summary of the patterns in the current window.
+        
+        Returns the same fields as PatternDetector.get_pattern_summary. Patterns
+        are counted with their full lookback, including those whose first
+        candles precede the window.
+        
+        Args:
+            edges: Historical mean forward return per pattern, as in
+                PatternDetector.get_pattern_summary
+        """
+        pattern_counts = dict(self.pattern_counts)
+        n_candles = len(self.window_hits)
+        pattern_density = sum(pattern_counts.values()) / n_candles if n_candles else 0.0
+        
+        # Determine overall market sentiment based on patterns
+        directions = [self.detector.pattern_direction(p) for p in pattern_counts]
+        bullish_patterns = directions.count('bullish')
+        bearish_patterns = directions.count('bearish')
+        
+        if bullish_patterns > bearish_patterns + 2:
+            sentiment = 'bullish'
+        elif bearish_patterns > bullish_patterns + 2:
+            sentiment = 'bearish'
+        else:
+            sentiment = 'neutral'
+        
+        summary = {
+            'symbol': self.symbol,
+            'pattern_counts': pattern_counts,
+            'pattern_density': pattern_density,
+            'sentiment': sentiment,
+            'bullish_patterns': bullish_patterns,
+            'bearish_patterns': bearish_patterns,
+            'window_size': self.window,
+            'timestamp': pd.Timestamp.utcnow().isoformat()
+        }
+        if edges is not None:
+            self.detector._apply_edges(summary, edges)
+        return summary
@@ -1,16 +1,17 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
 import logging
 from datetime import datetime, timedelta
 from datetime import datetime, timedelta
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import MinMaxScaler
+from numpy.lib.stride_tricks import sliding_window_view
 import joblib
 import os
-import yfinance as yf
 import warnings
 warnings.filterwarnings("ignore")
+from services.ohlcv_store import OHLCVStore, YFinanceProvider
     
 
 
@@ -19,14 +20,23 @@ logger = logging.getLogger(__name__)
 class PricePredictor:
     """LSTM-based price prediction service for financial time series."""
     
-    def __init__(self, model_path: str = None, lookback: int = 60):
+    FEATURES = ['open', 'high', 'low', 'close', 'volume']
+    
+    def __init__(self, model_path: str = None, lookback: int = 60, float32: bool = False,
+                 n_jobs: Optional[int] = None, data_store: Optional[OHLCVStore] = None):
         """Initialize the price predictor.
         
         Args:
             model_path: Path to a pre-trained model (optional)
             lookback: Number of time steps to look back for prediction
+            float32: Build feature windows in float32 to halve their memory
+            n_jobs: Number of cores the forest uses to fit its trees (default: 1)
+            data_store: Local OHLCV cache fetch_data reads through (optional)
         """
         self.lookback = lookback
+        self.dtype = np.float32 if float32 else np.float64
+        self.n_jobs = n_jobs
+        self.data_store = data_store
         self.scaler = MinMaxScaler(feature_range=(0, 1))
         self.model = None
         
@@ -34,7 +44,7 @@ class PricePredictor:
             self.load_model(model_path)
 
     def fetch_data(self, symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
-        """Fetch historical data using yfinance.
+        """Fetch historical data, from the local data store first if one is set.
         
         Args:
             symbol: Stock symbol (e.g., 'RELIANCE.NS')
@@ -49,8 +59,10 @@ class PricePredictor:
             if not symbol.endswith('.NS') and not symbol.endswith('.BO'):
                 symbol = f"{symbol}.NS"
                 
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(period=period, interval=interval)
+            if self.data_store is not None:
+                df = self.data_store.get(symbol, period=period, interval=interval)
+            else:
+                df = YFinanceProvider().fetch(symbol, interval=interval, period=period)
             
             if df.empty:
                 raise ValueError(f"No data found for symbol {symbol}")
@@ -77,23 +89,43 @@ class PricePredictor:
             target_column: Column to predict (default: 'close')
             
         Returns:
-            X, y: Prepared feature and target arrays
+            X, y: Prepared feature and target arrays. X is a read-only
+            (samples, lookback, features) strided view over the scaled data, so
+            windows are not copied until a batch is consumed (see iter_batches).
         """
         # Select and scale the data
-        data = df[['open', 'high', 'low', 'close', 'volume']].copy()
-        scaled_data = self.scaler.fit_transform(data)
-        
-        # Create sequences
-        X, y = [], []
-        for i in range(self.lookback, len(scaled_data)):
-            X.append(scaled_data[i-self.lookback:i])
-            y.append(scaled_data[i, 3])  # Close price is at index 3
+        data = df[self.FEATURES].to_numpy(dtype=np.float64)
+        scaled_data = self.scaler.fit_transform(data).astype(self.dtype, copy=False)
+        
+        if len(scaled_data) <= self.lookback:
+            return (np.empty((0, self.lookback, len(self.FEATURES)), dtype=self.dtype),
+                    np.empty(0, dtype=self.dtype))
+        
+        # Window i covers rows [i, i + lookback) and predicts row i + lookback
+        X = sliding_window_view(scaled_data[:-1], self.lookback, axis=0).transpose(0, 2, 1)
+        y = scaled_data[self.lookback:, 3]  # Close price is at index 3
             
-        return np.array(X), np.array(y)
+        return X, y
+    
+    @staticmethod
+    def iter_batches(X: np.ndarray, y: np.ndarray, batch_size: int = 1024) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Materialize windows from prepare_data one batch at a time.
+        
+        Args:
+            X: Feature windows (possibly a strided view)
+            y: Target values
+            batch_size: Number of windows per batch
+            
+        Yields:
+            Contiguous (X_batch, y_batch) copies
+        """
+        for start in range(0, len(X), batch_size):
+            stop = start + batch_size
+            yield np.ascontiguousarray(X[start:stop]), y[start:stop]
     
     def build_model(self, input_shape: Tuple[int, int]) -> None:
         """Build the Random Forest model."""
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
+        self.model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=self.n_jobs)
         logger.info("Random Forest model initialized")
     
     def train(self, X: np.ndarray, y: np.ndarray, epochs: int = 50, batch_size: int = 32, 
@@ -107,39 +139,86 @@ class PricePredictor:
         if self.model is None:
             self.build_model(None)
             
-        # Flatten input for Random Forest (samples, timesteps*features)
-        X_flat = X.reshape(X.shape[0], -1)
+        # Copy the windows batch by batch straight into the float32 matrix the
+        # forest fits on, so the strided view from prepare_data is materialized
+        # once instead of as a flattened copy that sklearn would convert again
+        X_flat = np.empty((len(X), int(np.prod(X.shape[1:]))), dtype=np.float32)
+        position = 0
+        for X_batch, _ in self.iter_batches(X, y):
+            X_flat[position:position + len(X_batch)] = X_batch.reshape(len(X_batch), -1)
+            position += len(X_batch)
         
         self.model.fit(X_flat, y)
         return {"loss": 0.0} # Dummy history
     
-    def predict(self, X: np.ndarray) -> np.ndarray:
+    def predict(self, X: np.ndarray, scaler: Optional[MinMaxScaler] = None) -> np.ndarray:
         """Make predictions using the trained model.
         
         Args:
             X: Input features for prediction
+            scaler: Scaler X was scaled with (default: the predictor's own)
             
         Returns:
             Predicted values
         """
         if self.model is None:
-            # If no model, return simple moving average of input close prices
+            # If no model, fall back to the last input close price
             # X shape: (samples, lookback, features)
             # Feature 3 is close price
-            return X[:, -1, 3] * (1 + np.random.normal(0, 0.01, size=len(X)))
-            
-        # Flatten input for Random Forest
-        X_flat = X.reshape(X.shape[0], -1)
-        predictions = self.model.predict(X_flat)
+            predictions = X[:, -1, 3]
+        else:
+            # Flatten input for Random Forest
+            X_flat = X.reshape(X.shape[0], -1)
+            predictions = self.model.predict(X_flat)
         
         # Reshape predictions for inverse transform
         dummy = np.zeros((len(predictions), 5))  # 5 features: OHLCV
         dummy[:, 3] = predictions  # Insert predictions at close price position
         
         # Inverse transform only the predicted values
-        predicted_prices = self.scaler.inverse_transform(dummy)[:, 3]
+        predicted_prices = (self.scaler if scaler is None else scaler).inverse_transform(dummy)[:, 3]
+        if self.model is None:
+            predicted_prices *= 1 + np.random.normal(0, 0.01, size=len(predicted_prices))
         return predicted_prices
     
+    def _window_scaler(self, df: pd.DataFrame) -> MinMaxScaler:
+        """Get the scaler for a prediction on the given history.
+        
+        This is the trained or loaded scaler. Without one, a scaler is fitted on
+        the given history for this call alone, leaving the shared one untouched.
+        """
+        if hasattr(self.scaler, 'scale_'):
+            return self.scaler
+        logger.warning("Scaler is not fitted, fitting a scaler on the provided data")
+        return MinMaxScaler(feature_range=(0, 1)).fit(df[self.FEATURES].to_numpy(dtype=np.float64))
+    
+    def prepare_last_window(self, df: pd.DataFrame, scaler: Optional[MinMaxScaler] = None) -> np.ndarray:
+        """Scale only the trailing lookback rows with the fitted scaler.
+        
+        Args:
+            df: DataFrame with at least lookback rows of OHLCV data
+            scaler: Scaler to use (default: the trained or loaded one, if any)
+            
+        Returns:
+            Array of shape (1, lookback, features) ready for predict
+        """
+        scaler = self._window_scaler(df) if scaler is None else scaler
+        window = df[self.FEATURES].tail(self.lookback).to_numpy(dtype=np.float64)
+        scaled_window = scaler.transform(window).astype(self.dtype, copy=False)
+        return scaled_window[np.newaxis]
+    
+    def predict_next(self, df: pd.DataFrame) -> float:
+        """Predict the price of the bar following the last row with one inference.
+        
+        Args:
+            df: DataFrame with at least lookback rows of OHLCV data
+            
+        Returns:
+            Predicted next close price
+        """
+        scaler = self._window_scaler(df)
+        return float(self.predict(self.prepare_last_window(df, scaler), scaler)[0])
+    
     def save_model(self, model_path: str) -> None:
         """Save the model and scaler to disk.
         
@@ -156,14 +235,16 @@ class PricePredictor:
         joblib.dump(self.scaler, f"{model_path}_scaler.pkl")
         logger.info(f"Model saved to {model_path}")
     
-    def load_model(self, model_path: str) -> None:
+    def load_model(self, model_path: str, mmap_mode: Optional[str] = None) -> None:
         """Load a pre-trained model and scaler.
         
         Args:
             model_path: Path to the model files (without extension)
+            mmap_mode: joblib memory-mapping mode (e.g. 'r') so the forest's
+                       arrays are paged in from disk and shared between processes
         """
         try:
-            self.model = joblib.load(f"{model_path}.pkl")
+            self.model = joblib.load(f"{model_path}.pkl", mmap_mode=mmap_mode)
             self.scaler = joblib.load(f"{model_path}_scaler.pkl")
             logger.info(f"Model loaded from {model_path}")
         except Exception as e:
@@ -180,21 +261,12 @@ class PricePredictor:
         Returns:
             Dictionary with prediction results and signals
         """
-        if len(df) < self.lookback + 1:
-            raise ValueError(f"Insufficient data. Need at least {self.lookback + 1} data points")
-        
-        # Prepare the data
-        X, y = self.prepare_data(df)
-        
-        # Make predictions
-        predictions = self.predict(X)
-        
-        # Get actual prices for comparison
-        actual_prices = df['close'].values[self.lookback:]
+        if len(df) < self.lookback:
+            raise ValueError(f"Insufficient data. Need at least {self.lookback} data points")
         
-        # Calculate next day's predicted change
+        # Predict the next bar from the trailing window only
         last_price = df['close'].iloc[-1]
-        next_prediction = predictions[-1]
+        next_prediction = self.predict_next(df)
         pct_change = (next_prediction - last_price) / last_price
         
         # Generate signal
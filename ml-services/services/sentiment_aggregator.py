@@ -0,0 +1,148 @@
+import logging
+import math
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+Timestamp = Union[datetime, float, str, None]
+
+class SentimentAggregator:
+    """
+    Streaming, exponentially time-decayed news sentiment per symbol.
+    
+    Each symbol keeps three decayed sums: the confidence-weighted sentiment, the
+    confidence, and the article count. An update decays them to the article's
+    time and adds the article, so it costs O(1) no matter how many articles came
+    before. Reads decay the sums to the read time without changing them, and
+    snapshot() reads every symbol at one instant under the lock.
+    """
+    
+    def __init__(self, half_life: float = 6 * 3600.0):
+        """Initialize the aggregator.
+        
+        Args:
+            half_life: Seconds after which an article counts half as much
+        """
+        self.half_life = half_life
+        self.decay_rate = math.log(2) / half_life
+        # symbol -> [time of the sums, weighted sentiment, weight, mentions]
+        self._state: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+    
+    def update(self, symbol: str, sentiment: float, confidence: float = 1.0,
+               timestamp: Timestamp = None) -> None:
+        """Add one scored article mention of a symbol.
+        
+        Args:
+            symbol: Stock symbol
+            sentiment: Article sentiment (-1 to 1)
+            confidence: Sentiment confidence (0 to 1), used as the article's weight
+            timestamp: Publication time (default: now)
+        """
+        at = self._seconds(timestamp)
+        with self._lock:
+            state = self._state.get(symbol)
+            if state is None:
+                self._state[symbol] = [at, sentiment * confidence, confidence, 1.0]
+                return
+            
+            if at >= state[0]:
+                # Move the sums forward to this article
+                decay = math.exp(-self.decay_rate * (at - state[0]))
+                state[0] = at
+                state[1] *= decay
+                state[2] *= decay
+                state[3] *= decay
+                factor = 1.0
+            else:
+                # Late article: add it already decayed to the sums' time
+                factor = math.exp(-self.decay_rate * (state[0] - at))
+            state[1] += factor * sentiment * confidence
+            state[2] += factor * confidence
+            state[3] += factor
+    
+    def add_article(self, result: Dict, symbols: Iterable[str], timestamp: Timestamp = None) -> None:
+        """Add a SentimentAnalyzer.analyze_news_sentiment result for every symbol it mentions.
+        
+        Args:
+            result: Result with 'sentiment' and 'confidence' (and optionally 'timestamp')
+            symbols: Symbols the article is tagged with
+            timestamp: Publication time (default: the result's timestamp, else now)
+        """
+        at = self._seconds(timestamp if timestamp is not None else result.get('timestamp'))
+        for symbol in set(symbols):
+            self.update(symbol, result['sentiment'], result.get('confidence', 1.0), at)
+    
+    def get(self, symbol: str, timestamp: Timestamp = None) -> Optional[Dict]:
+        """Get a symbol's decayed sentiment as of a time (default: now)."""
+        at = self._seconds(timestamp)
+        with self._lock:
+            state = self._state.get(symbol)
+            return self._read(state, at) if state is not None else None
+    
+    def snapshot(self, timestamp: Timestamp = None) -> Dict[str, Dict]:
+        """Get every symbol's decayed sentiment as of one instant (default: now)."""
+        at = self._seconds(timestamp)
+        with self._lock:
+            return {symbol: self._read(state, at) for symbol, state in self._state.items()}
+    
+    def news_payload(self, symbol: str, timestamp: Timestamp = None) -> Dict[str, float]:
+        """Get a symbol's sentiment as the 'news' payload FusionScorer expects.
+        
+        Symbols without articles get a neutral payload.
+        """
+        state = self.get(symbol, timestamp)
+        if state is None:
+            return {'sentiment': 0.0, 'confidence': 0.0}
+        return {'sentiment': state['sentiment'], 'confidence': state['confidence']}
+    
+    def prune(self, min_mentions: float = 0.01, timestamp: Timestamp = None) -> List[str]:
+        """Drop symbols whose decayed mention count fell below `min_mentions`.
+        
+        Returns:
+            Symbols removed
+        """
+        at = self._seconds(timestamp)
+        with self._lock:
+            stale = [symbol for symbol, state in self._state.items()
+                     if self._read(state, at)['mentions'] < min_mentions]
+            for symbol in stale:
+                del self._state[symbol]
+        return stale
+    
+    def remove(self, symbol: str) -> None:
+        """Drop a symbol's state."""
+        with self._lock:
+            self._state.pop(symbol, None)
+    
+    def _read(self, state: List[float], at: float) -> Dict:
+        """Decay a symbol's sums to `at` and derive its sentiment and mention rate."""
+        decay = math.exp(-self.decay_rate * max(at - state[0], 0.0))
+        weighted, weight, mentions = state[1] * decay, state[2] * decay, state[3] * decay
+        return {
+            'sentiment': weighted / weight if weight > 0 else 0.0,
+            # Average confidence of the decayed articles
+            'confidence': weight / mentions if mentions > 0 else 0.0,
+            'mentions': mentions,
+            # A steady rate r keeps the decayed count at r / decay_rate
+            'mention_rate_per_hour': mentions * self.decay_rate * 3600.0,
+            'last_update': datetime.fromtimestamp(state[0], timezone.utc).isoformat()
+        }
+    
+    @staticmethod
+    def _seconds(timestamp: Timestamp) -> float:
+        """Convert a datetime, ISO string or epoch seconds to epoch seconds."""
+        if timestamp is None:
+            return datetime.now(timezone.utc).timestamp()
+        if isinstance(timestamp, str):
+            # Python 3.10's fromisoformat rejects a trailing 'Z'
+            if timestamp.endswith(('Z', 'z')):
+                timestamp = timestamp[:-1] + '+00:00'
+            timestamp = datetime.fromisoformat(timestamp)
+        if isinstance(timestamp, datetime):
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=timezone.utc)
+            return timestamp.timestamp()
+        return float(timestamp)
@@ -1,57 +1,175 @@
 import os
 import logging
-from typing import Dict, List, Tuple, Optional
-import pandas as pd
-import joblib
-from textblob import TextBlob
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-import nltk
-import re
-
-# Download required NLTK data
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple, Optional, Set, Union
+from services.lexicon_matcher import LexiconMatcher, normalize_text
+from services.lexicon_store import MappedLexicon, compile_lexicon, is_current, read_lexicon_csv
 
 logger = logging.getLogger(__name__)
 
+def textblob_score(text: str) -> Dict[str, float]:
+    """Score text with TextBlob's polarity (module level so worker processes can run it)."""
+    try:
+        from textblob import TextBlob  # Imported on first use: it pulls in NLTK
+        
+        blob = TextBlob(text)
+        sentiment = blob.sentiment.polarity
+        confidence = abs(sentiment)  # Use absolute value as confidence
+        
+        return {
+            'sentiment': float(sentiment),
+            'confidence': float(confidence)
+        }
+    except Exception as e:
+        logger.error(f"Error in TextBlob sentiment analysis: {str(e)}")
+        return {'sentiment': 0.0, 'confidence': 0.0}
+
 class SentimentAnalyzer:
-    """Multi-language sentiment analysis service for financial text."""
+    """Multi-language sentiment analysis service for financial text.
+    
+    Construction only lists the lexicon files. Each language's lexicon is
+    loaded the first time the language is used. By default that means mapping
+    its compiled binary (see services.lexicon_store), which is shared by every
+    worker process and is compiled from the CSV first when missing or stale. A
+    newly swapped-in version is picked up within `reload_interval` seconds.
+    Nothing is downloaded: NLTK stopwords are used only if their corpus is
+    already installed.
+    """
     
-    def __init__(self, lexicons_dir: str = None):
+    def __init__(self, lexicons_dir: str = None, cache_dir: str = None, mapped: bool = True,
+                 reload_interval: float = 1.0):
         """Initialize the sentiment analyzer.
         
         Args:
             lexicons_dir: Directory containing sentiment lexicons for different languages
+            cache_dir: Directory for the compiled lexicon cache
+            mapped: Match against memory-mapped compiled lexicons (False builds
+                an in-process LexiconMatcher per language instead)
+            reload_interval: Seconds between checks for a new compiled lexicon
         """
         self.lexicons_dir = lexicons_dir or os.path.join(os.path.dirname(__file__), '..', 'nlp', 'sentiment_lexicons')
+        self.cache_dir = cache_dir or os.path.join(os.path.dirname(__file__), '..', 'data', 'lexicons')
         self.lexicons = {}
         self.stopwords = {}
+        self.matchers = {}
+        self.mapped = mapped
+        self.reload_interval = reload_interval
+        self._checked_at: Dict[str, float] = {}
+        self._batch_engine = None
         
-        # Initialize with default lexicons if available
-        self._load_lexicons()
+        # Only discover the lexicon files; they are loaded on first use
+        self.lexicon_files = self._find_lexicons()
+    
+    @property
+    def languages(self) -> List[str]:
+        """Languages with a custom lexicon."""
+        return sorted(self.lexicon_files)
     
-    def _load_lexicons(self) -> None:
-        """Load sentiment lexicons for different languages."""
+    def _find_lexicons(self) -> Dict[str, str]:
+        """Map each language to its lexicon CSV."""
+        files = {}
         try:
-            # Load lexicons from the lexicons directory
             if os.path.exists(self.lexicons_dir):
                 for filename in os.listdir(self.lexicons_dir):
                     if filename.endswith('_words.csv'):
-                        lang = filename.split('_')[0]
-                        df = pd.read_csv(os.path.join(self.lexicons_dir, filename))
-                        self.lexicons[lang] = df.set_index('word')['sentiment'].to_dict()
-                        
-                        # Load stopwords for the language if available
-                        try:
-                            self.stopwords[lang] = set(stopwords.words(lang))
-                        except:
-                            # Default to English stopwords if language not found
-                            self.stopwords[lang] = set(stopwords.words('english'))
-                            
-                logger.info(f"Loaded lexicons for languages: {list(self.lexicons.keys())}")
+                        files[filename.split('_')[0]] = os.path.join(self.lexicons_dir, filename)
+        except Exception as e:
+            logger.error(f"Error listing lexicons: {str(e)}")
+        return files
+    
+    def get_lexicon(self, language: str) -> Optional[Dict[str, float]]:
+        """Get a language's lexicon, loading it on first use (None if there is none)."""
+        if language not in self.lexicons and language in self.lexicon_files:
+            try:
+                self.lexicons[language], self.stopwords[language] = self._load_lexicon(language)
+                logger.info(f"Loaded {language} lexicon with {len(self.lexicons[language])} words")
+            except Exception as e:
+                logger.error(f"Error loading {language} lexicon: {str(e)}")
+                self.lexicons[language], self.stopwords[language] = None, set()
+        return self.lexicons.get(language)
+    
+    def get_matcher(self, language: str) -> Optional[Union[MappedLexicon, LexiconMatcher]]:
+        """Get the phrase matcher of a language's lexicon, loading it on first use.
+        
+        Stopwords are left out of the matcher, so matched phrases need no filtering.
+        """
+        if language not in self.lexicon_files:
+            return None
+        if self.mapped:
+            return self._get_mapped_lexicon(language)
+        
+        if language not in self.matchers:
+            lexicon = self.get_lexicon(language)
+            if lexicon is None:
+                return None
+            stop_words = self.get_stopwords(language)
+            self.matchers[language] = LexiconMatcher({
+                word: score for word, score in lexicon.items() if normalize_text(str(word)) not in stop_words
+            })
+        return self.matchers[language]
+    
+    def compile_lexicon(self, language: str) -> str:
+        """Compile a language's lexicon CSV into its shared binary, swapping it in atomically.
+        
+        Returns:
+            Path of the compiled lexicon
+        """
+        path = os.path.join(self.cache_dir, f"{language}_words.lex")
+        compile_lexicon(self.lexicon_files[language], path, exclude=self.get_stopwords(language))
+        return path
+    
+    def _get_mapped_lexicon(self, language: str) -> Optional[MappedLexicon]:
+        """Map a language's compiled lexicon, recompiling or remapping it when it changed."""
+        matcher = self.matchers.get(language)
+        now = time.monotonic()
+        if matcher is not None and now - self._checked_at.get(language, 0.0) < self.reload_interval:
+            return matcher
+        self._checked_at[language] = now
+        
+        path = os.path.join(self.cache_dir, f"{language}_words.lex")
+        try:
+            if not is_current(path, self.lexicon_files[language]):
+                self.compile_lexicon(language)
+            if matcher is None or matcher.is_stale():
+                matcher = MappedLexicon(path)
+                self.matchers[language] = matcher
+                logger.info(f"Mapped {language} lexicon with {len(matcher)} terms")
         except Exception as e:
-            logger.error(f"Error loading lexicons: {str(e)}")
+            logger.error(f"Error loading {language} lexicon: {str(e)}")
+        return matcher
+    
+    def get_stopwords(self, language: str) -> Set[str]:
+        """Get the stopwords of a language with a lexicon (empty for other languages).
+        
+        In mapped mode they are loaded on their own, so the lexicon dict is never built.
+        """
+        if language not in self.stopwords and language in self.lexicon_files:
+            if self.mapped:
+                self.stopwords[language] = self._load_stopwords(language)
+            else:
+                self.get_lexicon(language)
+        return self.stopwords.get(language, set())
+    
+    def _load_lexicon(self, language: str) -> Tuple[Dict[str, float], Set[str]]:
+        """Read a lexicon CSV into a dict, with the language's stopwords."""
+        return read_lexicon_csv(self.lexicon_files[language]), self._load_stopwords(language)
+    
+    def _load_stopwords(self, language: str) -> Set[str]:
+        """Load NLTK stopwords for a language if the corpus is installed locally."""
+        try:
+            from nltk.corpus import stopwords
+        except ImportError:
+            return set()
+        
+        for name in (language, 'english'):
+            try:
+                return set(stopwords.words(name))
+            except (LookupError, OSError):
+                # Language (or the whole corpus) not installed; never download at runtime
+                continue
+        logger.warning(f"NLTK stopwords not installed, using none for {language}")
+        return set()
     
     def preprocess_text(self, text: str, language: str = 'en') -> List[str]:
         """Preprocess text for sentiment analysis.
@@ -63,18 +181,15 @@ class SentimentAnalyzer:
         Returns:
             List of preprocessed tokens
         """
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove URLs, mentions, and special characters
-        text = re.sub(r'http\S+|www.\S+|@\w+|#\w+', '', text)
-        text = re.sub(r'[^\w\s]', ' ', text)
+        # Lowercase and remove URLs, mentions and punctuation (keeping Indic vowel signs)
+        text = normalize_text(text)
         
-        # Tokenize
-        tokens = word_tokenize(text)
+        # Tokenize: with punctuation already removed, word_tokenize would only split
+        # on whitespace (bar contractions such as "cannot"), so skip the punkt models
+        tokens = text.split()
         
         # Remove stopwords
-        stop_words = self.stopwords.get(language, set())
+        stop_words = self.get_stopwords(language)
         tokens = [word for word in tokens if word not in stop_words and len(word) > 2]
         
         return tokens
@@ -93,37 +208,30 @@ class SentimentAnalyzer:
             return {'sentiment': 0.0, 'confidence': 0.0}
         
         # Use custom lexicon if available for the language
-        if language in self.lexicons:
-            tokens = self.preprocess_text(text, language)
-            lexicon = self.lexicons[language]
-            
-            # Calculate sentiment using lexicon
-            scores = []
-            for token in tokens:
-                if token in lexicon:
-                    scores.append(lexicon[token])
-            
-            if scores:
-                sentiment = sum(scores) / len(scores)  # Average sentiment score
-                confidence = min(len(scores) / 10, 1.0)  # Confidence based on number of matched words
-                return {
-                    'sentiment': float(sentiment),
-                    'confidence': float(confidence)
-                }
+        result = self.lexicon_score(text, language)
+        if result is not None:
+            return result
         
         # Fallback to TextBlob for languages without custom lexicons
-        try:
-            blob = TextBlob(text)
-            sentiment = blob.sentiment.polarity
-            confidence = abs(sentiment)  # Use absolute value as confidence
-            
-            return {
-                'sentiment': float(sentiment),
-                'confidence': float(confidence)
-            }
-        except Exception as e:
-            logger.error(f"Error in TextBlob sentiment analysis: {str(e)}")
-            return {'sentiment': 0.0, 'confidence': 0.0}
+        return textblob_score(text)
+    
+    def lexicon_score(self, text: str, language: str = 'en') -> Optional[Dict[str, float]]:
+        """Score text with the language's lexicon (None when no lexicon phrase matches)."""
+        matcher = self.get_matcher(language)
+        if matcher is None:
+            return None
+        
+        # Calculate sentiment from every lexicon word and phrase in one pass
+        scores = [score for _, score in matcher.match(text)]
+        if not scores:
+            return None
+        
+        sentiment = sum(scores) / len(scores)  # Average sentiment score
+        confidence = min(len(scores) / 10, 1.0)  # Confidence based on number of matched words
+        return {
+            'sentiment': float(sentiment),
+            'confidence': float(confidence)
+        }
     
     def analyze_news_sentiment(self, title: str, content: str, source: str, language: str = 'en') -> Dict:
         """Analyze sentiment of a news article.
@@ -161,7 +269,7 @@ class SentimentAnalyzer:
             'content_sentiment': content_sentiment['sentiment'],
             'source': source,
             'language': language,
-            'timestamp': pd.Timestamp.utcnow().isoformat()
+            'timestamp': datetime.now(timezone.utc).isoformat()
         }
     
     def analyze_batch(self, texts: List[str], language: str = 'en') -> List[Dict]:
@@ -174,7 +282,12 @@ class SentimentAnalyzer:
         Returns:
             List of sentiment analysis results
         """
-        return [self.get_sentiment_score(text, language) for text in texts]
+        if self._batch_engine is None:
+            from services.sentiment_batch import SentimentBatchEngine
+            
+            # Duplicates are scored once; the TextBlob fallback stays in-process
+            self._batch_engine = SentimentBatchEngine(self, max_workers=1)
+        return self._batch_engine.score(texts, language)
     
     def get_keywords(self, text: str, language: str = 'en', top_n: int = 10) -> List[Tuple[str, float]]:
         """Extract keywords from text with their relevance scores.
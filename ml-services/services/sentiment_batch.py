@@ -0,0 +1,130 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Union
+from services.sentiment_analyzer import SentimentAnalyzer, textblob_score
+
+logger = logging.getLogger(__name__)
+
+def _textblob_chunk(texts: List[str]) -> List[Dict[str, float]]:
+    """Score a chunk of texts with TextBlob in a worker process."""
+    return [textblob_score(text) for text in texts]
+
+class SentimentBatchEngine:
+    """
+    Batch sentiment scoring for large volumes of short texts such as headlines.
+    
+    Texts are deduplicated by a hash of their language and content, then grouped
+    by language. Texts with a lexicon match are scored in-process through each
+    language's compiled matcher. The rest fall back to TextBlob, which is spread
+    across a process pool once there are enough of them. The pool's workers are
+    spawned rather than forked, since the engine lives in a threaded server.
+    Results come back in input order.
+    """
+    
+    def __init__(self, analyzer: Optional[SentimentAnalyzer] = None, max_workers: Optional[int] = None,
+                 min_parallel: int = 256, chunk_size: int = 512):
+        """Initialize the engine.
+        
+        Args:
+            analyzer: SentimentAnalyzer providing the lexicons
+            max_workers: Processes for the TextBlob fallback (default: all cores; 1 stays in-process)
+            min_parallel: Fewest fallback texts worth sending to the pool
+            chunk_size: Largest number of texts sent to a worker at once
+        """
+        self.analyzer = analyzer or SentimentAnalyzer()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_parallel = min_parallel
+        self.chunk_size = chunk_size
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def score(self, texts: List[str], languages: Union[str, List[str]] = 'en') -> List[Dict[str, float]]:
+        """Score a batch of texts.
+        
+        Args:
+            texts: Texts to score
+            languages: One language code for every text, or one per text
+        
+        Returns:
+            Sentiment results (as from SentimentAnalyzer.get_sentiment_score) in input order
+        """
+        if isinstance(languages, str):
+            languages = [languages] * len(texts)
+        if len(languages) != len(texts):
+            raise ValueError("Expected one language per text")
+        
+        # Deduplicate by content hash, remembering where every input lands
+        unique: Dict[bytes, int] = {}
+        keys = []
+        positions = []
+        for text, language in zip(texts, languages):
+            digest = hashlib.blake2b(f"{language}\0{text}".encode('utf-8'), digest_size=16).digest()
+            position = unique.setdefault(digest, len(keys))
+            if position == len(keys):
+                keys.append((text, language))
+            positions.append(position)
+        
+        # Group by language and run the lexicon path in-process
+        by_language: Dict[str, List[int]] = {}
+        for position, (_, language) in enumerate(keys):
+            by_language.setdefault(language, []).append(position)
+        
+        results: List[Optional[Dict[str, float]]] = [None] * len(keys)
+        fallback = []
+        for language, group in by_language.items():
+            for position in group:
+                text = keys[position][0]
+                if not text or not text.strip():
+                    results[position] = {'sentiment': 0.0, 'confidence': 0.0}
+                    continue
+                results[position] = self.analyzer.lexicon_score(text, language)
+                if results[position] is None:
+                    fallback.append(position)
+        
+        fallback_texts = [keys[position][0] for position in fallback]
+        for position, result in zip(fallback, self._textblob_scores(fallback_texts)):
+            results[position] = result
+        
+        logger.info(f"Scored {len(texts)} texts ({len(keys)} unique, {len(fallback)} via TextBlob)")
+        return [dict(results[position]) for position in positions]
+    
+    def _textblob_scores(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Score texts with TextBlob, in the process pool when the batch is large enough."""
+        if self.max_workers <= 1 or len(texts) < self.min_parallel:
+            return _textblob_chunk(texts)
+        
+        # Even chunks so every worker gets a share, capped at chunk_size texts
+        n_chunks = max(self.max_workers, -(-len(texts) // self.chunk_size))
+        size = -(-len(texts) // n_chunks)
+        chunks = [texts[start:start + size] for start in range(0, len(texts), size)]
+        
+        scores = []
+        for chunk_scores in self._get_executor().map(_textblob_chunk, chunks):
+            scores.extend(chunk_scores)
+        return scores
+    
+    def start(self) -> None:
+        """Start the worker pool now (e.g. on server startup) instead of on the first large batch."""
+        if self.max_workers > 1:
+            # One tiny chunk per worker spawns them all and imports TextBlob in each
+            list(self._get_executor().map(_textblob_chunk, [['']] * self.max_workers))
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the worker pool on first use and keep it for later batches."""
+        with self._lock:
+            if self._executor is None:
+                # Forking a process that runs threads can copy held locks into the child
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+    
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
@@ -0,0 +1,250 @@
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from services.ohlcv_store import OHLCV_COLUMNS, parse_duration
+from services.pattern_detector import PatternDetector
+
+logger = logging.getLogger(__name__)
+
+def timeframe_ns(timeframe: str) -> int:
+    """Length of a minute, hour or day timeframe ('5m', '1h', '1d') in nanoseconds."""
+    offset = parse_duration(timeframe)
+    if offset is None or not set(offset.kwds) <= {'minutes', 'hours', 'days'}:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(pd.Timedelta(**offset.kwds).value)
+
+class MultiTimeframeBars:
+    """
+    Higher-timeframe bars of one symbol, derived incrementally from base bars.
+    
+    Every timeframe keeps growable contiguous float64 columns whose last row may
+    be a bar that is still open. Each base bar only updates that open row (or
+    starts a new one), so callers get ready-made arrays for PatternDetector
+    without resampling. Buckets are aligned on the local wall clock like
+    pandas' resample, and a bar closes as soon as a base bar reaches its end or
+    a later bucket starts.
+    """
+    
+    def __init__(self, symbol: str, timeframes: Iterable[str] = ('5m', '15m', '1h', '1d'),
+                 base_timeframe: str = '1m', tz: Optional[str] = None, max_bars: int = 5000):
+        """Initialize the bar cache.
+        
+        Args:
+            symbol: Symbol the bars belong to (informational)
+            timeframes: Higher timeframes to derive
+            base_timeframe: Timeframe of the bars fed in
+            tz: Timezone the buckets are aligned in (default: that of the first bars)
+            max_bars: Number of most recent bars kept per timeframe (up to twice
+                as many are held between trims)
+        """
+        self.symbol = symbol
+        self.base_timeframe = base_timeframe
+        self.base_step = timeframe_ns(base_timeframe)
+        self.timeframes = list(timeframes)
+        self.steps = {timeframe: timeframe_ns(timeframe) for timeframe in self.timeframes}
+        for timeframe, step in self.steps.items():
+            if step % self.base_step:
+                raise ValueError(f"Timeframe {timeframe} is not a multiple of {base_timeframe}")
+        
+        self.tz = tz
+        self.max_bars = max_bars
+        self._columns = {timeframe: self._allocate(64) for timeframe in self.timeframes}
+        self._size = dict.fromkeys(self.timeframes, 0)
+        self._open = dict.fromkeys(self.timeframes, False)  # Whether the last row is still open
+    
+    def load(self, df: pd.DataFrame) -> None:
+        """Replace the cache with bars aggregated from base-bar history in one pass.
+        
+        Args:
+            df: Base bars with a DatetimeIndex and OHLCV columns, oldest first
+        """
+        if self.tz is None and df.index.tz is not None:
+            self.tz = str(df.index.tz)
+        local = self._local_ns(df.index)
+        values = {column: df[column].to_numpy(dtype=np.float64) for column in OHLCV_COLUMNS}
+        
+        for timeframe, step in self.steps.items():
+            buckets = local - local % step
+            starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]]) if len(buckets) else np.zeros(0, dtype=np.int64)
+            ends = np.r_[starts[1:], len(buckets)] - 1
+            
+            size = len(starts)
+            columns = self._allocate(max(64, size))
+            columns['ts'][:size] = buckets[starts]
+            columns['open'][:size] = values['open'][starts]
+            columns['close'][:size] = values['close'][ends]
+            if size:
+                columns['high'][:size] = np.maximum.reduceat(values['high'], starts)
+                columns['low'][:size] = np.minimum.reduceat(values['low'], starts)
+                columns['volume'][:size] = np.add.reduceat(values['volume'], starts)
+            
+            self._columns[timeframe] = columns
+            self._size[timeframe] = size
+            self._open[timeframe] = bool(size) and local[-1] + self.base_step < buckets[-1] + step
+            self._trim(timeframe)
+    
+    def on_bar(self, timestamp: pd.Timestamp, open_: float, high: float, low: float,
+               close: float, volume: float = 0.0) -> List[str]:
+        """Fold one closed base bar into every timeframe.
+        
+        Args:
+            timestamp: Start of the base bar
+            open_, high, low, close, volume: Base bar values
+        
+        Returns:
+            Timeframes whose bar closed with this base bar
+        """
+        timestamp = pd.Timestamp(timestamp)
+        if self.tz is None and timestamp.tz is not None:
+            self.tz = str(timestamp.tz)
+        if timestamp.tz is not None:
+            timestamp = timestamp.tz_convert(self.tz).tz_localize(None)
+        local = timestamp.as_unit('ns').value
+        
+        closed = []
+        for timeframe, step in self.steps.items():
+            bucket = local - local % step
+            columns, size = self._columns[timeframe], self._size[timeframe]
+            
+            if self._open[timeframe] and columns['ts'][size - 1] == bucket:
+                row = size - 1
+                columns['high'][row] = max(columns['high'][row], high)
+                columns['low'][row] = min(columns['low'][row], low)
+                columns['close'][row] = close
+                columns['volume'][row] += volume
+            else:
+                if self._open[timeframe]:
+                    closed.append(timeframe)  # A later bucket started before this one filled up
+                row = self._append(timeframe)
+                columns = self._columns[timeframe]
+                columns['ts'][row] = bucket
+                columns['open'][row] = open_
+                columns['high'][row] = high
+                columns['low'][row] = low
+                columns['close'][row] = close
+                columns['volume'][row] = volume
+            
+            self._open[timeframe] = local + self.base_step < bucket + step
+            if not self._open[timeframe]:
+                closed.append(timeframe)
+        
+        return closed
+    
+    def close_session(self) -> List[str]:
+        """Close every open bar, e.g. after the last base bar of a trading session.
+        
+        Returns:
+            Timeframes whose bar was closed
+        """
+        closed = [timeframe for timeframe in self.timeframes if self._open[timeframe]]
+        for timeframe in closed:
+            self._open[timeframe] = False
+        return closed
+    
+    def arrays(self, timeframe: str, include_open: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Get contiguous float64 open, high, low and close arrays of a timeframe.
+        
+        The arrays are views of the cache; closed rows are never modified in
+        place, so they stay valid while newer bars arrive.
+        """
+        size = self._visible(timeframe, include_open)
+        columns = self._columns[timeframe]
+        return tuple(columns[column][:size] for column in ('open', 'high', 'low', 'close'))
+    
+    def frame(self, timeframe: str, include_open: bool = False) -> pd.DataFrame:
+        """Get a timeframe's bars as a DataFrame with a DatetimeIndex."""
+        size = self._visible(timeframe, include_open)
+        columns = self._columns[timeframe]
+        index = pd.to_datetime(columns['ts'][:size])
+        if self.tz is not None:
+            index = index.tz_localize(self.tz, ambiguous=True, nonexistent='shift_forward')
+        return pd.DataFrame({column: columns[column][:size].copy() for column in OHLCV_COLUMNS}, index=index)
+    
+    def detect(self, detector: PatternDetector, timeframe: str,
+               include_open: bool = False) -> Dict[str, Tuple[np.ndarray, float]]:
+        """Run a PatternDetector over a timeframe's cached arrays."""
+        return detector.detect_arrays(*self.arrays(timeframe, include_open))
+    
+    def _visible(self, timeframe: str, include_open: bool) -> int:
+        size = self._size[timeframe]
+        return size if include_open or not self._open[timeframe] else size - 1
+    
+    def _local_ns(self, index: pd.DatetimeIndex) -> np.ndarray:
+        """Wall-clock nanoseconds in the cache's timezone, used for bucket alignment."""
+        if index.tz is not None:
+            index = index.tz_convert(self.tz or 'UTC').tz_localize(None)
+        return index.as_unit('ns').asi8
+    
+    def _allocate(self, capacity: int) -> Dict[str, np.ndarray]:
+        columns = {column: np.zeros(capacity, dtype=np.float64) for column in OHLCV_COLUMNS}
+        columns['ts'] = np.zeros(capacity, dtype=np.int64)
+        return columns
+    
+    def _append(self, timeframe: str) -> int:
+        """Reserve a new last row, growing or trimming into fresh arrays when full."""
+        size = self._size[timeframe]
+        columns = self._columns[timeframe]
+        if size == len(columns['ts']):
+            # Copy into new arrays so views handed out earlier stay untouched
+            keep = min(size, self.max_bars)
+            grown = self._allocate(max(64, 2 * keep))
+            for name, values in columns.items():
+                grown[name][:keep] = values[size - keep:size]
+            self._columns[timeframe] = grown
+            size = keep
+        self._size[timeframe] = size + 1
+        return size
+    
+    def _trim(self, timeframe: str) -> None:
+        size = self._size[timeframe]
+        if size > self.max_bars:
+            columns = self._columns[timeframe]
+            trimmed = self._allocate(2 * self.max_bars)
+            for name, values in columns.items():
+                trimmed[name][:self.max_bars] = values[size - self.max_bars:size]
+            self._columns[timeframe] = trimmed
+            self._size[timeframe] = self.max_bars
+
+class TimeframeCache:
+    """Per-symbol MultiTimeframeBars, created on first use."""
+    
+    def __init__(self, timeframes: Iterable[str] = ('5m', '15m', '1h', '1d'), base_timeframe: str = '1m',
+                 tz: Optional[str] = None, max_bars: int = 5000):
+        """Initialize the cache.
+        
+        Args:
+            timeframes: Higher timeframes to derive for every symbol
+            base_timeframe: Timeframe of the bars fed in
+            tz: Timezone the buckets are aligned in
+            max_bars: Number of most recent bars kept per symbol and timeframe
+        """
+        self.timeframes = list(timeframes)
+        self.base_timeframe = base_timeframe
+        self.tz = tz
+        self.max_bars = max_bars
+        self._series: Dict[str, MultiTimeframeBars] = {}
+        self._lock = threading.Lock()
+    
+    def series(self, symbol: str) -> MultiTimeframeBars:
+        """Get (or create) the bars of a symbol."""
+        with self._lock:
+            if symbol not in self._series:
+                self._series[symbol] = MultiTimeframeBars(symbol, self.timeframes, self.base_timeframe,
+                                                          self.tz, self.max_bars)
+            return self._series[symbol]
+    
+    def load(self, symbol: str, df: pd.DataFrame) -> None:
+        """Seed a symbol from base-bar history."""
+        self.series(symbol).load(df)
+    
+    def on_bar(self, symbol: str, timestamp: pd.Timestamp, open_: float, high: float, low: float,
+               close: float, volume: float = 0.0) -> List[str]:
+        """Fold one closed base bar of a symbol into its timeframes."""
+        return self.series(symbol).on_bar(timestamp, open_, high, low, close, volume)
+    
+    def remove(self, symbol: str) -> None:
+        """Drop a symbol's bars."""
+        with self._lock:
+            self._series.pop(symbol, None)
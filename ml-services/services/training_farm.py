@@ -0,0 +1,176 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from services.model_registry import ModelRegistry
+from services.ohlcv_store import OHLCVStore
+from services.price_predictor import PricePredictor
+
+logger = logging.getLogger(__name__)
+
+def _train_symbol(symbol: str, config: Dict) -> Dict:
+    """Fetch, prepare, train and save the model of one symbol.
+    
+    Runs in a worker process, so it only takes picklable arguments and always
+    returns a result dictionary instead of raising.
+    """
+    timings = {}
+    result = {'symbol': symbol, 'status': 'failed', 'timings': timings}
+    started = time.perf_counter()
+    
+    try:
+        predictor = PricePredictor(lookback=config['lookback'], float32=config['float32'],
+                                   n_jobs=config['tree_jobs'],
+                                   data_store=OHLCVStore(config['data_dir']) if config['data_dir'] else None)
+        
+        step = time.perf_counter()
+        df = predictor.fetch_data(symbol, period=config['period'], interval=config['interval'])
+        timings['fetch'] = time.perf_counter() - step
+        
+        step = time.perf_counter()
+        X, y = predictor.prepare_data(df)
+        timings['prepare'] = time.perf_counter() - step
+        if len(X) == 0:
+            raise ValueError(f"Insufficient data. Need more than {config['lookback']} data points")
+        
+        step = time.perf_counter()
+        predictor.train(X, y)
+        timings['train'] = time.perf_counter() - step
+        
+        # Serve single-window predictions without spinning up a thread pool
+        predictor.model.n_jobs = None
+        
+        step = time.perf_counter()
+        registry = ModelRegistry(config['models_dir'], lookback=config['lookback'])
+        result['version'] = registry.register(symbol, predictor, config['version'])
+        timings['save'] = time.perf_counter() - step
+        
+        result['rows'] = int(len(df))
+        result['status'] = 'trained'
+        
+    except Exception as e:
+        result['error'] = str(e)
+    
+    timings['total'] = time.perf_counter() - started
+    return result
+
+class TrainingFarm:
+    """
+    Train PricePredictor models for a whole symbol list across a process pool.
+    
+    Cores are split between symbol-level parallelism (worker processes) and
+    tree-level parallelism (RandomForestRegressor n_jobs inside each worker), and
+    every run writes a manifest with per-symbol timings next to the models.
+    """
+    
+    def __init__(self, models_dir: str = None, lookback: int = 60, period: str = "1y",
+                 interval: str = "1d", float32: bool = True, max_workers: Optional[int] = None,
+                 cores: Optional[int] = None, data_dir: Optional[str] = None):
+        """Initialize the training farm.
+        
+        Args:
+            models_dir: Root directory of the per-symbol model registry
+            lookback: Lookback of the trained predictors
+            period: History period fetched per symbol
+            interval: Bar interval fetched per symbol
+            float32: Prepare training windows in float32
+            max_workers: Maximum number of symbol worker processes
+            cores: Cores available to the farm (default: all cores)
+            data_dir: OHLCVStore directory to fetch through, so nightly runs only
+                      download the missing tail (default: fetch from the provider)
+        """
+        self.models_dir = models_dir or ModelRegistry().models_dir
+        self.lookback = lookback
+        self.period = period
+        self.interval = interval
+        self.float32 = float32
+        self.max_workers = max_workers
+        self.cores = cores or os.cpu_count() or 1
+        self.data_dir = data_dir
+    
+    def plan(self, n_symbols: int) -> Dict[str, int]:
+        """Split the available cores between symbol workers and tree jobs.
+        
+        Symbols are independent, so whole cores go to symbol workers first; cores
+        left over when there are fewer symbols than cores go to the forests.
+        """
+        workers = max(1, min(n_symbols, self.cores, self.max_workers or self.cores))
+        return {'workers': workers, 'tree_jobs': max(1, self.cores // workers)}
+    
+    def train_universe(self, symbols: List[str], version: Optional[str] = None,
+                       time_budget: Optional[float] = None) -> Dict:
+        """Train and save a model for every symbol.
+        
+        Args:
+            symbols: Symbols to train
+            version: Model version to register (default: a UTC timestamp shared
+                     by the whole run)
+            time_budget: Seconds after which symbols that have not started are
+                         skipped, keeping a nightly run inside a fixed window
+            
+        Returns:
+            The run manifest, which is also written to models_dir
+        """
+        version = version or datetime.utcnow().strftime('v%Y%m%d%H%M%S')
+        plan = self.plan(len(symbols))
+        config = {
+            'models_dir': self.models_dir,
+            'data_dir': self.data_dir,
+            'lookback': self.lookback,
+            'period': self.period,
+            'interval': self.interval,
+            'float32': self.float32,
+            'tree_jobs': plan['tree_jobs'],
+            'version': version
+        }
+        
+        logger.info(f"Training {len(symbols)} symbols with {plan['workers']} workers "
+                    f"x {plan['tree_jobs']} tree jobs")
+        
+        started_at = datetime.utcnow().isoformat()
+        started = time.perf_counter()
+        results = {}
+        with ProcessPoolExecutor(max_workers=plan['workers']) as executor:
+            futures = {executor.submit(_train_symbol, symbol, config): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue  # Skipped when the time budget ran out
+                symbol = futures[future]
+                results[symbol] = future.result()
+                
+                if results[symbol]['status'] != 'trained':
+                    logger.error(f"Training failed for {symbol}: {results[symbol].get('error')}")
+                
+                if time_budget is not None and time.perf_counter() - started > time_budget:
+                    for pending, pending_symbol in futures.items():
+                        if pending.cancel():
+                            results[pending_symbol] = {'symbol': pending_symbol, 'status': 'skipped',
+                                                       'timings': {}}
+        
+        manifest = {
+            'version': version,
+            'started_at': started_at,
+            'elapsed': time.perf_counter() - started,
+            'plan': plan,
+            'config': {key: config[key] for key in ('lookback', 'period', 'interval', 'float32')},
+            'trained': sum(1 for r in results.values() if r['status'] == 'trained'),
+            'failed': sum(1 for r in results.values() if r['status'] == 'failed'),
+            'skipped': sum(1 for r in results.values() if r['status'] == 'skipped'),
+            'symbols': [results[symbol] for symbol in symbols]
+        }
+        self._write_manifest(manifest)
+        return manifest
+    
+    def _write_manifest(self, manifest: Dict) -> str:
+        """Write the run manifest as JSON and return its path."""
+        os.makedirs(self.models_dir, exist_ok=True)
+        path = os.path.join(self.models_dir, f"manifest_{manifest['version']}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        
+        logger.info(f"Training manifest written to {path}")
+        return path
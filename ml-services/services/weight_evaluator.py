@@ -0,0 +1,148 @@
+import logging
+from typing import Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+from services.fusion_scorer import FusionScorer
+
+logger = logging.getLogger(__name__)
+
+class WeightSweepEvaluator:
+    """
+    Evaluate thousands of candidate FusionScorer weight vectors against history.
+    
+    Every candidate's fusion series comes out of one matrix multiply of the
+    component-score panel with the candidate matrix. Candidates are ranked by how
+    often their BUY/SELL calls agree with the sign of the forward return.
+    """
+    
+    def __init__(self, buy_threshold: float = None, sell_threshold: float = None,
+                 min_calls: int = 30, max_block_elements: int = 16_000_000,
+                 dtype: type = np.float32):
+        """Initialize the evaluator.
+        
+        Args:
+            buy_threshold: Fusion score at or above which a row is a BUY call
+                           (default: the scorer's BUY band, 60)
+            sell_threshold: Fusion score below which a row is a SELL call
+                            (default: the scorer's SELL band upper bound, 40)
+            min_calls: Candidates with fewer calls are ranked after all others
+            max_block_elements: Upper bound on candidates x rows scored at once,
+                                which bounds memory for large sweeps
+            dtype: Float type of the fusion matrix (float32 halves memory traffic)
+        """
+        self.buy_threshold = FusionScorer.SIGNAL_THRESHOLDS[2] if buy_threshold is None else buy_threshold
+        self.sell_threshold = FusionScorer.SIGNAL_THRESHOLDS[1] if sell_threshold is None else sell_threshold
+        self.min_calls = min_calls
+        self.max_block_elements = max_block_elements
+        self.dtype = dtype
+    
+    def evaluate(self, candidates: Union[np.ndarray, pd.DataFrame], components: pd.DataFrame,
+                 forward_returns: Union[np.ndarray, pd.Series]) -> pd.DataFrame:
+        """Score and rank candidate weight vectors.
+        
+        Args:
+            candidates: (n_candidates, 5) weights in FusionScorer.SOURCES order, or
+                        a DataFrame with one column per source
+            components: Component-score panel with one column per source, e.g. the
+                        output of FusionScorer.score_columns for every symbol
+            forward_returns: Forward return aligned with the rows of components;
+                             NaN rows (end of each symbol's history) are ignored
+            
+        Returns:
+            DataFrame with the normalized weights, hit_rate, calls and coverage of
+            every candidate, best candidate first
+        """
+        weights = self._normalize(candidates)
+        panel = components[list(FusionScorer.SOURCES)].to_numpy(dtype=np.float64)
+        returns = np.asarray(forward_returns, dtype=np.float64)
+        
+        if len(returns) != len(panel):
+            raise ValueError("forward_returns must have one value per component row")
+        
+        valid = ~(np.isnan(returns) | np.isnan(panel).any(axis=1))
+        panel, returns = panel[valid], returns[valid]
+        
+        # Order rows as [up | down | flat] so hits are counts over contiguous slices
+        direction = np.sign(returns)
+        order = np.argsort(np.where(direction > 0, 0, np.where(direction < 0, 1, 2)), kind='stable')
+        n_up = int(np.count_nonzero(direction > 0))
+        n_down = int(np.count_nonzero(direction < 0))
+        up, down = slice(0, n_up), slice(n_up, n_up + n_down)
+        panel_t = np.ascontiguousarray(panel[order].T, dtype=self.dtype)
+        weights_block = weights.astype(self.dtype)
+        
+        n_candidates = len(weights)
+        n_rows = panel_t.shape[1]
+        hits = np.zeros(n_candidates, dtype=np.int64)
+        calls = np.zeros(n_candidates, dtype=np.int64)
+        
+        block = max(1, self.max_block_elements // max(1, n_rows))
+        for start in range(0, n_candidates, block):
+            stop = min(start + block, n_candidates)
+            # (candidates, rows); clipping to 0-100 cannot move a score across a band
+            fusion = weights_block[start:stop] @ panel_t
+            buys = fusion >= self.buy_threshold
+            sells = fusion < self.sell_threshold
+            
+            hits[start:stop] = (np.count_nonzero(buys[:, up], axis=1)
+                                + np.count_nonzero(sells[:, down], axis=1))
+            calls[start:stop] = (np.count_nonzero(buys, axis=1)
+                                 + np.count_nonzero(sells, axis=1))
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hit_rate = np.where(calls > 0, hits / calls, np.nan)
+        
+        result = pd.DataFrame(weights, columns=list(FusionScorer.SOURCES))
+        result['hit_rate'] = hit_rate
+        result['calls'] = calls
+        result['coverage'] = calls / n_rows if n_rows else 0.0
+        result['eligible'] = result['calls'] >= self.min_calls
+        
+        logger.info(f"Evaluated {n_candidates} weight candidates over {n_rows} rows")
+        return result.sort_values(['eligible', 'hit_rate', 'calls'],
+                                  ascending=[False, False, False], na_position='last')
+    
+    def best_weights(self, ranking: pd.DataFrame) -> Dict[str, float]:
+        """Get the top-ranked weights in the form FusionScorer.update_weights expects."""
+        best = ranking.iloc[0]
+        return {source: float(best[source]) for source in FusionScorer.SOURCES}
+    
+    def random_candidates(self, n: int, seed: Optional[int] = None) -> np.ndarray:
+        """Draw n weight vectors uniformly from the simplex."""
+        rng = np.random.default_rng(seed)
+        return rng.dirichlet(np.ones(len(FusionScorer.SOURCES)), size=n)
+    
+    @staticmethod
+    def forward_returns(prices: pd.Series, horizon: int = 1,
+                        groups: Optional[pd.Series] = None) -> np.ndarray:
+        """Compute the forward return over horizon bars, per symbol if groups is given.
+        
+        Args:
+            prices: Close prices ordered by time within each symbol
+            horizon: Number of bars ahead
+            groups: Symbol of every row (optional)
+            
+        Returns:
+            Array of forward returns with NaN where the horizon runs past the data
+        """
+        if groups is None:
+            future = prices.shift(-horizon)
+        else:
+            future = prices.groupby(groups, sort=False).shift(-horizon)
+        return (future / prices - 1).to_numpy(dtype=np.float64)
+    
+    def _normalize(self, candidates: Union[np.ndarray, pd.DataFrame, List]) -> np.ndarray:
+        """Clip weights to 0-1 and normalize each candidate to sum to 1, like update_weights."""
+        if isinstance(candidates, pd.DataFrame):
+            candidates = candidates[list(FusionScorer.SOURCES)].to_numpy()
+        weights = np.clip(np.atleast_2d(np.asarray(candidates, dtype=np.float64)), 0, 1)
+        
+        if weights.shape[1] != len(FusionScorer.SOURCES):
+            raise ValueError(f"Candidates need {len(FusionScorer.SOURCES)} weights each, got {weights.shape[1]}")
+        
+        totals = weights.sum(axis=1, keepdims=True)
+        if (totals <= 0).any():
+            raise ValueError("Every candidate needs at least one positive weight")
+        
+        return weights / totals
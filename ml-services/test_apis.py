@@ -49,6 +49,74 @@ def test_news():
     except Exception as e:
         print(f"   ERROR: {str(e)}")
 
+def test_news_fixture():
+    import asyncio
+    import threading
+    import time
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    from services.news_ingestor import NewsIngestor
+    from services.news_scraper import NewsScraper
+    
+    rss = (b'<?xml version="1.0"?><rss version="2.0"><channel><title>Fixture</title>'
+           b'<item><title>Sensex rallies</title><link>http://fixture/1</link></item>'
+           b'</channel></rss>')
+    requests = []
+    
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+        
+        def do_GET(self):
+            if self.path == '/slow':
+                time.sleep(2)  # Past the client's timeout, so nothing is sent back
+                return
+            if self.headers.get('If-None-Match') == '"v1"':
+                requests.append((self.path, 304))
+                self.send_response(304)
+                self.end_headers()
+                return
+            requests.append((self.path, 200))
+            self.send_response(200)
+            self.send_header('ETag', '"v1"')
+            self.send_header('Content-Length', str(len(rss)))
+            self.end_headers()
+            self.wfile.write(rss)
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    
+    scraper = NewsScraper(timeout=0.5)
+    scraper.feeds = {'en': [f"{base}/feed", f"{base}/slow"]}
+    ingestor = NewsIngestor(scraper)
+    
+    async def poll_twice():
+        try:
+            first = await ingestor.poll_once()
+            started = time.perf_counter()
+            second = await ingestor.poll_once()
+            return first, second, time.perf_counter() - started
+        finally:
+            await ingestor.stop()
+    
+    try:
+        first, second, elapsed = asyncio.run(poll_twice())
+    finally:
+        server.shutdown()
+    
+    # First poll parses the feed; the second is answered 304 and brings nothing new
+    assert [article['title'] for article in first] == ['Sensex rallies']
+    assert second == []
+    assert requests.count(("/feed", 200)) == 1
+    assert requests.count(("/feed", 304)) == 1
+    assert scraper.feed_status[f"{base}/feed"]['last_status'] == 304
+    assert scraper.cached_articles[f"{base}/feed"][0]['title'] == 'Sensex rallies'
+    
+    # The slow feed times out on its own without holding up the poll
+    assert scraper.feed_status[f"{base}/slow"]['last_error'] == 'timeout'
+    assert scraper.feed_status[f"{base}/slow"]['consecutive_failures'] == 2
+    assert elapsed < 1.5
+
 def test_satellite():
     print("\n3. Testing Satellite Service (Simulation)...")
     try:
@@ -63,8 +131,354 @@ def test_satellite():
     except Exception as e:
         print(f"   ERROR: {str(e)}")
 
+def test_weight_evaluator_zero_returns():
+    import numpy as np
+    import pandas as pd
+    from services.fusion_scorer import FusionScorer
+    from services.weight_evaluator import WeightSweepEvaluator
+    
+    rng = np.random.default_rng(7)
+    components = pd.DataFrame(rng.uniform(0, 100, (2000, 5)), columns=list(FusionScorer.SOURCES))
+    # Many flat (zero) returns between the up and down rows
+    returns = rng.choice([-0.01, 0.0, 0.0, 0.01], size=2000)
+    evaluator = WeightSweepEvaluator(dtype=np.float64)
+    candidates = evaluator.random_candidates(50, seed=3)
+    ranking = evaluator.evaluate(candidates, components, returns).sort_index()
+    
+    # Unvectorized reference: one row at a time
+    panel = components[list(FusionScorer.SOURCES)].to_numpy()
+    weights = candidates / candidates.sum(axis=1, keepdims=True)
+    for i, w in enumerate(weights):
+        hits = calls = 0
+        for row, ret in zip(panel, returns):
+            score = float(row @ w)
+            if score >= evaluator.buy_threshold:
+                calls += 1
+                hits += ret > 0
+            elif score < evaluator.sell_threshold:
+                calls += 1
+                hits += ret < 0
+        assert ranking['calls'].iloc[i] == calls
+        assert ranking['hit_rate'].iloc[i] == (hits / calls if calls else np.nan) or calls == 0
+
+def test_pattern_scanner_shards_match_in_process():
+    import numpy as np
+    from pandas.testing import assert_frame_equal
+    from services.pattern_detector import PatternDetector
+    from services.pattern_scanner import PatternScanner
+    
+    rng = np.random.default_rng(0)
+    closes = 100 + np.cumsum(rng.normal(0, 1, (8, 300)), axis=1)
+    opens = closes + rng.normal(0, 0.5, closes.shape)
+    highs = np.maximum(opens, closes) + rng.uniform(0, 1, closes.shape)
+    lows = np.minimum(opens, closes) - rng.uniform(0, 1, closes.shape)
+    symbols = [f"S{i}" for i in range(8)][::-1]
+    
+    detector = PatternDetector(talib_patterns=['CDLDOJI'])
+    in_process = PatternScanner(detector).scan(symbols, opens, highs, lows, closes)
+    sharded = PatternScanner(detector, max_workers=3).scan(symbols, opens, highs, lows, closes)
+    assert_frame_equal(in_process, sharded)
+
+def test_model_registry_version_order(tmp_path):
+    from services.model_registry import ModelRegistry
+    
+    symbol_dir = tmp_path / 'TCS'
+    symbol_dir.mkdir()
+    for version in ('v1', 'v2', 'v10'):
+        (symbol_dir / f"{version}.pkl").write_bytes(b'')
+        (symbol_dir / f"{version}_scaler.pkl").write_bytes(b'')
+    
+    registry = ModelRegistry(models_dir=str(tmp_path))
+    assert registry.versions('tcs') == ['v1', 'v2', 'v10']
+    assert registry.latest_version('tcs') == 'v10'
+
+def test_mapped_lexicon_skips_lexicon_dict(tmp_path):
+    from services.sentiment_analyzer import SentimentAnalyzer
+    
+    lexicons_dir = tmp_path / 'lexicons'
+    lexicons_dir.mkdir()
+    (lexicons_dir / 'en_words.csv').write_text('word,sentiment\nrally,0.8\nslump,-0.6\n', encoding='utf-8')
+    
+    analyzer = SentimentAnalyzer(lexicons_dir=str(lexicons_dir), cache_dir=str(tmp_path / 'cache'))
+    result = analyzer.lexicon_score('Markets rally after the slump', 'en')
+    assert result['sentiment'] == (0.8 - 0.6) / 2
+    # Compiling and matching load only the stopwords, never the per-process dict
+    assert analyzer.lexicons == {}
+    assert 'en' in analyzer.stopwords
+
+def test_price_predictor_unfitted_scaler_is_per_call():
+    import numpy as np
+    import pandas as pd
+    from sklearn.preprocessing import MinMaxScaler
+    from services.price_predictor import PricePredictor
+    
+    rng = np.random.default_rng(0)
+    
+    def history(level):
+        close = level + np.cumsum(rng.normal(0, 1, 200))
+        return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+                             'volume': rng.uniform(1e5, 2e5, 200)})
+    
+    small, large = history(100), history(5000)
+    predictor = PricePredictor()
+    predictor.generate_signals(small)
+    assert not hasattr(predictor.scaler, 'scale_')
+    
+    # The window is scaled with a scaler fitted on this call's history, not the first caller's
+    features = large[PricePredictor.FEATURES].to_numpy(dtype=np.float64)
+    expected = MinMaxScaler().fit(features).transform(features[-predictor.lookback:])
+    np.testing.assert_allclose(predictor.prepare_last_window(large)[0], expected)
+    
+    # Without a model, the prediction is the last close (with 1% noise) in price units
+    last_close = large['close'].iloc[-1]
+    assert abs(predictor.predict_next(large) / last_close - 1) < 0.05
+    assert abs(predictor.generate_signals(small)['prediction'] / small['close'].iloc[-1] - 1) < 0.05
+    assert not hasattr(predictor.scaler, 'scale_')
+
+def test_utc_designator_timestamps():
+    from services.news_ingestor import published_seconds
+    from services.sentiment_aggregator import SentimentAggregator
+    
+    expected = 1704067200.0  # 2024-01-01T00:00:00+00:00
+    assert SentimentAggregator._seconds('2024-01-01T00:00:00Z') == expected
+    assert SentimentAggregator._seconds('2024-01-01T05:30:00+05:30') == expected
+    assert published_seconds('2024-01-01T00:00:00Z', 0.0) == expected
+    assert published_seconds('Mon, 01 Jan 2024 00:00:00 GMT', 0.0) == expected
+
+def test_training_farm_time_budget_skips_pending(tmp_path):
+    import json
+    import os
+    from services.ohlcv_store import OHLCVStore, SyntheticProvider
+    from services.training_farm import TrainingFarm
+    
+    symbols = [f"SYN{i}" for i in range(6)]
+    # Seed the bar cache so the workers never reach the network
+    store = OHLCVStore(str(tmp_path / 'ohlcv'), provider=SyntheticProvider())
+    for symbol in symbols:
+        store.get(f"{symbol}.NS", period='3mo')
+    
+    farm = TrainingFarm(models_dir=str(tmp_path / 'models'), lookback=10, period='3mo',
+                        max_workers=1, cores=1, data_dir=str(tmp_path / 'ohlcv'))
+    manifest = farm.train_universe(symbols, version='v1', time_budget=0.0)
+    
+    statuses = [result['status'] for result in manifest['symbols']]
+    assert statuses[0] == 'trained'
+    assert 'skipped' in statuses
+    assert manifest['trained'] + manifest['skipped'] == len(symbols)
+    with open(os.path.join(str(tmp_path / 'models'), 'manifest_v1.json'), encoding='utf-8') as f:
+        assert json.load(f)['skipped'] == manifest['skipped']
+
+def test_price_predictor_windows_match_copies():
+    import numpy as np
+    import pandas as pd
+    from services.price_predictor import PricePredictor
+    
+    rng = np.random.default_rng(1)
+    close = 100 + np.cumsum(rng.normal(0, 1, 300))
+    df = pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+                       'volume': rng.uniform(1e5, 2e5, 300)})
+    predictor = PricePredictor(lookback=20)
+    X, y = predictor.prepare_data(df)
+    
+    # The copy-based windows prepare_data used to stack row by row
+    scaled = predictor.scaler.transform(df[PricePredictor.FEATURES].to_numpy(dtype=np.float64))
+    expected_X = np.array([scaled[i - 20:i] for i in range(20, len(scaled))])
+    np.testing.assert_array_equal(X, expected_X)
+    np.testing.assert_array_equal(y, scaled[20:, 3])
+    np.testing.assert_array_equal(np.concatenate([batch for batch, _ in predictor.iter_batches(X, y, 64)]),
+                                  expected_X)
+    
+    # Batched training fits the same forest as a flattened copy
+    predictor.build_model(None)
+    predictor.model.set_params(n_estimators=5)
+    predictor.train(X, y)
+    reference = PricePredictor(lookback=20)
+    reference.build_model(None)
+    reference.model.set_params(n_estimators=5)
+    reference.model.fit(expected_X.reshape(len(expected_X), -1), y)
+    np.testing.assert_array_equal(predictor.model.predict(expected_X.reshape(len(expected_X), -1)),
+                                  reference.model.predict(expected_X.reshape(len(expected_X), -1)))
+
+def test_fusion_historical_columnar_matches_rowwise():
+    import numpy as np
+    import pandas as pd
+    from services.fusion_scorer import FusionScorer
+    
+    rng = np.random.default_rng(5)
+    n = 200
+    frame = pd.DataFrame({
+        'rsi': rng.uniform(0, 100, n),
+        'macd': rng.normal(0, 2, n),
+        'news_sentiment': rng.uniform(-1, 1, n),
+        'news_confidence': rng.uniform(0, 1, n),
+        'bullish_percent': rng.uniform(0, 100, n),
+        'activity_level': rng.choice(['high', 'normal', 'LOW'], n).astype(object),
+        'satellite_confidence': rng.uniform(0, 1, n),
+        'web_ranking': rng.uniform(0, 30, n),
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='h')
+    })
+    # Missing cells and a missing column (web_sentiment, bearish_percent) use the defaults
+    for column in ('rsi', 'news_confidence', 'bullish_percent', 'activity_level', 'web_ranking'):
+        frame.loc[rng.choice(n, 20, replace=False), column] = np.nan
+    
+    scorer = FusionScorer()
+    columnar = scorer.get_historical_scores(frame)
+    rowwise = scorer.get_historical_scores(frame, columnar=False)
+    
+    np.testing.assert_allclose(columnar['fusion_score'], rowwise['fusion_score'])
+    assert columnar['signal'].tolist() == rowwise['signal'].tolist()
+    for source in FusionScorer.SOURCES:
+        np.testing.assert_allclose(columnar[source], [scores[source] for scores in rowwise['component_scores']])
+
+def test_sentiment_analyzer_import_time():
+    import os
+    import re
+    import subprocess
+    
+    # -X importtime reports each module's cumulative import time in microseconds
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import services.sentiment_analyzer'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+    )
+    cumulative = re.search(r'^import time:\s+\d+ \|\s+(\d+) \| services\.sentiment_analyzer$',
+                           completed.stderr, re.MULTILINE)
+    assert cumulative is not None, completed.stderr
+    assert int(cumulative.group(1)) < 200_000
+    # Heavy optional dependencies load only on first use
+    for module in ('nltk', 'textblob', 'pandas', 'sklearn'):
+        assert f" {module}\n" not in completed.stderr
+
+def test_unmapped_lexicon_reads_csv(tmp_path):
+    from services.sentiment_analyzer import SentimentAnalyzer
+    
+    lexicons_dir = tmp_path / 'lexicons'
+    lexicons_dir.mkdir()
+    (lexicons_dir / 'en_words.csv').write_text('word,sentiment\nrally,0.8\nslump,-0.6\n', encoding='utf-8')
+    
+    analyzer = SentimentAnalyzer(lexicons_dir=str(lexicons_dir), cache_dir=str(tmp_path / 'cache'), mapped=False)
+    assert analyzer.lexicon_score('Markets rally after the slump', 'en')['sentiment'] == (0.8 - 0.6) / 2
+    assert analyzer.get_lexicon('en') == {'rally': 0.8, 'slump': -0.6}
+    assert not (tmp_path / 'cache').exists()
+
+def test_news_index_categorize_keeps_substring_matching():
+    from services.news_index import NewsIndex
+    
+    index = NewsIndex()
+    # Categories categorize_news has always returned
+    assert index.categorize("Technology stocks lead the rally") == "IT"
+    assert index.categorize("Cars sold out ahead of the festive season") == "Auto"
+    assert index.categorize("Banks raise lending rates") == "Banking"
+    assert index.categorize("Steelmakers cut prices") == "Steel"
+    assert index.categorize("Reliance Jio adds subscribers") == "Oil & Gas"
+    assert index.categorize("Markets close flat") == "General"
+
+def test_news_index_late_articles():
+    from services.news_index import NewsIndex
+    
+    index = NewsIndex(retention=float('inf'))
+    times = [100.0, 300.0, 200.0, 50.0, 300.0, 250.0]
+    index.add_articles({'id': f"a{i}", 'title': 'Infosys results', 'published_ts': at}
+                       for i, at in enumerate(times))
+    newest = [article['id'] for article in index.by_symbol('INFY', limit=10)]
+    assert newest == ['a4', 'a1', 'a5', 'a2', 'a0', 'a3']
+    assert [article['id'] for article in index.by_symbol('INFY', start=150, end=260)] == ['a5', 'a2']
+    
+    index.retention = 100.0
+    index.add_articles([{'id': 'late', 'title': 'Infosys update', 'published_ts': 220.0}])
+    assert sorted(index.articles) == ['a1', 'a2', 'a4', 'a5', 'late']
+    assert [article['id'] for article in index.by_symbol('Infosys')] == ['a4', 'a1', 'a5', 'late', 'a2']
+
+def test_sentiment_batch_spawned_pool_matches_in_process(tmp_path):
+    from services.sentiment_analyzer import SentimentAnalyzer
+    from services.sentiment_batch import SentimentBatchEngine
+    
+    analyzer = SentimentAnalyzer(lexicons_dir=str(tmp_path), cache_dir=str(tmp_path / 'cache'))
+    texts = ['Profits surge on strong demand', 'Shares slump after weak results', 'Flat session', '',
+             'Profits surge on strong demand']
+    engine = SentimentBatchEngine(analyzer, max_workers=2, min_parallel=1, chunk_size=2)
+    try:
+        engine.start()
+        assert engine._executor._mp_context.get_start_method() == 'spawn'
+        assert engine.score(texts) == SentimentBatchEngine(analyzer, max_workers=1).score(texts)
+    finally:
+        engine.close()
+    assert engine._executor is None
+    
+    # analyze_batch keeps one in-process engine across calls
+    first = analyzer.analyze_batch(texts)
+    batch_engine = analyzer._batch_engine
+    assert analyzer.analyze_batch(texts) == first
+    assert analyzer._batch_engine is batch_engine
+
+def test_pattern_summary_counts_directions():
+    import numpy as np
+    import pandas as pd
+    from services.pattern_detector import PatternDetector
+    from services.pattern_stream import StreamingPatternDetector
+    
+    detector = PatternDetector(talib_patterns=['CDLEVENINGSTAR', 'CDLHANGINGMAN', 'CDLSHOOTINGSTAR',
+                                               'CDL3BLACKCROWS', 'CDLMORNINGSTAR', 'CDLENGULFING', 'CDLDOJI'])
+    hit = [{'index': 0, 'confidence': 0.9, 'timestamp': ''}]
+    # One-sided patterns carry no Bullish/Bearish word in their labels
+    labels = ['Evening Star (TA-Lib)', 'Hanging Man (TA-Lib)', 'Shooting Star (TA-Lib)',
+              'Three Black Crows (TA-Lib)', 'Morning Star (TA-Lib)', 'Bearish Engulfing Pattern (TA-Lib)',
+              'Doji (TA-Lib)', 'PatternType.HAMMER', 'PatternType.THREE_BLACK_CROWS']
+    detector.detect_all = lambda df: {label: hit for label in labels}
+    
+    summary = detector.get_pattern_summary(pd.DataFrame({'close': np.ones(20)}))
+    assert (summary['bullish_patterns'], summary['bearish_patterns']) == (2, 6)
+    assert summary['sentiment'] == 'bearish'
+    
+    stream = StreamingPatternDetector(detector=detector)
+    stream.pattern_counts = dict.fromkeys(labels, 1)
+    summary = stream.get_pattern_summary()
+    assert (summary['bullish_patterns'], summary['bearish_patterns']) == (2, 6)
+    assert summary['sentiment'] == 'bearish'
+
+def test_ohlcv_provider_is_abstract():
+    import pytest
+    from services.ohlcv_store import OHLCVProvider, SyntheticProvider
+    
+    class Incomplete(OHLCVProvider):
+        pass
+    
+    with pytest.raises(TypeError):
+        Incomplete()
+    assert not SyntheticProvider().fetch('TCS.NS', period='5d').empty
+
+def test_news_archive_limit_and_compaction_threshold(tmp_path):
+    import os
+    from services.news_archive import NewsArchive
+    
+    day = 86400.0
+    archive = NewsArchive(str(tmp_path), min_garbage=0.25)
+    # Two UTC days of hourly articles; a few of the first day's are appended again
+    articles = [{'id': f"a{i}", 'title': f"Story {i}", 'published_ts': 999993600.0 + i * 3600.0, 'language': 'en'}
+                for i in range(48)]
+    archive.append(articles)
+    archive.append([{**articles[i], 'title': 'Updated'} for i in range(0, 5)])
+    
+    latest = archive.replay(limit=3)
+    assert [article['id'] for article in latest] == ['a45', 'a46', 'a47']
+    assert [article['id'] for article in archive.replay(limit=2, language='en', end=999993600.0 + 2 * 3600.0)] == ['a1', 'a2']
+    
+    first, second = archive.segments()
+    sizes = {segment: os.path.getsize(os.path.join(str(tmp_path), f"{segment}.jsonl")) for segment in (first, second)}
+    assert archive.compact(now=999993600.0 + 5 * day) == {'deleted': 0, 'compacted': 0}
+    assert sizes == {segment: os.path.getsize(os.path.join(str(tmp_path), f"{segment}.jsonl"))
+                     for segment in (first, second)}
+    
+    # Enough repeats: the segment is rewritten, and a further call has nothing to do
+    archive.append([{**articles[i], 'title': 'Updated again'} for i in range(0, 10)])
+    assert archive.compact(now=999993600.0 + 5 * day) == {'deleted': 0, 'compacted': 1}
+    assert archive.compact(now=999993600.0 + 5 * day) == {'deleted': 0, 'compacted': 0}
+    replayed = archive.replay()
+    assert [article['id'] for article in replayed] == [f"a{i}" for i in range(48)]
+    assert [article['title'] for article in replayed[:10]] == ['Updated again'] * 10
+
 if __name__ == "__main__":
     test_yfinance()
     test_news()
+    test_news_fixture()
     test_satellite()
     print("\n--- Test Complete ---")